@@ -0,0 +1,226 @@
+"""Time github_release operations against the fake GitHub API of
+``tests/fake_github.py``.
+
+Each benchmark populates the fake API with ``scale`` objects (releases,
+assets or references), then times a single operation and records the
+number of requests it sent. Usage::
+
+    python -m benchmarks.run --scales 10,1000,10000 --output results.json
+
+Passing ``--baseline`` compares the results with those of a previous run
+and exits with a non-zero status if more requests were sent, or if an
+operation was slower than allowed by ``--tolerance``.
+"""
+
+import collections
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from contextlib import redirect_stdout
+from functools import partial
+
+import click
+
+import github_release as ghr
+from tests.fake_github import FakeGitHub
+
+REPO_NAME = 'bench/repo'
+ASSET_SIZE = 1024  # Size of the uploaded and downloaded assets
+SCALES = (10, 1000, 10000)
+
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(name):
+    """Register a function populating the fake API and returning the
+    operation to time."""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def _tag(index):
+    return 'bench-%05d' % index
+
+
+def _write_assets(directory, count):
+    os.makedirs(directory)
+    for index in range(count):
+        with open(os.path.join(directory, 'asset-%05d.bin' % index), 'wb') as f:
+            f.write(os.urandom(ASSET_SIZE))
+
+
+@benchmark('get_releases')
+def _get_releases(github, scale, workdir):
+    for index in range(scale):
+        github.add_release(REPO_NAME, _tag(index))
+    return partial(ghr.get_releases, REPO_NAME)
+
+
+@benchmark('get_release')
+def _get_release(github, scale, workdir):
+    # The oldest release is a draft: like on GitHub, it is not returned by
+    # the releases/tags endpoint and is only found by listing the releases.
+    github.add_release(REPO_NAME, _tag(0), draft=True)
+    for index in range(1, scale):
+        github.add_release(REPO_NAME, _tag(index))
+    return partial(ghr.get_release, REPO_NAME, _tag(0))
+
+
+@benchmark('gh_asset_upload')
+def _gh_asset_upload(github, scale, workdir):
+    github.add_release(REPO_NAME, 'upload')
+    _write_assets(os.path.join(workdir, 'dist'), scale)
+    return partial(ghr.gh_asset_upload, REPO_NAME, 'upload',
+                   os.path.join(workdir, 'dist', '*'))
+
+
+@benchmark('gh_asset_download')
+def _gh_asset_download(github, scale, workdir):
+    release = github.add_release(REPO_NAME, 'download')
+    for index in range(scale):
+        github.add_asset(REPO_NAME, release, 'asset-%05d.bin' % index,
+                         os.urandom(ASSET_SIZE))
+    return partial(ghr.gh_asset_download, REPO_NAME, 'download',
+                   output_dir=os.path.join(workdir, 'download'))
+
+
+@benchmark('gh_release_delete')
+def _gh_release_delete(github, scale, workdir):
+    for index in range(scale):
+        github.add_release(REPO_NAME, _tag(index))
+    return partial(ghr.gh_release_delete, REPO_NAME, 'bench-*')
+
+
+@benchmark('gh_ref_delete')
+def _gh_ref_delete(github, scale, workdir):
+    for index in range(scale):
+        github.add_ref(REPO_NAME, 'refs/tags/' + _tag(index))
+    return partial(ghr.gh_ref_delete, REPO_NAME, 'refs/tags/bench-*')
+
+
+def run(scales=SCALES, names=None, repeat=1, **server_options):
+    """Run benchmarks ``names`` (all by default) at each of ``scales`` and
+    return list of results.
+
+    Each result is a dictionary with ``benchmark``, ``scale``, ``seconds``
+    (best of ``repeat`` runs) and ``requests`` keys. ``server_options`` are
+    passed to :class:`FakeGitHub` (e.g. ``latency``).
+    """
+    server_options.setdefault('rate_limit', 10 ** 9)
+    saved = (ghr._github_api_url, ghr._http_cache, ghr._github_token_cli_arg)
+    results = []
+    with FakeGitHub(**server_options) as github:
+        tmp = tempfile.mkdtemp(prefix='github-release-benchmark-')
+        ghr.set_github_api_url(github.url)
+        ghr.set_http_cache(None)
+        ghr._github_token_cli_arg = 'fake'
+        try:
+            for scale in scales:
+                for name in names or BENCHMARKS:
+                    results.append(_run_benchmark(github, tmp, name, scale, repeat))
+        finally:
+            ghr._github_api_url, ghr._http_cache, ghr._github_token_cli_arg = saved
+            shutil.rmtree(tmp)
+    return results
+
+
+def _run_benchmark(github, tmp, name, scale, repeat):
+    best = None
+    for _ in range(repeat):
+        github.reset()
+        workdir = tempfile.mkdtemp(dir=tmp)
+        operation = BENCHMARKS[name](github, scale, workdir)
+        github.reset_counts()
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            operation()
+            seconds = time.perf_counter() - start
+        shutil.rmtree(workdir)
+        if best is None or seconds < best:
+            best = seconds
+    return {'benchmark': name, 'scale': scale, 'seconds': round(best, 4),
+            'requests': github.request_count}
+
+
+def compare(results, baseline, tolerance):
+    """Return list of messages describing the regressions of ``results``
+    compared to ``baseline``."""
+    previous_results = {(result['benchmark'], result['scale']): result
+                        for result in baseline}
+    regressions = []
+    for result in results:
+        previous = previous_results.get((result['benchmark'], result['scale']))
+        if previous is None:
+            continue
+        label = '%s (scale %s)' % (result['benchmark'], result['scale'])
+        if result['requests'] > previous['requests']:
+            regressions.append('%s: %s requests instead of %s' % (
+                label, result['requests'], previous['requests']))
+        if result['seconds'] > previous['seconds'] * (1 + tolerance):
+            regressions.append('%s: %.3fs instead of %.3fs' % (
+                label, result['seconds'], previous['seconds']))
+    return regressions
+
+
+def _parse_scales(ctx, param, value):
+    try:
+        return [int(scale) for scale in value.split(',')]
+    except ValueError:
+        raise click.BadParameter('expected comma-separated integers')
+
+
+@click.command()
+@click.option('--scales', default=','.join(str(scale) for scale in SCALES),
+              callback=_parse_scales,
+              help='Comma-separated numbers of objects (default: 10,1000,10000).')
+@click.option('--benchmark', 'names', multiple=True,
+              type=click.Choice(list(BENCHMARKS)),
+              help='Benchmark to run (default: all). Can be repeated.')
+@click.option('--repeat', type=click.IntRange(min=1), default=1,
+              help='Number of runs of each benchmark, the best is kept.')
+@click.option('--latency', type=float, default=0,
+              help='Seconds waited by the fake API before replying.')
+@click.option('--bandwidth', type=int, default=None,
+              help='Bytes per second transferred by the fake API.')
+@click.option('--failure-rate', type=float, default=0,
+              help='Probability for a request to fail with status 429.')
+@click.option('--output', type=click.Path(dir_okay=False), default=None,
+              help='JSON file the results are written to.')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False),
+              default=None,
+              help='JSON file written by a previous run to compare with.')
+@click.option('--tolerance', type=float, default=0.5,
+              help='Allowed relative slowdown compared to the baseline '
+                   '(default: 0.5).')
+def main(scales, names, repeat, latency, bandwidth, failure_rate, output,
+         baseline, tolerance):
+    """Time github_release operations against a fake GitHub API."""
+    results = run(scales, names=names, repeat=repeat, latency=latency,
+                  bandwidth=bandwidth, failure_rate=failure_rate,
+                  failure_status=429)
+    print('%-20s %8s %10s %10s' % ('benchmark', 'scale', 'requests', 'seconds'))
+    for result in results:
+        print('%-20s %8d %10d %10.3f' % (
+            result['benchmark'], result['scale'], result['requests'],
+            result['seconds']))
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if baseline is not None:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), tolerance)
+        for regression in regressions:
+            print('regression: %s' % regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,30 +3,53 @@
 from __future__ import print_function
 
 from datetime import tzinfo, timedelta, datetime
+import collections
+import concurrent.futures
 import fnmatch
 import glob
+import hashlib
+import io
+import itertools
 import json
+import mmap
 import os
 import sys
 import tempfile
+import threading
 import time
 import types
 
 
-from functools import wraps
+from contextlib import closing, contextmanager
+from functools import partial, wraps
 from pprint import pprint
+from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
 
 import backoff
 import click
 import link_header
 import requests
-from requests import request
 
 
 REQ_BUFFER_SIZE = 65536  # Chunk size when iterating a download body
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Size of the memory-mapped slices sent when uploading
+POOL_CONNECTIONS = 4  # Number of per-host connection pools to keep
+POOL_MAXSIZE = 16  # Number of keep-alive connections kept for each host
+MAX_JOBS = 8  # Default maximum number of concurrent transfers
+PER_PAGE = 100  # Number of objects requested for each page of a listing
+PAGE_JOBS = 4  # Maximum number of pages of a listing fetched concurrently
+HTTP_CACHE_MAX_SIZE = 64 * 1024 * 1024  # Maximum size of the response cache
+RATE_LIMIT_RESERVE = 100  # Spread requests once fewer requests remain (at most a tenth of the limit)
+RATE_LIMIT_MAX_WAIT = 15 * 60  # Maximum number of seconds to wait for a rate limit reset
+CHECKSUMS_ASSET_NAME = 'SHA256SUMS'  # Name of the asset listing the checksums of a release
+MIRROR_STATE_NAME = '.github-release-mirror.json'  # File tracking the assets of a mirror
 
 _github_token_cli_arg = None
 _github_api_url = None
+_github_api = 'rest'
+_github_session = None
+_github_session_lock = threading.Lock()
+_http_cache = None
 
 
 class _UTC(tzinfo):
@@ -70,24 +93,837 @@ conveniently be initialized using `sys.stdout.isatty()`)
 """
 
 
+def _reports_progress():
+    """Return True if :data:`progress_reporter_cls` displays progress.
+
+    Callables without ``reportProgress`` attribute (e.g. the click progress
+    bar installed by the CLI) are assumed to display it.
+    """
+    return getattr(progress_reporter_cls, 'reportProgress', True)
+
+
+class _HttpCache(object):
+    """On-disk cache of GET responses revalidated using conditional requests.
+
+    Entries are keyed by URL, ``Accept`` header and authentication identity.
+    Cached responses are sent with ``If-None-Match`` and ``If-Modified-Since``
+    headers and the cached body is served if GitHub replies with
+    ``304 Not Modified``, which does not count against the rate limit.
+
+    Least recently used entries are evicted once the size of the cache
+    exceeds ``max_size`` bytes.
+    """
+
+    def __init__(self, directory, max_size=HTTP_CACHE_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self._size = None
+        self._lock = threading.Lock()
+
+    def key(self, url, headers, identity):
+        """Return key identifying the response to a GET request."""
+        accept = headers.get('Accept', '')
+        identity = hashlib.sha256(
+            (identity or '').encode('utf-8')).hexdigest()
+        return hashlib.sha256('\n'.join(
+            [url, accept, identity]).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def lookup(self, key):
+        """Return ``(metadata, body)`` for ``key`` or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                metadata = json.loads(f.readline().decode('utf-8'))
+                body = f.read()
+        except (IOError, OSError, ValueError):
+            return None
+        # Mark the entry as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return metadata, body
+
+    def validators(self, entry):
+        """Return conditional request headers associated with ``entry``."""
+        headers = {}
+        metadata, _ = entry
+        if metadata['headers'].get('ETag'):
+            headers['If-None-Match'] = metadata['headers']['ETag']
+        if metadata['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = metadata['headers']['Last-Modified']
+        return headers
+
+    def store(self, key, response):
+        """Store ``response`` if it can be revalidated."""
+        if ('ETag' not in response.headers
+                and 'Last-Modified' not in response.headers):
+            return
+        metadata = json.dumps({
+            'url': response.url,
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'encoding': response.encoding,
+            'headers': dict(response.headers),
+        }).encode('utf-8')
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(metadata + b'\n')
+            f.write(response.content)
+        os.replace(tmp_path, path)
+        self._evict(len(metadata) + 1 + len(response.content))
+
+    def response(self, entry, not_modified):
+        """Return response built from ``entry`` and the 304 response
+        ``not_modified``."""
+        metadata, body = entry
+        response = requests.Response()
+        response.status_code = metadata['status_code']
+        response.reason = metadata['reason']
+        response.encoding = metadata['encoding']
+        response.headers.update(metadata['headers'])
+        # Refresh headers like rate limits and validators
+        response.headers.update(not_modified.headers)
+        response._content = body
+        response.url = metadata['url']
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+        return response
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _evict(self, added_size):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += added_size
+            if self._size <= self.max_size:
+                return
+            entries = sorted(self._entries())
+            self._size = sum(size for _, size, _ in entries)
+            for _, size, name in entries:
+                if self._size <= self.max_size:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                self._size -= size
+
+
+class _RateLimiter(object):
+    """Schedule requests according to the GitHub rate limit headers.
+
+    The budget of each resource (``core``, ``search``, ``graphql``, ...) is
+    updated from the ``X-RateLimit-*`` headers of every response. Once fewer
+    than ``reserve`` requests remain, the following requests are spread
+    evenly until the budget is reset. The reserve is capped to a tenth of
+    the limit of the resource.
+
+    Responses reporting that the primary rate limit (no request remaining)
+    or a secondary rate limit (``Retry-After`` header or abuse detection
+    message) was exceeded can be retried after the delay returned by
+    :meth:`retry_after`.
+
+    See https://docs.github.com/en/rest/overview/resources-in-the-rest-api#rate-limiting
+    """
+
+    def __init__(self, reserve=RATE_LIMIT_RESERVE):
+        self.reserve = reserve
+        self._budgets = {}
+        self._secondary_reset = 0
+        self._lock = threading.Lock()
+
+    def budget(self, resource='core'):
+        """Return dictionary describing the budget of ``resource`` or None.
+        """
+        with self._lock:
+            budget = self._budgets.get(resource)
+            return dict(budget) if budget is not None else None
+
+    def budgets(self):
+        """Return dictionary mapping resources to their budget."""
+        with self._lock:
+            return {resource: dict(budget)
+                    for resource, budget in self._budgets.items()}
+
+    def delay(self, resource='core'):
+        """Return number of seconds to wait before sending a request."""
+        with self._lock:
+            now = time.time()
+            delay = max(0, self._secondary_reset - now)
+            budget = self._budgets.get(resource)
+            if budget is None or budget['reset'] <= now:
+                return delay
+            if budget['remaining'] <= 0:
+                return max(delay, budget['reset'] - now)
+            reserve = self.reserve
+            if budget['limit'] > 0:
+                # Unauthenticated requests are limited to 60 per hour
+                reserve = min(reserve, budget['limit'] // 10)
+            if budget['remaining'] < reserve:
+                delay = max(delay,
+                            (budget['reset'] - now) / budget['remaining'])
+            # Account for requests sent concurrently before their
+            # response updates the budget.
+            budget['remaining'] -= 1
+            return delay
+
+    def update(self, response):
+        """Update budget using the rate limit headers of ``response``."""
+        headers = response.headers
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        try:
+            budget = {
+                'limit': int(headers.get('X-RateLimit-Limit', 0)),
+                'remaining': int(headers['X-RateLimit-Remaining']),
+                'reset': int(headers.get('X-RateLimit-Reset', 0)),
+                'used': int(headers.get('X-RateLimit-Used', 0)),
+            }
+        except ValueError:
+            return
+        resource = headers.get('X-RateLimit-Resource', 'core')
+        with self._lock:
+            self._budgets[resource] = budget
+
+    @staticmethod
+    def is_rate_limited(response):
+        """Return True if ``response`` reports an exceeded rate limit."""
+        if response.status_code not in (403, 429):
+            return False
+        if 'Retry-After' in response.headers:
+            return True
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            return True
+        return b'rate limit' in response.content.lower()
+
+    def retry_after(self, response):
+        """Return seconds to wait before retrying a rate limited request.
+
+        Return None if ``response`` does not report an exceeded rate limit.
+        """
+        if not self.is_rate_limited(response):
+            return None
+        now = time.time()
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None and retry_after.isdigit():
+            # Secondary rate limit: pause all requests
+            delay = int(retry_after)
+            with self._lock:
+                self._secondary_reset = max(self._secondary_reset, now + delay)
+            return delay
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            # Primary rate limit: wait for the budget to be reset
+            reset = int(response.headers.get('X-RateLimit-Reset', now))
+            return max(0, reset - now) + 1
+        # Secondary rate limit without Retry-After: wait at least a minute
+        with self._lock:
+            self._secondary_reset = max(self._secondary_reset, now + 60)
+        return 60
+
+
+_rate_limiter = _RateLimiter()
+
+
+class _NoopIdentityMap(object):
+    """Identity map used outside of a unit of work: nothing is kept."""
+
+    def release(self, repo_name, tag_name):
+        return None
+
+    def add_release(self, repo_name, release):
+        pass
+
+    def remove_release(self, repo_name, release):
+        pass
+
+    def ref(self, repo_name, ref_name):
+        return None
+
+    def add_ref(self, repo_name, ref):
+        pass
+
+    def remove_ref(self, repo_name, ref_name):
+        pass
+
+    def forget_refs(self, repo_name):
+        pass
+
+
+class _IdentityMap(_NoopIdentityMap):
+    """Releases and references fetched or updated during a unit of work
+    (see :func:`unit_of_work`).
+
+    Releases are keyed by repository and id, and looked up by repository
+    and tag name. References are keyed by repository and name.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._releases = {}
+        self._release_ids = {}
+        self._refs = {}
+
+    def release(self, repo_name, tag_name):
+        with self._lock:
+            release_id = self._release_ids.get((repo_name, tag_name))
+            return self._releases.get((repo_name, release_id))
+
+    def add_release(self, repo_name, release):
+        with self._lock:
+            key = (repo_name, release['id'])
+            previous = self._releases.get(key)
+            if previous is not None:
+                # Tag name may have been updated
+                self._release_ids.pop((repo_name, previous['tag_name']), None)
+            self._releases[key] = release
+            self._release_ids[(repo_name, release['tag_name'])] = release['id']
+
+    def remove_release(self, repo_name, release):
+        with self._lock:
+            self._releases.pop((repo_name, release['id']), None)
+            if self._release_ids.get((repo_name, release['tag_name'])) == release['id']:
+                del self._release_ids[(repo_name, release['tag_name'])]
+
+    def ref(self, repo_name, ref_name):
+        with self._lock:
+            return self._refs.get((repo_name, ref_name))
+
+    def add_ref(self, repo_name, ref):
+        with self._lock:
+            self._refs[(repo_name, ref['ref'])] = ref
+
+    def remove_ref(self, repo_name, ref_name):
+        with self._lock:
+            self._refs.pop((repo_name, ref_name), None)
+
+    def forget_refs(self, repo_name):
+        """Forget references of ``repo_name``, e.g. because creating or
+        updating a release may have created or moved a tag."""
+        with self._lock:
+            for key in [key for key in self._refs if key[0] == repo_name]:
+                del self._refs[key]
+
+
+_identity_map = _NoopIdentityMap()
+
+
+class _Tracer(object):
+    """Request hook collecting events to summarize them per endpoint or
+    dump them (see ``--trace`` and ``--trace-file``)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events = []
+
+    def __call__(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self):
+        """Return list of ``(name, totals)`` sorted by decreasing time,
+        where ``name`` is ``<METHOD> <url template>`` for requests and
+        ``sleep <reason>`` for waits outside of requests."""
+        totals = collections.OrderedDict()
+        for event in self.events:
+            if event['type'] == 'listing':
+                continue
+            if event['type'] == 'request':
+                name = '%s %s' % (event['method'], event['url'])
+            else:
+                name = 'sleep %s' % event['reason']
+            total = totals.setdefault(name, dict.fromkeys(
+                ['calls', 'errors', 'retries', 'bytes_out', 'bytes_in',
+                 'duration', 'max_duration', 'sleep'], 0))
+            total['calls'] += 1
+            total['duration'] += event['duration']
+            total['max_duration'] = max(total['max_duration'], event['duration'])
+            if event['type'] == 'request':
+                total['errors'] += event['status'] >= 400
+                total['retries'] += event['retries']
+                total['bytes_out'] += event['bytes_out']
+                total['bytes_in'] += event['bytes_in']
+                total['sleep'] += event['sleep']
+            else:
+                total['sleep'] += event['duration']
+        return sorted(totals.items(), key=lambda item: -item[1]['duration'])
+
+    def print_summary(self, file=None):
+        """Print the summary as a table."""
+        rows = [('endpoint', 'calls', 'errors', 'retries', 'sent',
+                 'received', 'time (s)', 'max (s)', 'sleep (s)')]
+        for name, total in self.summary():
+            rows.append((
+                name, str(total['calls']), str(total['errors']),
+                str(total['retries']), str(total['bytes_out']),
+                str(total['bytes_in']),
+                '%.3f' % total['duration'], '%.3f' % total['max_duration'],
+                '%.3f' % total['sleep']))
+        widths = [max(len(row[index]) for row in rows)
+                  for index in range(len(rows[0]))]
+        for row in rows:
+            print('  '.join([row[0].ljust(widths[0])] + [
+                value.rjust(width) for value, width in zip(row[1:], widths[1:])
+            ]).rstrip(), file=file)
+
+    def dump(self, path):
+        """Write the events to ``path``.
+
+        Events are written as JSON lines if ``path`` ends with ``.jsonl``,
+        otherwise using the Chrome trace event format which can be loaded
+        in ``chrome://tracing`` or https://ui.perfetto.dev.
+        """
+        with open(path, 'w') as f:
+            if path.endswith('.jsonl'):
+                for event in self.events:
+                    f.write(json.dumps(event, sort_keys=True) + '\n')
+                return
+            trace_events = []
+            pid = os.getpid()
+            for event in self.events:
+                if event['type'] == 'request':
+                    name = '%s %s' % (event['method'], event['url'])
+                elif event['type'] == 'listing':
+                    name = 'list %s' % event['url']
+                else:
+                    name = 'sleep %s' % event['reason']
+                trace_events.append({
+                    'name': name, 'cat': event['type'], 'ph': 'X',
+                    'ts': int(event['start'] * 1e6),
+                    'dur': int(event['duration'] * 1e6),
+                    'pid': pid, 'tid': event['thread'],
+                    'args': event})
+            json.dump({'traceEvents': trace_events}, f)
+
+
+class Metrics(object):
+    """Request hook aggregating counters and histograms exposed using the
+    Prometheus text format (see :meth:`prometheus_text`).
+
+    Example::
+
+        metrics = github_release.Metrics()
+        github_release.add_request_hook(metrics)
+        ...
+        body = metrics.prometheus_text()  # e.g. served on /metrics
+
+    Requests are labelled by method and URL template (e.g.
+    ``/repos/{owner}/{repo}/releases/{id}``) so that the number of series
+    does not grow with the number of releases and assets.
+    """
+
+    DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    PAGES_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+    FAMILIES = [
+        ('github_release_requests_total', 'counter',
+         'Requests sent to GitHub.'),
+        ('github_release_request_duration_seconds', 'histogram',
+         'Seconds elapsed until the response was received, including retries.'),
+        ('github_release_request_retries_total', 'counter',
+         'Requests sent again, e.g. after exceeding the rate limit.'),
+        ('github_release_sent_bytes_total', 'counter',
+         'Bytes of request bodies, e.g. uploaded assets.'),
+        ('github_release_received_bytes_total', 'counter',
+         'Bytes of response bodies, e.g. downloaded assets.'),
+        ('github_release_sleep_seconds_total', 'counter',
+         'Seconds spent waiting for the rate limit or before retrying.'),
+        ('github_release_listing_pages', 'histogram',
+         'Pages fetched by each listing.'),
+        ('github_release_rate_limit_remaining', 'gauge',
+         'Requests remaining in the rate limit budget.'),
+        ('github_release_rate_limit_limit', 'gauge',
+         'Requests allowed by the rate limit budget.'),
+    ]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def __call__(self, event):
+        with self._lock:
+            if event['type'] == 'request':
+                labels = (('method', event['method']), ('endpoint', event['url']))
+                self._add('github_release_requests_total',
+                          labels + (('status', str(event['status'])),), 1)
+                self._observe('github_release_request_duration_seconds', labels,
+                              event['duration'], self.DURATION_BUCKETS)
+                self._add('github_release_request_retries_total', labels, event['retries'])
+                self._add('github_release_sent_bytes_total', labels, event['bytes_out'])
+                self._add('github_release_received_bytes_total', labels, event['bytes_in'])
+                if event['sleep']:
+                    self._add('github_release_sleep_seconds_total',
+                              (('reason', 'rate limit'),), event['sleep'])
+            elif event['type'] == 'listing':
+                self._observe('github_release_listing_pages',
+                              (('endpoint', event['url']),),
+                              event['pages'], self.PAGES_BUCKETS)
+            else:
+                self._add('github_release_sleep_seconds_total',
+                          (('reason', event['reason']),), event['duration'])
+
+    def _add(self, name, labels, value):
+        self._values[(name, labels)] = self._values.get((name, labels), 0) + value
+
+    def _observe(self, name, labels, value, buckets):
+        histogram = self._values.setdefault((name, labels), {
+            'buckets': [0] * len(buckets), 'sum': 0, 'count': 0})
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                histogram['buckets'][index] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+    def samples(self):
+        """Return list of ``(name, labels, value)`` samples, where
+        ``labels`` is a tuple of ``(label, value)`` pairs.
+
+        Histograms are reported as cumulative ``_bucket`` samples along with
+        ``_sum`` and ``_count`` samples. The rate limit gauges are read from
+        the last responses (see :func:`github_rate_limit`).
+        """
+        buckets = {'github_release_request_duration_seconds': self.DURATION_BUCKETS,
+                   'github_release_listing_pages': self.PAGES_BUCKETS}
+        with self._lock:
+            values = sorted(self._values.items())
+        samples = []
+        for (name, labels), value in values:
+            if name not in buckets:
+                samples.append((name, labels, value))
+                continue
+            bounds = [_format_metric_value(bound) for bound in buckets[name]]
+            for bound, count in zip(bounds + ['+Inf'], value['buckets'] + [value['count']]):
+                samples.append((name + '_bucket', labels + (('le', bound),), count))
+            samples.append((name + '_sum', labels, value['sum']))
+            samples.append((name + '_count', labels, value['count']))
+        for resource, budget in sorted(_rate_limiter.budgets().items()):
+            for key in ('remaining', 'limit'):
+                samples.append(('github_release_rate_limit_' + key,
+                                (('resource', resource),), budget[key]))
+        return samples
+
+    def prometheus_text(self):
+        """Return the metrics using the Prometheus text exposition format.
+
+        See https://prometheus.io/docs/instrumenting/exposition_formats/
+        """
+        samples = self.samples()
+        lines = []
+        for family, metric_type, description in self.FAMILIES:
+            family_samples = [
+                sample for sample in samples
+                if sample[0] == family or (metric_type == 'histogram' and sample[0] in (
+                    family + '_bucket', family + '_sum', family + '_count'))]
+            if not family_samples:
+                continue
+            lines.append('# HELP %s %s' % (family, description))
+            lines.append('# TYPE %s %s' % (family, metric_type))
+            for name, labels, value in family_samples:
+                if labels:
+                    name += '{%s}' % ','.join(
+                        '%s="%s"' % (label, _escape_label_value(label_value))
+                        for label, label_value in labels)
+                lines.append('%s %s' % (name, _format_metric_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+def _format_metric_value(value):
+    if value == int(value):
+        return '%d' % value
+    return repr(float(value))
+
+
+def _escape_label_value(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class OpenTelemetryMetrics(object):
+    """Request hook recording the metrics of :class:`Metrics` using
+    OpenTelemetry instruments.
+
+    Metrics are exported by the ``MeterProvider`` configured by the
+    application, e.g. to an OTLP collector using the
+    ``opentelemetry-exporter-otlp`` package. Requires ``opentelemetry-api``.
+
+    :param meter:
+      Meter creating the instruments. By default, the ``github_release``
+      meter of the global ``MeterProvider`` is used.
+    """
+
+    def __init__(self, meter=None):
+        try:
+            from opentelemetry import metrics
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetryMetrics requires the opentelemetry-api package.")
+        if meter is None:
+            meter = metrics.get_meter('github_release')
+        self._observation = metrics.Observation
+        self._requests = meter.create_counter(
+            'github_release.requests', unit='{request}',
+            description='Requests sent to GitHub.')
+        self._duration = meter.create_histogram(
+            'github_release.request.duration', unit='s',
+            description='Time until the response was received, including retries.')
+        self._retries = meter.create_counter(
+            'github_release.request.retries', unit='{request}',
+            description='Requests sent again, e.g. after exceeding the rate limit.')
+        self._sent = meter.create_counter(
+            'github_release.sent', unit='By',
+            description='Bytes of request bodies, e.g. uploaded assets.')
+        self._received = meter.create_counter(
+            'github_release.received', unit='By',
+            description='Bytes of response bodies, e.g. downloaded assets.')
+        self._sleep = meter.create_counter(
+            'github_release.sleep', unit='s',
+            description='Time spent waiting for the rate limit or before retrying.')
+        self._pages = meter.create_histogram(
+            'github_release.listing.pages', unit='{page}',
+            description='Pages fetched by each listing.')
+        meter.create_observable_gauge(
+            'github_release.rate_limit.remaining', unit='{request}',
+            description='Requests remaining in the rate limit budget.',
+            callbacks=[self._observe_rate_limit])
+
+    def _observe_rate_limit(self, options):
+        return [self._observation(budget['remaining'], {'resource': resource})
+                for resource, budget in sorted(_rate_limiter.budgets().items())]
+
+    def __call__(self, event):
+        if event['type'] == 'request':
+            attributes = {'http.request.method': event['method'],
+                          'url.template': event['url']}
+            self._requests.add(1, dict(
+                attributes, **{'http.response.status_code': event['status']}))
+            self._duration.record(event['duration'], attributes)
+            self._retries.add(event['retries'], attributes)
+            self._sent.add(event['bytes_out'], attributes)
+            self._received.add(event['bytes_in'], attributes)
+            if event['sleep']:
+                self._sleep.add(event['sleep'], {'reason': 'rate limit'})
+        elif event['type'] == 'listing':
+            self._pages.record(event['pages'], {'url.template': event['url']})
+        else:
+            self._sleep.add(event['duration'], {'reason': event['reason']})
+
+
+_request_hooks = []
+
+
+def _url_template(url):
+    """Return ``url`` without its query string and with the variable parts
+    of its path replaced by placeholders (e.g.
+    ``/repos/{owner}/{repo}/releases/{id}``).
+
+    The host is only kept if it differs from :func:`github_api_url`, and
+    the path of URLs outside of the API (e.g. redirections to the asset
+    storage) is entirely replaced.
+    """
+    parsed = urlparse(url)
+    api = urlparse(github_api_url())
+    path = parsed.path
+    if parsed.netloc == api.netloc and path.startswith(api.path.rstrip('/')):
+        prefix = ''
+        path = path[len(api.path.rstrip('/')):]
+    else:
+        prefix = parsed.netloc
+    if '/repos/' not in path and not path.endswith('/graphql') and prefix:
+        return prefix + '/{path}'
+    segments = path.split('/')
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index else ''
+        if previous == 'repos' and index + 1 < len(segments):
+            segments[index:index + 2] = ['{owner}', '{repo}']
+        elif segment.isdigit():
+            segments[index] = '{id}'
+        elif previous == 'tags' and segments[index - 2] == 'releases':
+            segments[index:] = ['{tag}']
+            break
+        elif previous == 'commits':
+            segments[index] = '{sha}'
+        elif previous in ('ref', 'refs', 'matching-refs') and segments[index - 2] == 'git':
+            segments[index:] = ['{ref}']
+            break
+    return prefix + '/'.join(segments)
+
+
+def _body_size(data):
+    """Return the number of bytes of the request body ``data``."""
+    if data is None:
+        return 0
+    if isinstance(data, str):
+        return len(data.encode('utf-8'))
+    try:
+        return len(data)
+    except TypeError:
+        pass
+    try:
+        return os.fstat(data.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def _emit(event):
+    """Pass ``event`` to the registered request hooks."""
+    event['thread'] = threading.current_thread().ident
+    for hook in list(_request_hooks):
+        hook(event)
+
+
+def _sleep(seconds, reason):
+    """Sleep ``seconds`` and report it to the request hooks."""
+    start = time.time()
+    time.sleep(seconds)
+    if _request_hooks:
+        _emit({'type': 'sleep', 'reason': reason, 'start': start,
+               'duration': seconds})
+
+
+def _on_backoff(details):
+    """Report the waits of the ``backoff`` decorators."""
+    if _request_hooks:
+        _emit({'type': 'sleep',
+               'reason': 'backoff %s' % details['target'].__name__,
+               'start': time.time(), 'duration': details['wait']})
+
+
+def github_rate_limit(resource='core'):
+    """Return the rate limit budget of ``resource`` (e.g ``core``,
+    ``search`` or ``graphql``).
+
+    The budget is a dictionary with ``limit``, ``remaining``, ``reset``
+    and ``used`` keys updated from the headers of the last response. None
+    is returned if no response reported it yet.
+    """
+    return _rate_limiter.budget(resource)
+
+
+def _rate_limit_resource(url):
+    path = urlparse(url).path
+    if path.endswith('/graphql'):
+        return 'graphql'
+    if '/search/' in path:
+        return 'search'
+    return 'core'
+
+
+def _can_resend(kwargs):
+    """Return True if the request body can be sent again, rewinding it
+    if needed."""
+    data = kwargs.get('data')
+    if data is None or isinstance(data, (bytes, str, dict, list)):
+        return True
+    try:
+        data.seek(0)
+    except (AttributeError, OSError, ValueError):
+        return False
+    return True
+
+
+def _send(resource, *args, **kwargs):
+    """Send request using the shared session.
+
+    Requests are delayed according to the rate limit budget of ``resource``
+    and retried if the rate limit was exceeded.
+    """
+    session = github_session()
+    retry_after = None
+    start, started, slept = time.time(), time.perf_counter(), 0
+    for attempt in range(3):
+        # Unless already waiting before retrying, wait for the rate limiter
+        delay = _rate_limiter.delay(resource)
+        if delay > 0 and retry_after is None:
+            delay = min(delay, RATE_LIMIT_MAX_WAIT)
+            time.sleep(delay)
+            slept += delay
+        response = session.request(*args, **kwargs)
+        _rate_limiter.update(response)
+        retry_after = _rate_limiter.retry_after(response)
+        if retry_after is not None:
+            message = "Retrying in %ss (%s rate limit exceeded for url: %s)" % (
+                int(retry_after), resource, response.url)
+        elif (os.getenv("TRAVIS",  None) is not None
+                and 400 <= response.status_code < 500):
+            retry_after = 1
+            message = "Retrying in 1s (%s Client Error: %s for url: %s)" % (
+                response.status_code, response.reason, response.url)
+        if (retry_after is None or retry_after > RATE_LIMIT_MAX_WAIT
+                or attempt == 2 or not _can_resend(kwargs)):
+            break
+        print(message)
+        time.sleep(retry_after)
+        slept += retry_after
+    if _request_hooks:
+        _emit_request(args, kwargs, response, start,
+                      time.perf_counter() - started, attempt, slept)
+    return response
+
+
+def _emit_request(args, kwargs, response, start, duration, retries, slept):
+    """Report a request sent by :func:`_send` to the request hooks.
+
+    ``duration`` includes the time spent waiting for the rate limiter or
+    before retrying (``slept``), but not reading the body of a streamed
+    response, whose size is then taken from its ``Content-Length`` header.
+    """
+    method = args[0] if args else kwargs.get('method')
+    url = args[1] if len(args) > 1 else kwargs.get('url')
+    if kwargs.get('stream'):
+        bytes_in = int(response.headers.get('Content-Length') or 0)
+    else:
+        bytes_in = len(response.content or b'')
+    _emit({'type': 'request', 'method': method, 'url': _url_template(url),
+           'status': response.status_code, 'bytes_out': _body_size(kwargs.get('data')),
+           'bytes_in': bytes_in, 'start': start, 'duration': duration,
+           'retries': retries, 'sleep': slept})
+
+
 def _request(*args, **kwargs):
     with_auth = kwargs.pop("with_auth", True)
     token = _github_token_cli_arg
     if not token:
         token = os.environ.get("GITHUB_TOKEN", None)
+    kwargs['headers'] = dict(kwargs.get('headers') or {})
     if token and with_auth:
         # Using Bearer token authentication instead of Basic Authentication
-        kwargs['headers'] = kwargs.get('headers', {})
         kwargs['headers']['Authorization'] = 'Bearer ' + token
-    for _ in range(3):
-        response = request(*args, **kwargs)
-        is_travis = os.getenv("TRAVIS",  None) is not None
-        if is_travis and 400 <= response.status_code < 500:
-            print("Retrying in 1s (%s Client Error: %s for url: %s)" % (
-                response.status_code, response.reason, response.url))
-            time.sleep(1)
-            continue
-        break
+    method = args[0] if args else kwargs.get('method')
+    url = args[1] if len(args) > 1 else kwargs.get('url')
+    cache = _http_cache
+    cache_entry = None
+    if cache is not None and method == 'GET' and not kwargs.get('stream'):
+        identity = token if with_auth else None
+        if identity is None and with_auth:
+            identity = repr(requests.utils.get_netrc_auth(url))
+        cache_key = cache.key(url, kwargs['headers'], identity)
+        cache_entry = cache.lookup(cache_key)
+        if cache_entry is not None:
+            kwargs['headers'].update(cache.validators(cache_entry))
+    else:
+        cache = None
+    response = _send(_rate_limit_resource(url), *args, **kwargs)
+    if cache is not None:
+        if response.status_code == 304 and cache_entry is not None:
+            response = cache.response(cache_entry, response)
+        elif response.status_code == 200:
+            cache.store(cache_key, response)
     return response
 
 
@@ -164,20 +1000,176 @@ def _progress_bar(*args, **kwargs):
     return bar
 
 
-def _recursive_gh_get(href, items):
-    """Recursively get list of GitHub objects.
+def _update_query(url, **params):
+    """Return ``url`` with its query parameters updated using ``params``."""
+    parts = urlparse(url)
+    query = [(key, params.get(key, value))
+             for key, value in parse_qsl(parts.query)]
+    query.extend(sorted((key, value) for key, value in params.items()
+                        if key not in dict(query)))
+    return urlunparse(parts._replace(query=urlencode(query)))
 
-    See https://developer.github.com/v3/guides/traversing-with-pagination/
-    """
+
+def _page_links(response):
+    """Return dictionary mapping ``rel`` to URL of the response Link header."""
+    if "link" not in response.headers:
+        return {}
+    links = link_header.parse(response.headers["link"])
+    return {link.rel: link.href for link in links.links}
+
+
+def _page_number(href):
+    """Return value of the ``page`` query parameter or None."""
+    page = dict(parse_qsl(urlparse(href).query)).get("page")
+    return int(page) if page and page.isdigit() else None
+
+
+def _gh_get_page(href):
     response = _request('GET', href)
     response.raise_for_status()
-    items.extend(response.json())
-    if "link" not in response.headers:
+    return response
+
+
+def _iter_gh_pages(href, per_page=PER_PAGE):
+    """Yield GitHub objects page by page as lists.
+
+    If the first page links to the last one, the following pages are
+    fetched concurrently ahead of the consumer (at most ``PAGE_JOBS`` pages
+    at a time). Otherwise, pages are fetched one after the other following
+    the ``next`` links. No more pages are requested once the consumer
+    stops iterating.
+
+    Once the consumer stops iterating, the number of pages yielded is
+    reported to the request hooks (see :func:`add_request_hook`).
+
+    See https://developer.github.com/v3/guides/traversing-with-pagination/
+    """
+    pages = _gh_pages(href, per_page)
+    if _request_hooks:
+        pages = _report_listing(href, pages)
+    return pages
+
+
+def _report_listing(href, pages):
+    """Yield ``pages`` and report their number to the request hooks."""
+    start, started, count = time.time(), time.perf_counter(), 0
+    try:
+        for page in pages:
+            count += 1
+            yield page
+    finally:
+        pages.close()
+        _emit({'type': 'listing', 'url': _url_template(href), 'pages': count,
+               'start': start, 'duration': time.perf_counter() - started})
+
+
+def _gh_pages(href, per_page):
+    if per_page is not None:
+        href = _update_query(href, per_page=per_page)
+    response = _gh_get_page(href)
+    rels = _page_links(response)
+    yield response.json()
+    first_page = _page_number(rels.get("next", ""))
+    last_page = _page_number(rels.get("last", ""))
+    if first_page is not None and last_page is not None:
+        hrefs = iter([_update_query(rels["last"], page=page)
+                      for page in range(first_page, last_page + 1)])
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=PAGE_JOBS) as executor:
+            pending = collections.deque(
+                executor.submit(_gh_get_page, page_href)
+                for page_href in itertools.islice(hrefs, PAGE_JOBS))
+            try:
+                while pending:
+                    response = pending.popleft().result()
+                    for page_href in itertools.islice(hrefs, 1):
+                        pending.append(
+                            executor.submit(_gh_get_page, page_href))
+                    yield response.json()
+            finally:
+                for future in pending:
+                    future.cancel()
         return
-    links = link_header.parse(response.headers["link"])
-    rels = {link.rel: link.href for link in links.links}
-    if "next" in rels:
-        _recursive_gh_get(rels["next"], items)
+    while "next" in rels:
+        response = _gh_get_page(rels["next"])
+        rels = _page_links(response)
+        yield response.json()
+
+
+def _iter_gh_items(href, per_page=PER_PAGE):
+    """Yield GitHub objects traversing all pages (see :func:`_iter_gh_pages`).
+    """
+    for page in _iter_gh_pages(href, per_page=per_page):
+        for item in page:
+            yield item
+
+
+def _paginated_gh_get(href, items, per_page=PER_PAGE):
+    """Get list of GitHub objects traversing all pages.
+
+    See :func:`_iter_gh_pages`.
+    """
+    for page in _iter_gh_pages(href, per_page=per_page):
+        items.extend(page)
+
+
+def _default_jobs(count):
+    """Return the number of workers to use for ``count`` concurrent transfers.
+    """
+    return max(1, min(count, MAX_JOBS))
+
+
+def _iter_concurrently(func, items, jobs):
+    """Call ``func`` on each item using a pool of at most ``jobs`` threads.
+
+    Yield ``(item, result, exception)`` tuples as calls complete. Exceptions
+    are collected instead of being raised so that a failing call does not
+    interrupt the others. If ``jobs`` is 1, calls are done sequentially.
+    """
+    if jobs <= 1:
+        for item in items:
+            try:
+                yield item, func(item), None
+            except Exception as exc:
+                yield item, None, exc
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as exc:
+                yield futures[future], None, exc
+
+
+class _SharedProgressReporter(object):
+    """Thread-safe wrapper allowing concurrent transfers to report
+    progress to a single reporter."""
+
+    def __init__(self, reporter):
+        self._reporter = reporter
+        self._lock = threading.Lock()
+
+    def update(self, chunk_size):
+        with self._lock:
+            self._reporter.update(chunk_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        pass
+
+
+def _validate_template(ctx, param, value):
+    """Callback used to check the fields of a download path template."""
+    try:
+        value.format(repo_name="org/project", tag_name="1.0.0", name="asset")
+    except (AttributeError, KeyError, IndexError, ValueError) as exc:
+        raise click.BadParameter(
+            'Invalid template {0!r} ({1}). Expected fields are {{repo_name}}, '
+            '{{tag_name}} and {{name}}'.format(value, exc))
+    return value
 
 
 def _validate_repo_name(ctx, param, value):
@@ -200,7 +1192,28 @@ def _validate_repo_name(ctx, param, value):
               help='[default: https://api.github.com]')
 @click.option("--progress/--no-progress", default=True,
               help="Display progress bar (default: yes).")
-def main(github_token, github_api_url, progress):
+@click.option("--cache-dir", envvar='GITHUB_RELEASE_CACHE_DIR',
+              default=None,
+              help="Directory caching GitHub API responses, which are "
+                   "not cached unless set "
+                   "[default: GITHUB_RELEASE_CACHE_DIR env. variable]")
+@click.option("--no-cache", is_flag=True, default=False,
+              help="Do not cache GitHub API responses, even if a cache "
+                   "directory is set.")
+@click.option("--api", type=click.Choice(['rest', 'graphql']), default='rest',
+              help="API used to list releases and their assets "
+                   "(default: rest).")
+@click.option("--trace", is_flag=True, default=False,
+              help="Print a summary of the requests sent to GitHub "
+                   "per endpoint on exit.")
+@click.option("--trace-file", type=click.Path(dir_okay=False, writable=True),
+              default=None,
+              help="Write the requests sent to GitHub to the given file "
+                   "(JSON lines if the name ends with .jsonl, Chrome trace "
+                   "event format otherwise).")
+@click.pass_context
+def main(ctx, github_token, github_api_url, progress, cache_dir, no_cache, api,
+         trace, trace_file):
     """A CLI to easily manage GitHub releases, assets and references."""
     global progress_reporter_cls
     progress_reporter_cls.reportProgress = sys.stdout.isatty() and progress
@@ -209,6 +1222,11 @@ def main(github_token, github_api_url, progress):
     global _github_token_cli_arg
     _github_token_cli_arg = github_token
     set_github_api_url(github_api_url)
+    set_http_cache(None if no_cache else cache_dir)
+    set_github_api(api)
+    ctx.with_resource(unit_of_work())
+    if trace or trace_file:
+        ctx.with_resource(_tracing(summary=trace, trace_file=trace_file))
 
 
 @main.group("release")
@@ -273,6 +1291,327 @@ def set_github_api_url(url):
     _github_api_url = url
 
 
+def github_api():
+    """Return API used to list releases and their assets.
+
+    Either ``rest`` (the default) or ``graphql``.
+    """
+    return _github_api
+
+
+def set_github_api(api):
+    """Set API used to list releases and their assets.
+
+    Using ``graphql``, releases are listed along with their assets, tag
+    commit and author using a single query for each page of 100 releases.
+    """
+    if api not in ('rest', 'graphql'):
+        raise ValueError("api must be either 'rest' or 'graphql'")
+    global _github_api
+    _github_api = api
+
+
+def github_graphql_url():
+    """Return GitHub GraphQL API URL derived from :func:`github_api_url`.
+
+    For GitHub Enterprise, ``https://<host>/api/v3`` is associated with
+    ``https://<host>/api/graphql``.
+    """
+    url = github_api_url().rstrip('/')
+    if url.endswith('/api/v3'):
+        return url[:-len('/v3')] + '/graphql'
+    return url + '/graphql'
+
+
+def _is_rate_limit_error(exc):
+    """Return True if the HTTPError ``exc`` reports an exceeded rate limit.
+
+    Such errors are not retried by ``backoff``: requests already waited
+    for the rate limit to be reset (see :class:`_RateLimiter`).
+    """
+    return (exc.response is not None
+            and _RateLimiter.is_rate_limited(exc.response))
+
+
+def set_http_cache(directory, max_size=HTTP_CACHE_MAX_SIZE):
+    """Set directory used to cache responses to GET requests.
+
+    Cached responses are revalidated using ``ETag`` and ``Last-Modified``
+    headers. Passing ``None`` disables the cache (the default).
+    """
+    global _http_cache
+    _http_cache = None
+    if directory is not None:
+        _http_cache = _HttpCache(directory, max_size=max_size)
+
+
+@contextmanager
+def unit_of_work():
+    """Context manager within which releases and references are only
+    fetched once.
+
+    Releases and references fetched or returned by requests creating or
+    updating them are kept in an identity map, and looked up there instead
+    of being fetched again. It is entered once per CLI invocation.
+    """
+    global _identity_map
+    previous_identity_map = _identity_map
+    _identity_map = _IdentityMap()
+    try:
+        yield _identity_map
+    finally:
+        _identity_map = previous_identity_map
+
+
+def add_request_hook(hook):
+    """Register ``hook`` to be called with a dictionary describing each
+    request sent to GitHub and each wait outside of requests.
+
+    Request events have the following keys:
+
+    * ``type``: ``request``
+    * ``method``, ``status``
+    * ``url``: URL template, e.g. ``/repos/{owner}/{repo}/releases/{id}``
+    * ``bytes_out``, ``bytes_in``: size of the request and response bodies
+    * ``start``: timestamp of the request (seconds since the epoch)
+    * ``duration``: seconds elapsed until the response was received,
+      including retries and waits
+    * ``retries``: number of times the request was resent (e.g. after
+      exceeding the rate limit)
+    * ``sleep``: seconds spent waiting for the rate limit
+
+    Wait events (e.g. ``backoff`` retries of :func:`get_release`) have the
+    ``type`` (``sleep``), ``reason``, ``start`` and ``duration`` keys.
+    Listing events (e.g. :func:`iter_releases`) have the ``type``
+    (``listing``), ``url``, ``pages`` (number of pages fetched), ``start``
+    and ``duration`` keys. All events have a ``thread`` key identifying the
+    thread that sent the request.
+
+    See :class:`Metrics` and :class:`OpenTelemetryMetrics` aggregating
+    events into metrics.
+
+    Hooks are called from the thread sending the request and must be
+    thread-safe. When no hook is registered, nothing is measured.
+    """
+    _request_hooks.append(hook)
+
+
+def remove_request_hook(hook):
+    """Unregister ``hook`` registered using :func:`add_request_hook`."""
+    _request_hooks.remove(hook)
+
+
+@contextmanager
+def _tracing(summary=False, trace_file=None):
+    """Context manager recording requests, printing a summary of them
+    on ``stderr`` and dumping them to ``trace_file`` when exited."""
+    tracer = _Tracer()
+    add_request_hook(tracer)
+    try:
+        yield tracer
+    finally:
+        remove_request_hook(tracer)
+        if summary:
+            tracer.print_summary(file=sys.stderr)
+        if trace_file is not None:
+            tracer.dump(trace_file)
+
+
+def new_github_session(pool_connections=POOL_CONNECTIONS,
+                       pool_maxsize=POOL_MAXSIZE, pool_sizes=None,
+                       adapter_factory=None):
+    """Return a new :class:`requests.Session` with keep-alive connection pools.
+
+    :param pool_connections:
+      Number of per-host connection pools to cache.
+
+    :param pool_maxsize:
+      Number of keep-alive connections kept for each host.
+
+    :param pool_sizes:
+      Optional mapping of URL prefix (e.g ``https://uploads.github.com/``)
+      to the number of connections kept for that host.
+
+    :param adapter_factory:
+      Optional callable returning a transport adapter. It is called with
+      ``pool_connections`` and ``pool_maxsize`` keyword arguments and
+      defaults to :class:`requests.adapters.HTTPAdapter`. This allows
+      to plug in an alternative (e.g HTTP/2 capable) transport.
+    """
+    if adapter_factory is None:
+        adapter_factory = requests.adapters.HTTPAdapter
+    session = requests.Session()
+    adapter = adapter_factory(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    for prefix, size in (pool_sizes or {}).items():
+        session.mount(prefix, adapter_factory(
+            pool_connections=1, pool_maxsize=size))
+    return session
+
+
+def github_session():
+    """Return the session used to send all GitHub requests.
+
+    If no session has been set, a pooled session is created using
+    :func:`new_github_session` and reused by all subsequent requests.
+    """
+    global _github_session
+    with _github_session_lock:
+        if _github_session is None:
+            _github_session = new_github_session()
+        return _github_session
+
+
+def set_github_session(session):
+    """Set the session used to send all GitHub requests.
+
+    Passing ``None`` discards the current session; a new default one is
+    created on next use.
+    """
+    global _github_session
+    with _github_session_lock:
+        _github_session = session
+
+
+#
+# GraphQL
+#
+
+_GRAPHQL_ASSET_FIELDS = """
+    name
+    size
+    downloadCount
+    downloadUrl
+    contentType
+    createdAt
+    updatedAt
+    uploadedBy { login }
+"""
+
+_GRAPHQL_RELEASES_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    releases(first: 100, after: $cursor,
+             orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        id
+        databaseId
+        tagName
+        name
+        description
+        createdAt
+        publishedAt
+        url
+        isDraft
+        isPrerelease
+        author { login }
+        tagCommit { oid }
+        releaseAssets(first: 100) {
+          pageInfo { hasNextPage endCursor }
+          nodes { %s }
+        }
+      }
+    }
+  }
+}
+""" % _GRAPHQL_ASSET_FIELDS
+
+_GRAPHQL_RELEASE_ASSETS_QUERY = """
+query($id: ID!, $cursor: String) {
+  node(id: $id) {
+    ... on Release {
+      releaseAssets(first: 100, after: $cursor) {
+        pageInfo { hasNextPage endCursor }
+        nodes { %s }
+      }
+    }
+  }
+}
+""" % _GRAPHQL_ASSET_FIELDS
+
+
+def _graphql_query(query, variables):
+    """Send GraphQL ``query`` and return its ``data``."""
+    response = _request(
+        'POST', github_graphql_url(),
+        data=json.dumps({'query': query, 'variables': variables}),
+        headers={'Content-Type': 'application/json'})
+    response.raise_for_status()
+    result = response.json()
+    if result.get('errors'):
+        raise Exception('GraphQL query failed: {0}'.format(
+            '; '.join(error.get('message', '') for error in result['errors'])))
+    return result['data']
+
+
+def _graphql_asset(node):
+    """Return asset ``node`` using the REST API representation.
+
+    Since assets are not identified by their REST API ``id``, the returned
+    ``id`` is None. Assets are listed again using the REST API before being
+    downloaded (see :func:`_downloadable_assets`).
+    """
+    return {
+        'id': None,
+        'name': node['name'],
+        'state': 'uploaded',
+        'size': node['size'],
+        'download_count': node['downloadCount'],
+        'browser_download_url': node['downloadUrl'],
+        'content_type': node['contentType'],
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt'],
+        'uploader': {'login': (node['uploadedBy'] or {}).get('login')},
+    }
+
+
+def _graphql_release(node):
+    """Return release ``node`` using the REST API representation."""
+    return {
+        'id': node['databaseId'],
+        'node_id': node['id'],
+        'tag_name': node['tagName'],
+        'name': node['name'],
+        'body': node['description'],
+        'created_at': node['createdAt'],
+        'published_at': node['publishedAt'],
+        'html_url': node['url'],
+        'draft': node['isDraft'],
+        'prerelease': node['isPrerelease'],
+        'author': {'login': (node['author'] or {}).get('login')},
+        'target_commitish': (node['tagCommit'] or {}).get('oid'),
+        'assets': [_graphql_asset(asset)
+                   for asset in node['releaseAssets']['nodes']],
+    }
+
+
+def _iter_graphql_releases(repo_name):
+    """Yield releases along with their assets using the GraphQL API."""
+    owner, name = repo_name.split('/', 1)
+    cursor = None
+    while True:
+        releases = _graphql_query(_GRAPHQL_RELEASES_QUERY, {
+            'owner': owner, 'name': name, 'cursor': cursor,
+        })['repository']['releases']
+        for node in releases['nodes']:
+            release = _graphql_release(node)
+            page_info = node['releaseAssets']['pageInfo']
+            while page_info['hasNextPage']:
+                assets = _graphql_query(_GRAPHQL_RELEASE_ASSETS_QUERY, {
+                    'id': node['id'], 'cursor': page_info['endCursor'],
+                })['node']['releaseAssets']
+                release['assets'].extend(
+                    _graphql_asset(asset) for asset in assets['nodes'])
+                page_info = assets['pageInfo']
+            yield release
+        if not releases['pageInfo']['hasNextPage']:
+            return
+        cursor = releases['pageInfo']['endCursor']
+
+
 #
 # Releases
 #
@@ -311,12 +1650,26 @@ def get_release_type(release):
     return 'release'
 
 
-@backoff.on_exception(backoff.expo, requests.exceptions.HTTPError, max_time=60)
+def iter_releases(repo_name):
+    """Yield releases page by page.
+
+    Unlike :func:`get_releases`, pages are only requested as the releases
+    are consumed.
+
+    If :func:`github_api` is ``graphql``, the releases and their assets
+    are queried using the GraphQL API.
+    """
+    if github_api() == 'graphql':
+        return _iter_graphql_releases(repo_name)
+    return _iter_gh_items(
+        github_api_url() + '/repos/{0}/releases'.format(repo_name))
+
+
+@backoff.on_exception(backoff.expo, requests.exceptions.HTTPError, max_time=60,
+                      giveup=_is_rate_limit_error, on_backoff=_on_backoff)
 def get_releases(repo_name, verbose=False):
 
-    releases = []
-    _recursive_gh_get(
-        github_api_url() + '/repos/{0}/releases'.format(repo_name), releases)
+    releases = list(iter_releases(repo_name))
 
     if verbose:
         list(map(print_release_info,
@@ -324,7 +1677,8 @@ def get_releases(repo_name, verbose=False):
     return releases
 
 
-@backoff.on_predicate(backoff.expo, lambda x: x is None, max_time=5)
+@backoff.on_predicate(backoff.expo, lambda x: x is None, max_time=5,
+                      on_backoff=_on_backoff)
 def get_release(repo_name, tag_name):
     """Return release
 
@@ -335,13 +1689,38 @@ def get_release(repo_name, tag_name):
         leveraging the `backoff` decorator.
 
         See https://github.com/j0057/github-release/issues/67
+
+    The release is looked up using the ``releases/tags/<tag_name>``
+    endpoint. Since draft releases are not returned by this endpoint, the
+    list of releases is only traversed if the lookup fails.
+
+    Within a unit of work (see :func:`unit_of_work`), a release is only
+    fetched once.
     """
-    releases = get_releases(repo_name)
+    release = _identity_map.release(repo_name, tag_name)
+    if release is not None:
+        return release
+    response = _request(
+        'GET', github_api_url() + '/repos/{0}/releases/tags/{1}'.format(
+            repo_name, quote(tag_name, safe='')))
+    if response.status_code != 404:
+        response.raise_for_status()
+        release = response.json()
+        _identity_map.add_release(repo_name, release)
+        return release
+    # Releases returned by the GraphQL API lack the REST fields (e.g.
+    # ``upload_url``) used to update the release, so the REST listing is
+    # traversed whatever the value of :func:`github_api`.
+    releases = _iter_gh_items(
+        github_api_url() + '/repos/{0}/releases'.format(repo_name))
     try:
         release = next(r for r in releases if r['tag_name'] == tag_name)
+        _identity_map.add_release(repo_name, release)
         return release
     except StopIteration:
         return None
+    finally:
+        releases.close()
 
 
 def get_release_info(repo_name, tag_name):
@@ -352,16 +1731,21 @@ def get_release_info(repo_name, tag_name):
         raise Exception('Release with tag_name {0} not found'.format(tag_name))
 
 
-def _update_release_sha(repo_name, tag_name, new_release_sha, dry_run):
+def _update_release_sha(repo_name, tag_name, new_release_sha, dry_run,
+                        release=None):
     """Update the commit associated with a given release tag.
 
-    Since updating a tag commit is not directly possible, this function
-    does the following steps:
+    If the tag is lightweight, its reference is force-updated to
+    ``new_release_sha``. Since an annotated tag can not be moved, this
+    function otherwise does the following steps:
     * set the release tag to ``<tag_name>-tmp`` and associate it
       with ``new_release_sha``.
     * delete tag ``refs/tags/<tag_name>``.
     * update the release tag to ``<tag_name>`` and associate it
       with ``new_release_sha``.
+
+    ``release`` is the release associated with ``tag_name``. If not set,
+    it is looked up.
     """
     if new_release_sha is None:
         return
@@ -375,53 +1759,74 @@ def _update_release_sha(repo_name, tag_name, new_release_sha, dry_run):
     if previous_release_sha == new_release_sha:
         return
 
+    if refs[0]["object"]["type"] == "commit":
+        if not dry_run:
+            response = _request(
+                'PATCH',
+                github_api_url() + '/repos/{0}/git/refs/tags/{1}'.format(
+                    repo_name, quote(tag_name)),
+                data=json.dumps({"sha": new_release_sha, "force": True}),
+                headers={'Content-Type': 'application/json'})
+            response.raise_for_status()
+            _identity_map.add_ref(repo_name, response.json())
+        return
+
     tmp_tag_name = tag_name + "-tmp"
 
     # If any, remove leftover temporary tag "<tag_name>-tmp"
     refs = get_refs(repo_name, tags=True, pattern="refs/tags/%s" % tmp_tag_name)
     if refs:
         assert len(refs) == 1
-        time.sleep(0.1)
+        _sleep(0.1, 'retarget')
         gh_ref_delete(repo_name,
                       "refs/tags/%s" % tmp_tag_name, dry_run=dry_run)
 
     # Update "<tag_name>" release by associating it with the "<tag_name>-tmp"
     # and "<new_release_sha>". It will create the temporary tag.
-    time.sleep(0.1)
-    patch_release(repo_name, tag_name,
-                  tag_name=tmp_tag_name,
-                  target_commitish=new_release_sha,
-                  dry_run=dry_run)
+    _sleep(0.1, 'retarget')
+    release = patch_release(repo_name, tag_name,
+                            release=release,
+                            tag_name=tmp_tag_name,
+                            target_commitish=new_release_sha,
+                            dry_run=dry_run)
 
     # Now "<tag_name>-tmp" references "<new_release_sha>", remove "<tag_name>"
-    time.sleep(0.1)
+    _sleep(0.1, 'retarget')
     gh_ref_delete(repo_name, "refs/tags/%s" % tag_name, dry_run=dry_run)
 
     # Finally, update "<tag_name>-tmp" release by associating it with the
     # "<tag_name>" and "<new_release_sha>".
-    time.sleep(0.1)
+    _sleep(0.1, 'retarget')
     patch_release(repo_name, tmp_tag_name,
+                  release=release,
                   tag_name=tag_name,
                   target_commitish=new_release_sha,
                   dry_run=dry_run)
 
     # ... and remove "<tag_name>-tmp"
-    time.sleep(0.1)
+    _sleep(0.1, 'retarget')
     gh_ref_delete(repo_name,
                   "refs/tags/%s" % tmp_tag_name, dry_run=dry_run)
 
 
-def patch_release(repo_name, current_tag_name, **values):
+def patch_release(repo_name, current_tag_name, release=None, **values):
+    """Update the release associated with ``current_tag_name`` using
+    ``values`` and return the updated release.
+
+    ``release`` is the release to update. If not set, it is looked up.
+    """
     dry_run = values.get("dry_run", False)
     verbose = values.get("verbose", False)
-    release = get_release_info(repo_name, current_tag_name)
+    if release is None:
+        release = get_release_info(repo_name, current_tag_name)
     new_tag_name = values.get("tag_name", release["tag_name"])
 
     _update_release_sha(
         repo_name,
         new_tag_name,
         values.get("target_commitish", None),
-        dry_run
+        dry_run,
+        release=release if new_tag_name == release["tag_name"] else None
     )
 
     data = {
@@ -448,6 +1853,7 @@ def patch_release(repo_name, current_tag_name, **values):
 
     data.update(values)
 
+    updated_release = dict(release, **data)
     if not dry_run:
         url = github_api_url() + '/repos/{0}/releases/{1}'.format(
             repo_name, release['id'])
@@ -456,22 +1862,56 @@ def patch_release(repo_name, current_tag_name, **values):
             data=json.dumps(data),
             headers={'Content-Type': 'application/json'})
         response.raise_for_status()
+        updated_release = response.json()
+        _identity_map.add_release(repo_name, updated_release)
+        _identity_map.forget_refs(repo_name)
 
     # In case a new tag name was provided, remove the old one.
     if current_tag_name != data["tag_name"]:
         gh_ref_delete(
             repo_name, "refs/tags/%s" % current_tag_name,
             tags=True, verbose=verbose, dry_run=dry_run)
+    return updated_release
 
 
-def get_assets(repo_name, tag_name, verbose=False):
+def _iter_release_assets(repo_name, release):
+    """Yield assets associated with ``release`` page by page."""
+    return _iter_gh_items(
+        github_api_url() + '/repos/{0}/releases/{1}/assets'.format(
+            repo_name, release["id"]))
+
+
+def _get_release_assets(repo_name, release):
+    """Return list of assets associated with ``release``."""
+    return list(_iter_release_assets(repo_name, release))
+
+
+def _downloadable_assets(repo_name, release):
+    """Return assets of ``release`` identified by their REST API ``id``.
+
+    Assets listed using the GraphQL API have no ``id`` and their
+    ``browser_download_url`` does not accept API tokens for private
+    repositories, so they are listed again using the REST API.
+    """
+    if all(asset.get('id') is not None for asset in release['assets']):
+        return release['assets']
+    return _get_release_assets(repo_name, release)
+
+
+def iter_assets(repo_name, tag_name):
+    """Yield assets of release ``tag_name`` page by page.
+
+    Unlike :func:`get_assets`, pages are only requested as the assets
+    are consumed.
+    """
     release = get_release(repo_name, tag_name)
     if not release:
         raise Exception('Release with tag_name {0} not found'.format(tag_name))
+    return _iter_release_assets(repo_name, release)
 
-    assets = []
-    _recursive_gh_get(github_api_url() + '/repos/{0}/releases/{1}/assets'.format(
-        repo_name, release["id"]), assets)
+
+def get_assets(repo_name, tag_name, verbose=False):
+    assets = list(iter_assets(repo_name, tag_name))
 
     if verbose:
         for i, asset in enumerate(sorted(assets, key=lambda r: r['name'])):
@@ -481,13 +1921,15 @@ def get_assets(repo_name, tag_name, verbose=False):
 
 
 def get_asset_info(repo_name, tag_name, filename):
-    assets = get_assets(repo_name, tag_name)
+    assets = iter_assets(repo_name, tag_name)
     try:
         asset = next(a for a in assets if a['name'] == filename)
         return asset
     except StopIteration:
         raise Exception('Asset with filename {0} not found in '
                         'release with tag_name {1}'.format(filename, tag_name))
+    finally:
+        assets.close()
 
 
 @gh_release.command("list")
@@ -515,6 +1957,9 @@ def _cli_release_info(repo_name, tag_name):
 @click.option("--prerelease", is_flag=True, default=False)
 @click.option("--dry-run", is_flag=True, default=False)
 @click.option("--target-commitish")
+@click.option("--jobs", type=int, default=None,
+              help="Number of assets to upload concurrently "
+                   "(default: based on the number of assets).")
 @click.pass_obj
 def cli_release_create(*args, **kwargs):
     """Create a release"""
@@ -524,7 +1969,7 @@ def cli_release_create(*args, **kwargs):
 @_check_for_credentials
 def gh_release_create(repo_name, tag_name, asset_pattern=None, name=None, body=None,
                       publish=False, prerelease=False,
-                      target_commitish=None, dry_run=False):
+                      target_commitish=None, dry_run=False, jobs=None):
     if get_release(repo_name, tag_name) is not None:
         print('release %s: already exists\n' % tag_name)
         return
@@ -545,12 +1990,16 @@ def gh_release_create(repo_name, tag_name, asset_pattern=None, name=None, body=N
               data=json.dumps(data),
               headers={'Content-Type': 'application/json'})
         response.raise_for_status()
-        print_release_info(response.json(),
+        release = response.json()
+        _identity_map.add_release(repo_name, release)
+        _identity_map.forget_refs(repo_name)
+        print_release_info(release,
                            title="created '%s' release" % tag_name)
     else:
         print("created '%s' release (dry_run)" % tag_name)
     if asset_pattern:
-        gh_asset_upload(repo_name, tag_name, asset_pattern, dry_run=dry_run)
+        gh_asset_upload(repo_name, tag_name, asset_pattern, dry_run=dry_run,
+                        jobs=jobs)
 
 
 @gh_release.command("edit")
@@ -591,19 +2040,66 @@ def gh_release_edit(repo_name, current_tag_name,
 @click.option("--older-than", type=int, default=0)
 @click.option("--dry-run", is_flag=True, default=False)
 @click.option("--verbose", is_flag=True, default=False)
+@click.option("--jobs", type=int, default=None,
+              help="Number of releases to delete concurrently "
+                   "(default: based on the number of releases).")
+@click.option("--delete-tags", is_flag=True, default=False,
+              help="Also delete the tag associated with each release.")
 @click.pass_obj
 def _cli_release_delete(*args, **kwargs):
     """Delete selected release"""
     gh_release_delete(*args, **kwargs)
 
 
+def _delete_release(repo_name, release, delete_tag=False):
+    url = (github_api_url()
+           + '/repos/{0}/releases/{1}'.format(repo_name, release['id']))
+    response = _request('DELETE', url)
+    response.raise_for_status()
+    _identity_map.remove_release(repo_name, release)
+    if not delete_tag:
+        return
+    _identity_map.remove_ref(repo_name, 'refs/tags/%s' % release['tag_name'])
+    response = _request(
+        'DELETE', github_api_url() + '/repos/{0}/git/refs/tags/{1}'.format(
+            repo_name, quote(release['tag_name'])))
+    # Draft releases may not be associated with an existing tag
+    if response.status_code not in (404, 422):
+        response.raise_for_status()
+
+
+def _delete_releases(repo_name, releases, jobs=None, delete_tags=False):
+    """Delete ``releases`` using at most ``jobs`` concurrent requests.
+
+    If any deletion failed, an exception is raised after all the other
+    deletions completed.
+    """
+    if jobs is None:
+        jobs = _default_jobs(len(releases))
+    failures = []
+    for release, _, exc in _iter_concurrently(
+            lambda release: _delete_release(repo_name, release, delete_tags),
+            releases, jobs):
+        if exc is not None:
+            failures.append((release, exc))
+    print('deleted {0} of {1} release(s)'.format(
+        len(releases) - len(failures), len(releases)))
+    if failures:
+        print('failed to delete {0} release(s):'.format(len(failures)))
+        for release, exc in failures:
+            print('  {0}: {1}'.format(release['tag_name'], exc))
+        print('')
+        raise failures[0][1]
+
+
 @_check_for_credentials
 def gh_release_delete(repo_name, pattern, keep_pattern=None, release_type='all', older_than=0,
-                      dry_run=False, verbose=False):
-    releases = get_releases(repo_name)
+                      dry_run=False, verbose=False, jobs=None, delete_tags=False):
     candidates = []
-    # Get list of candidate releases
-    for release in releases:
+    # Get list of candidate releases. Releases are only deleted once all
+    # pages have been fetched: deleting them earlier would shift the
+    # content of the following pages and some releases would be skipped.
+    for release in iter_releases(repo_name):
         if not fnmatch.fnmatch(release['tag_name'], pattern):
             if verbose:
                 print('skipping release {0}: do not match {1}'.format(
@@ -629,13 +2125,10 @@ def gh_release_delete(repo_name, pattern, keep_pattern=None, release_type='all',
             continue
         candidates.append(release)
     for release in candidates:
-        print('deleting release {0}'.format(release['tag_name']))
-        if dry_run:
-            continue
-        url = (github_api_url()
-               + '/repos/{0}/releases/{1}'.format(repo_name, release['id']))
-        response = _request('DELETE', url)
-        response.raise_for_status()
+        print('deleting release {0}{1}'.format(
+            release['tag_name'], ' (and its tag)' if delete_tags else ''))
+    if not dry_run and candidates:
+        _delete_releases(repo_name, candidates, jobs, delete_tags)
     return len(candidates) > 0
 
 
@@ -701,7 +2194,7 @@ def gh_release_notes(repo_name, tag_name):
                 body = body.decode('utf-8')
         if release['body'] == body:
             return
-        patch_release(repo_name, tag_name, body=body)
+        patch_release(repo_name, tag_name, release=release, body=body)
     finally:
         os.remove(filename)
 
@@ -734,6 +2227,15 @@ def print_asset_info(i, asset, indent=""):
 @gh_asset.command("upload")
 @click.argument("tag_name")
 @click.argument("pattern", nargs=-1)
+@click.option("--jobs", type=int, default=None,
+              help="Number of assets to upload concurrently "
+                   "(default: based on the number of assets).")
+@click.option("--checksums", is_flag=True, default=False,
+              help="Upload a %s asset listing the SHA-256 checksums "
+                   "of the release assets." % CHECKSUMS_ASSET_NAME)
+@click.option("--sync", is_flag=True, default=False,
+              help="Replace existing assets whose content changed instead "
+                   "of skipping them.")
 @click.pass_obj
 def _cli_asset_upload(*args, **kwargs):
     """Upload release assets"""
@@ -741,100 +2243,373 @@ def _cli_asset_upload(*args, **kwargs):
 
 
 class _ProgressFileReader(object):
-    """Wrapper used to capture File IO read progress."""
+    """Wrapper used to capture File IO read progress and compute the
+    SHA-256 digest of the data read."""
     def __init__(self, stream, reporter):
         self._stream = stream
         self._reporter = reporter
+        self.sha256 = hashlib.sha256()
 
     def read(self, _size):
         _chunk = self._stream.read(_size)
         self._reporter.update(len(_chunk))
+        self.sha256.update(_chunk)
         return _chunk
 
+    def seek(self, offset, whence=os.SEEK_SET):
+        position = self._stream.seek(offset, whence)
+        if position == 0:
+            # Data is read again from the start (e.g. the request is resent)
+            self.sha256 = hashlib.sha256()
+        return position
+
     def __getattr__(self, attr):
         return getattr(self._stream, attr)
 
 
+class _MmapUploadBody(object):
+    """Upload body memory-mapping ``stream`` and yielding ``memoryview``
+    slices of at most ``chunk_size`` bytes, so that data is sent without
+    being copied.
+
+    Its length is known, allowing ``requests`` to set the ``Content-Length``
+    header. Like :class:`_ProgressFileReader`, progress is reported and the
+    SHA-256 digest of the data computed as slices are sent. Iterating again
+    (e.g. when the request is resent) starts over from the beginning.
+    """
+    def __init__(self, stream, reporter, chunk_size=UPLOAD_CHUNK_SIZE):
+        # Raise ValueError if the file is empty
+        self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        self._reporter = reporter
+        self._chunk_size = chunk_size
+        self.sha256 = hashlib.sha256()
+
+    def __len__(self):
+        return len(self._mmap)
+
+    def __iter__(self):
+        self.sha256 = hashlib.sha256()
+        view = memoryview(self._mmap)
+        for offset in range(0, len(view), self._chunk_size):
+            chunk = view[offset:offset + self._chunk_size]
+            self.sha256.update(chunk)
+            self._reporter.update(len(chunk))
+            yield chunk
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if (offset, whence) != (0, os.SEEK_SET):
+            raise ValueError("Upload body can only be rewound")
+        return 0
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Slices are still referenced: the mapping is closed once
+            # they are garbage collected
+            pass
+
+
+def _upload_body(stream, reporter):
+    """Return the body used to upload ``stream``.
+
+    Data is memory-mapped (see :class:`_MmapUploadBody`) unless the file is
+    empty or can not be mapped, in which case it is read.
+    """
+    try:
+        return _MmapUploadBody(stream, reporter)
+    except (OSError, ValueError):
+        return _ProgressFileReader(stream, reporter)
+
+
+def _asset_sha256(asset):
+    """Return the SHA-256 checksum of ``asset`` reported by GitHub, if any."""
+    digest = asset.get('digest') or ''
+    if not digest.startswith('sha256:'):
+        return None
+    return digest[len('sha256:'):]
+
+
+def _file_sha256(filename):
+    sha256 = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(REQ_BUFFER_SIZE), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _parse_checksums(text):
+    """Return the ``{name: checksum}`` dictionary listed in ``text`` using
+    the format of ``sha256sum``."""
+    checksums = {}
+    for line in text.splitlines():
+        fields = line.strip().split(None, 1)
+        if len(fields) == 2:
+            checksums[fields[1].lstrip('*')] = fields[0].lower()
+    return checksums
+
+
+def _format_checksums(checksums):
+    return ''.join('{0}  {1}\n'.format(checksums[name], name)
+                   for name in sorted(checksums))
+
+
+def _same_content(filename, asset, checksums=None):
+    """Return True if ``filename`` has the content of ``asset``.
+
+    Sizes are compared first, then SHA-256 checksums reported by GitHub or
+    listed in ``checksums``. If the checksum of the asset is unknown, the
+    content is considered different.
+    """
+    if os.path.getsize(filename) != asset['size']:
+        return False
+    expected = _asset_sha256(asset) or (checksums or {}).get(asset['name'])
+    return expected is not None and _file_sha256(filename) == expected
+
+
+def _delete_asset(repo_name, asset):
+    response = _request(
+        'DELETE', github_api_url() + '/repos/{0}/releases/assets/{1}'.format(
+            repo_name, asset['id']))
+    response.raise_for_status()
+
+
+def _read_asset(repo_name, asset):
+    """Return the content of ``asset``."""
+    response = _open_asset(repo_name, asset)
+    response.raise_for_status()
+    return response.content
+
+
+def _release_checksums(repo_name, assets):
+    """Return the checksums listed by the ``SHA256SUMS`` asset found in
+    ``assets``, or an empty dictionary."""
+    for asset in assets:
+        if asset['name'] == CHECKSUMS_ASSET_NAME and asset['state'] == 'uploaded':
+            return _parse_checksums(
+                _read_asset(repo_name, asset).decode('utf-8'))
+    return {}
+
+
+def _upload_checksums(repo_name, upload_url, filenames, assets, dry_run=False):
+    """Upload the ``SHA256SUMS`` asset listing the checksums of the release
+    assets named after ``filenames``.
+
+    Checksums listed by an existing ``SHA256SUMS`` asset are kept unless
+    the asset was uploaded again. Checksums already known, either reported
+    by GitHub or computed while uploading, are used instead of reading the
+    files again.
+    """
+    existing = assets.get(CHECKSUMS_ASSET_NAME)
+    checksums = _release_checksums(repo_name, [existing] if existing else [])
+    for filename in filenames:
+        name = os.path.basename(filename)
+        if name == CHECKSUMS_ASSET_NAME:
+            continue
+        checksum = _asset_sha256(assets.get(name) or {})
+        if checksum is None and name not in checksums and not dry_run:
+            checksum = _file_sha256(filename)
+        if checksum is not None:
+            checksums[name] = checksum
+    print("uploading %s (%s checksum(s))" % (
+        CHECKSUMS_ASSET_NAME, len(checksums)))
+    print("")
+    if dry_run:
+        return checksums
+    if existing is not None:
+        _delete_asset(repo_name, existing)
+    response = _request(
+        'POST', '{0}?name={1}'.format(upload_url, CHECKSUMS_ASSET_NAME),
+        headers={'Content-Type': 'text/plain'},
+        data=_format_checksums(checksums).encode('utf-8'))
+    response.raise_for_status()
+    assets[CHECKSUMS_ASSET_NAME] = response.json()
+    return checksums
+
+
 def _upload_release_file(
         repo_name, tag_name, upload_url, filename,
-        verbose=False, dry_run=False, retry=True):
+        verbose=False, dry_run=False, retry=True, reporter=None, echo=print,
+        assets=None, sync=False, checksums=None):
+    """Upload ``filename`` and return ``(already_uploaded, uploaded, data)``.
+
+    If ``reporter`` is set, progress is reported to it instead of a
+    reporter created for this file. Messages are displayed using ``echo``.
+
+    ``assets`` is an optional dictionary mapping names to the assets of the
+    release. It is used instead of listing the release assets and is
+    updated once the file is uploaded.
+
+    If ``sync`` is True, an existing asset is only skipped if it has the
+    same content (see :func:`_same_content`), and replaced otherwise.
+    ``checksums`` optionally maps asset names to their SHA-256 checksum.
+    """
     already_uploaded = False
     uploaded = False
     basename = os.path.basename(filename)
     # Sanity checks
-    assets = get_assets(repo_name, tag_name)
+    if assets is None:
+        assets = {asset["name"]: asset
+                  for asset in get_assets(repo_name, tag_name)}
     download_url = None
-    for asset in assets:
-        if asset["name"] == basename:
-            if asset["state"] == "uploaded":
-                download_url = asset["browser_download_url"]
-                break
-            # Remove asset that failed to upload
-            # See https://developer.github.com/v3/repos/releases/#response-for-upstream-failure  # noqa: E501
-            if asset["state"] == "new":
-                print("  deleting %s (invalid asset "
-                      "with state set to 'new')" % asset['name'])
-                url = (
-                    github_api_url()
-                    + '/repos/{0}/releases/assets/{1}'.format(
-                        repo_name, asset['id'])
-                )
-                response = _request('DELETE', url)
-                response.raise_for_status()
-
-    print("  uploading %s" % filename)
+    asset = assets.get(basename)
+    if asset is not None:
+        if (asset["state"] == "uploaded" and sync
+                and not _same_content(filename, asset, checksums)):
+            echo("  replacing %s (content changed)" % asset['name'])
+            if not dry_run:
+                _delete_asset(repo_name, asset)
+            del assets[basename]
+        elif asset["state"] == "uploaded":
+            download_url = asset["browser_download_url"]
+        # Remove asset that failed to upload
+        # See https://developer.github.com/v3/repos/releases/#response-for-upstream-failure  # noqa: E501
+        elif asset["state"] == "new":
+            echo("  deleting %s (invalid asset "
+                 "with state set to 'new')" % asset['name'])
+            _delete_asset(repo_name, asset)
+            del assets[basename]
+
+    echo("  uploading %s" % filename)
 
     # Skip if an asset with same name has already been uploaded
     # Trying to upload would give a HTTP error 422
     if download_url:
         already_uploaded = True
-        print("  skipping (asset with same name already exists)")
-        print("  download_url: %s" % download_url)
-        print("")
+        echo("  skipping (asset with same %s already exists)" % (
+            "content" if sync else "name"))
+        echo("  download_url: %s" % download_url)
+        echo("")
         return already_uploaded, uploaded, {}
     if dry_run:
         uploaded = True
-        print("  download_url: Unknown (dry_run)")
-        print("")
+        echo("  download_url: Unknown (dry_run)")
+        echo("")
         return already_uploaded, uploaded, {}
 
     url = '{0}?name={1}'.format(upload_url, basename)
-    if verbose and not progress_reporter_cls.reportProgress:
-        print("  upload_url: %s" % url)
+    if verbose and not _reports_progress():
+        echo("  upload_url: %s" % url)
     file_size = os.path.getsize(filename)
 
     # Attempt upload
+    file_reporter = reporter
+    if file_reporter is None:
+        file_reporter = progress_reporter_cls(label=basename, length=file_size)
     with open(filename, 'rb') as f:
-        with progress_reporter_cls(
-                label=basename, length=file_size) as reporter:
+        with file_reporter, closing(_upload_body(f, file_reporter)) as body:
             response = _request(
                 'POST', url,
                 headers={'Content-Type': 'application/octet-stream'},
-                data=_ProgressFileReader(f, reporter))
-            data = response.json()
+                data=body)
 
     if response.status_code == 502 and retry:
-        print("  retrying (upload failed with status_code=502)")
-        already_uploaded, uploaded, data = _upload_release_file(
+        echo("  retrying (upload failed with status_code=502)")
+        # Assets are listed again to find the one that failed to upload
+        result = _upload_release_file(
             repo_name, tag_name, upload_url, filename,
-            verbose=verbose, retry=False)
-    else:
-        response.raise_for_status()
-    asset = data
-    print("  download_url: %s" % asset["browser_download_url"])
-    print("")
+            verbose=verbose, retry=False, reporter=reporter, echo=echo,
+            sync=sync, checksums=checksums)
+        if result[2]:
+            assets[basename] = result[2]
+        return result
+    response.raise_for_status()
+    asset = response.json()
+    sha256 = body.sha256.hexdigest()
+    reported_sha256 = _asset_sha256(asset)
+    if reported_sha256 not in (None, sha256):
+        raise Exception(
+            'Failed to upload {0}: SHA-256 checksum reported by GitHub {1} '
+            'does not match {2}'.format(filename, reported_sha256, sha256))
+    asset.setdefault('digest', 'sha256:' + sha256)
+    assets[basename] = asset
+    echo("  download_url: %s" % asset["browser_download_url"])
+    echo("  sha256: %s" % sha256)
+    echo("")
     uploaded = True
-    return already_uploaded, uploaded, response.json()
+    return already_uploaded, uploaded, asset
+
+
+def _upload_release_files(repo_name, tag_name, upload_url, filenames,
+                          verbose=False, dry_run=False, jobs=None, assets=None,
+                          sync=False, checksums=None):
+    """Upload ``filenames`` using at most ``jobs`` concurrent uploads.
+
+    ``assets`` is a dictionary mapping names to the assets of the release
+    shared by all uploads. ``sync`` and ``checksums`` are passed to each
+    upload (see :func:`_upload_release_file`).
+
+    Return a list of ``(filename, already_uploaded, uploaded, data)`` tuples.
+    If any upload failed, an exception is raised after all the other
+    uploads completed.
+    """
+    if jobs is None:
+        jobs = _default_jobs(len(filenames))
+    if jobs <= 1:
+        return [(filename,) + _upload_release_file(
+                    repo_name, tag_name, upload_url, filename,
+                    verbose, dry_run, assets=assets,
+                    sync=sync, checksums=checksums)
+                for filename in filenames]
+
+    total_size = sum(os.path.getsize(filename) for filename in filenames)
+    label = "%s asset(s)" % len(filenames)
+    outputs = {filename: [] for filename in filenames}
+    results = []
+    failures = []
+    deferred_output = []
+    with progress_reporter_cls(label=label, length=total_size) as reporter:
+        shared_reporter = _SharedProgressReporter(reporter)
+
+        def upload(filename):
+            output = outputs[filename]
+            return _upload_release_file(
+                repo_name, tag_name, upload_url, filename,
+                verbose, dry_run, reporter=shared_reporter,
+                echo=lambda *args: output.append(" ".join(args)),
+                assets=assets, sync=sync, checksums=checksums)
+
+        for filename, result, exc in _iter_concurrently(upload, filenames, jobs):
+            output = outputs[filename]
+            if exc is not None:
+                output.extend(["  failed: %s" % exc, ""])
+                failures.append((filename, exc))
+            else:
+                results.append((filename,) + result)
+            # Avoid interleaving messages with the progress bar
+            if _reports_progress():
+                deferred_output.extend(output)
+            else:
+                print("\n".join(output))
+    if deferred_output:
+        print("\n".join(deferred_output))
+
+    if failures:
+        print("failed to upload %s of %s '%s' release asset(s):" % (
+            len(failures), len(filenames), tag_name))
+        for filename, exc in failures:
+            print("  %s" % filename)
+        print("")
+        raise failures[0][1]
+    return results
 
 
 @_check_for_credentials
-def gh_asset_upload(repo_name, tag_name, pattern, dry_run=False, verbose=False):
+def gh_asset_upload(repo_name, tag_name, pattern, dry_run=False, verbose=False,
+                    jobs=None, checksums=False, sync=False):
+    # Lookup release and its assets once for all the uploads
     if not dry_run:
-        upload_url = get_release_info(repo_name, tag_name)["upload_url"]
+        release = get_release_info(repo_name, tag_name)
+        upload_url = release["upload_url"]
         if "{" in upload_url:
             upload_url = upload_url[:upload_url.index("{")]
     else:
+        release = get_release(repo_name, tag_name)
         upload_url = "unknown"
+    assets = {}
+    if release is not None:
+        assets = {asset["name"]: asset
+                  for asset in _get_release_assets(repo_name, release)}
 
     # Raise exception if no token is specified AND netrc file is found
     # BUT only api.github.com is specified. See #17
@@ -856,22 +2631,40 @@ def gh_asset_upload(repo_name, tag_name, pattern, dry_run=False, verbose=False):
         filenames = glob.glob(pattern)
     else:
         filenames = []
+    filenames = sorted(filenames)
 
     if len(filenames) > 0:
         print("uploading '%s' release asset(s) "
               "(found %s):" % (tag_name, len(filenames)))
 
-    uploaded = False
-    already_uploaded = False
-
-    for filename in filenames:
-        already_uploaded, uploaded, _ = _upload_release_file(
-            repo_name, tag_name, upload_url, filename, verbose, dry_run)
+    known_checksums = None
+    if sync:
+        # Checksums not reported by GitHub may be listed by a SHA256SUMS asset
+        known_checksums = _release_checksums(repo_name, assets.values())
+
+    results = _upload_release_files(
+        repo_name, tag_name, upload_url, filenames,
+        verbose=verbose, dry_run=dry_run, jobs=jobs, assets=assets,
+        sync=sync, checksums=known_checksums)
+
+    if sync:
+        unchanged = [filename for filename, already_uploaded, _, _ in results
+                     if already_uploaded]
+        print("skipped %s unchanged asset(s) (%s bytes saved)" % (
+            len(unchanged), sum(os.path.getsize(f) for f in unchanged)))
+        print("")
 
-    if not uploaded and not already_uploaded:
+    if not any(uploaded or already_uploaded
+               for _, already_uploaded, uploaded, _ in results):
         print("skipping upload of '%s' release assets ("
               "no files match pattern(s): %s)" % (tag_name, pattern))
         print("")
+    elif checksums or (sync and CHECKSUMS_ASSET_NAME in assets and any(
+            uploaded for _, _, uploaded, _ in results)):
+        # Downloads are verified against the checksums of an existing
+        # SHA256SUMS asset, which must list those of the replaced assets.
+        _upload_checksums(
+            repo_name, upload_url, filenames, assets, dry_run=dry_run)
 
 
 @gh_asset.command("delete")
@@ -943,55 +2736,525 @@ def gh_asset_delete(repo_name, tag_name, pattern,
 @gh_asset.command("download")
 @click.argument("tag_name")
 @click.argument("pattern", required=False)
+@click.option("--jobs", type=int, default=None,
+              help="Number of assets to download concurrently "
+                   "(default: based on the number of assets).")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=REQ_BUFFER_SIZE,
+              help="Size in bytes of the buffer data is read into "
+                   "(default: %d)." % REQ_BUFFER_SIZE)
+@click.option("--durable", is_flag=True, default=False,
+              help="Flush downloaded files to disk before renaming them.")
+@click.option("--output-dir", type=click.Path(file_okay=False), default=None,
+              help="Directory assets are downloaded to "
+                   "(default: current directory).")
+@click.option("--template", default='{name}', callback=_validate_template,
+              help="Path of each asset relative to the output directory, "
+                   "using {repo_name}, {tag_name} and {name} fields "
+                   "(default: {name}).")
+@click.option("--index", type=click.Path(dir_okay=False), default=None,
+              help="JSON file listing the downloaded assets.")
 @click.pass_obj
 def _cli_asset_download(*args, **kwargs):
     """Download release assets"""
     gh_asset_download(*args, **kwargs)
 
 
-def _download_file(repo_name, asset):
+def _open_asset(repo_name, asset, offset=0):
+    """Return the streamed response downloading ``asset`` from ``offset``.
+    """
+    headers = {'Accept': 'application/octet-stream'}
+    if offset:
+        headers['Range'] = 'bytes=%s-' % offset
+    if asset.get('id') is not None:
+        url = github_api_url() + '/repos/{0}/releases/assets/{1}'.format(
+            repo_name, asset['id'])
+    else:
+        url = asset['browser_download_url']
     response = _request(
         method='GET',
-        url=github_api_url() + '/repos/{0}/releases/assets/{1}'.format(
-            repo_name, asset['id']),
+        url=url,
         allow_redirects=False,
-        headers={'Accept': 'application/octet-stream'},
+        headers=headers,
         stream=True)
     while response.status_code == 302:
+        # Release the connection back to the pool before following
+        response.close()
         response = _request(
             'GET', response.headers['Location'], allow_redirects=False,
             stream=True,
+            headers={'Range': headers['Range']} if offset else None,
             with_auth=False
         )
-    with open(asset['name'], 'w+b') as f:
-        with progress_reporter_cls(
-                label=asset['name'], length=asset['size']) as reporter:
-            for chunk in response.iter_content(chunk_size=REQ_BUFFER_SIZE):
+    return response
+
+
+def _preallocate(f, offset, length):
+    """Reserve ``length`` bytes of ``f`` from ``offset``, if supported."""
+    if length > 0 and hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), offset, length)
+        except OSError:
+            # Not supported by the file system
+            pass
+
+
+def _fsync_directory(path):
+    """Flush the entry of ``path`` in its directory to disk, if supported."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _iter_response_into(response, buffer):
+    """Yield views of ``buffer`` successively filled with the body of
+    ``response``.
+
+    Data is read directly into ``buffer`` unless the body has to be
+    decoded, in which case decoded chunks are yielded instead.
+    """
+    raw = response.raw
+    if (getattr(raw, 'readinto', None) is None
+            or response.headers.get('Content-Encoding', 'identity') != 'identity'):
+        for chunk in response.iter_content(chunk_size=len(buffer)):
+            yield chunk
+        return
+    view = memoryview(buffer)
+    while True:
+        count = raw.readinto(view)
+        if not count:
+            return
+        yield view[:count]
+
+
+def _write_download(response, filename, offset, size, reporter, checksum,
+                    chunk_size=REQ_BUFFER_SIZE, durable=False):
+    """Write the body of ``response`` into ``filename`` from ``offset`` and
+    return the resulting size of the file.
+
+    The file is preallocated to ``size`` bytes and data is read into a
+    single buffer of ``chunk_size`` bytes. If ``durable`` is True, data is
+    flushed to disk before returning.
+    """
+    buffer = bytearray(chunk_size)
+    with open(filename, 'r+b' if offset else 'wb') as f:
+        f.seek(offset)
+        _preallocate(f, offset, size - offset)
+        try:
+            for chunk in _iter_response_into(response, buffer):
                 reporter.update(len(chunk))
+                checksum.update(chunk)
                 f.write(chunk)
+        finally:
+            # Release the space not written so that the size of the file
+            # remains the offset to resume the download from
+            f.truncate(f.tell())
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+        return f.tell()
+
+
+def _download_file(repo_name, asset, reporter=None, resume=True, sha256=None,
+                   chunk_size=REQ_BUFFER_SIZE, durable=False, path=None):
+    """Download ``asset`` into ``path``, defaulting to ``asset['name']``.
+
+    Data is written into a ``<path>.part`` temporary file renamed once the
+    download completed and its size matches ``asset['size']``. If such a
+    temporary file already exists, the download is resumed using a
+    ``Range`` request. See :func:`_write_download` for ``chunk_size``
+    and ``durable``, which also ensures the rename is flushed to disk.
+
+    The SHA-256 checksum of the data is computed while it is written and
+    compared with the checksum GitHub computed from the stored data or, if
+    GitHub reports none, with ``sha256`` (e.g. listed by a ``SHA256SUMS``
+    asset, which may be stale). The temporary file is removed if they
+    differ.
+
+    If ``reporter`` is set, progress is reported to it instead of a
+    reporter created for this file.
+    """
+    filename = path or asset['name']
+    part_filename = filename + '.part'
+    if os.path.dirname(filename):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    offset = 0
+    if os.path.exists(part_filename):
+        offset = os.path.getsize(part_filename)
+        if offset >= asset['size']:
+            # Size is already complete or larger: content can not be trusted
+            offset = 0
+    response = _open_asset(repo_name, asset, offset)
+    if response.status_code == 416 and resume:
+        # Range not satisfiable: restart from scratch
+        response.close()
+        os.remove(part_filename)
+        return _download_file(
+            repo_name, asset, reporter, resume=False, sha256=sha256,
+            chunk_size=chunk_size, durable=durable, path=path)
+    response.raise_for_status()
+    if response.status_code != 206:
+        offset = 0
+
+    checksum = hashlib.sha256()
+    if offset:
+        with open(part_filename, 'rb') as f:
+            for block in iter(lambda: f.read(REQ_BUFFER_SIZE), b''):
+                checksum.update(block)
+    file_reporter = reporter
+    if file_reporter is None:
+        file_reporter = progress_reporter_cls(
+            label=filename, length=asset['size'])
+    with file_reporter:
+        file_reporter.update(offset)
+        size = _write_download(
+            response, part_filename, offset, asset['size'], file_reporter,
+            checksum, chunk_size=chunk_size, durable=durable)
+
+    if size != asset['size']:
+        if size > asset['size']:
+            os.remove(part_filename)
+        raise Exception(
+            'Failed to download {0}: expected {1} bytes, got {2}'.format(
+                filename, asset['size'], size))
+    expected = _asset_sha256(asset) or sha256
+    if expected is not None and checksum.hexdigest() != expected:
+        os.remove(part_filename)
+        raise Exception(
+            'Failed to download {0}: expected SHA-256 checksum {1}, '
+            'got {2}'.format(filename, expected, checksum.hexdigest()))
+    os.replace(part_filename, filename)
+    if durable:
+        _fsync_directory(filename)
+
+
+def _download_files(repo_name, downloads, jobs=None, checksums=None,
+                    chunk_size=REQ_BUFFER_SIZE, durable=False):
+    """Download ``(asset, path)`` pairs listed in ``downloads`` using at most
+    ``jobs`` concurrent downloads.
+
+    ``checksums`` is an optional dictionary mapping paths to the expected
+    SHA-256 checksum of their asset. ``chunk_size`` and ``durable`` are
+    passed to each download (see :func:`_download_file`).
+
+    If any download failed, an exception is raised after all the other
+    downloads completed.
+    """
+    checksums = checksums or {}
+    if jobs is None:
+        jobs = _default_jobs(len(downloads))
+    if jobs <= 1:
+        for asset, path in downloads:
+            _download_file(
+                repo_name, asset, sha256=checksums.get(path),
+                chunk_size=chunk_size, durable=durable, path=path)
+        return
 
+    total_size = sum(asset['size'] for asset, _ in downloads)
+    label = "%s asset(s)" % len(downloads)
+    failures = []
+    with progress_reporter_cls(label=label, length=total_size) as reporter:
+        shared_reporter = _SharedProgressReporter(reporter)
+
+        def download(item):
+            asset, path = item
+            _download_file(repo_name, asset, reporter=shared_reporter,
+                           sha256=checksums.get(path),
+                           chunk_size=chunk_size, durable=durable, path=path)
+
+        for item, _, exc in _iter_concurrently(download, downloads, jobs):
+            if exc is not None:
+                failures.append((item[1], exc))
+
+    if failures:
+        print("failed to download %s of %s asset(s):" % (
+            len(failures), len(downloads)))
+        for path, exc in failures:
+            print("  %s: %s" % (path, exc))
+        print("")
+        raise failures[0][1]
 
-def gh_asset_download(repo_name, tag_name=None, pattern=None):
-    releases = get_releases(repo_name)
-    downloaded = 0
-    for release in releases:
+
+def _asset_path(output_dir, template, repo_name, release, asset):
+    """Return the path ``asset`` of ``release`` is downloaded to.
+
+    ``template`` is formatted using the ``repo_name``, ``tag_name`` and
+    ``name`` fields, and the resulting path must be inside ``output_dir``.
+    """
+    relative_path = template.format(
+        repo_name=repo_name, tag_name=release['tag_name'], name=asset['name'])
+    path = os.path.normpath(os.path.join(output_dir, relative_path))
+    root = os.path.abspath(output_dir)
+    absolute_path = os.path.abspath(path)
+    if (os.path.isabs(relative_path) or absolute_path == root
+            or os.path.commonpath([root, absolute_path]) != root):
+        raise ValueError(
+            "Path {0} of asset {1} (release {2}) is outside of {3}".format(
+                relative_path, asset['name'], release['tag_name'], output_dir))
+    return path
+
+
+def _write_download_index(index, output_dir, repo_name, entries, checksums):
+    """Write the JSON ``index`` file listing the assets of ``entries``, a
+    dictionary mapping paths to ``(release, asset)`` pairs, found at their
+    path with the expected size."""
+    assets = []
+    for path in sorted(entries):
+        release, asset = entries[path]
+        if not (os.path.exists(path) and os.path.getsize(path) == asset['size']):
+            continue
+        assets.append({
+            "repo_name": repo_name,
+            "tag_name": release['tag_name'],
+            "name": asset['name'],
+            "id": asset.get('id'),
+            "size": asset['size'],
+            "sha256": _asset_sha256(asset) or checksums.get(path),
+            "path": os.path.relpath(path, output_dir).replace(os.sep, '/'),
+        })
+    _write_json(index, {"assets": assets})
+
+
+def _write_json(path, data):
+    """Write ``data`` as JSON into ``path`` using a temporary file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def gh_asset_download(repo_name, tag_name=None, pattern=None, jobs=None,
+                      chunk_size=REQ_BUFFER_SIZE, durable=False,
+                      output_dir=None, template='{name}', index=None):
+    """Download the assets matching ``pattern`` of the releases matching
+    ``tag_name`` and return the number of downloaded assets.
+
+    Each asset is written to the path obtained by formatting ``template``
+    (see :func:`_asset_path`) in ``output_dir``, defaulting to the current
+    directory. If ``index`` is set, a JSON file listing the assets found at
+    their path is written there once done.
+    """
+    output_dir = output_dir or os.curdir
+    downloads = []
+    selected = {}
+    checksums = {}
+    entries = {}
+    for release in iter_releases(repo_name):
         if tag_name and not fnmatch.fnmatch(release['tag_name'], tag_name):
             continue
-        for asset in release['assets']:
+        selected_count = len(downloads)
+        assets = _downloadable_assets(repo_name, release)
+        for asset in assets:
             if pattern and not fnmatch.fnmatch(asset['name'], pattern):
                 continue
-            if os.path.exists(asset['name']):
-                absolute_path = os.path.abspath(asset['name'])
+            path = _asset_path(output_dir, template, repo_name, release, asset)
+            if path in selected:
+                print('release {0}: '
+                      'skipping {1}: '
+                      'already downloading it from release {2}'.format(
+                        release['tag_name'], path, selected[path]))
+                continue
+            entries.setdefault(path, (release, asset))
+            if os.path.exists(path) and os.path.getsize(path) == asset['size']:
                 print('release {0}: '
                       'skipping {1}: '
                       'found {2}'.format(
-                        release['tag_name'], asset['name'], absolute_path))
+                        release['tag_name'], path, os.path.abspath(path)))
                 continue
             print('release {0}: '
-                  'downloading {1}'.format(release['tag_name'], asset['name']))
-            _download_file(repo_name, asset)
-            downloaded += 1
-    return downloaded
+                  'downloading {1}'.format(release['tag_name'], path))
+            selected[path] = release['tag_name']
+            downloads.append((asset, path))
+        if len(downloads) > selected_count:
+            # Verify downloads against the checksums listed by the release
+            release_checksums = _release_checksums(repo_name, assets)
+            for asset, path in downloads[selected_count:]:
+                if asset['name'] in release_checksums:
+                    checksums[path] = release_checksums[asset['name']]
+    try:
+        _download_files(repo_name, downloads, jobs=jobs, checksums=checksums,
+                        chunk_size=chunk_size, durable=durable)
+    finally:
+        if index is not None:
+            _write_download_index(
+                index, output_dir, repo_name, entries, checksums)
+    return len(downloads)
+
+
+@gh_asset.command("mirror")
+@click.argument("output_dir", type=click.Path(file_okay=False))
+@click.option("--tag-name", default=None,
+              help="Only mirror releases matching this pattern.")
+@click.option("--pattern", default=None,
+              help="Only mirror assets matching this pattern.")
+@click.option("--template", default='{tag_name}/{name}',
+              callback=_validate_template,
+              help="Path of each asset relative to the output directory, "
+                   "using {repo_name}, {tag_name} and {name} fields "
+                   "(default: {tag_name}/{name}).")
+@click.option("--jobs", type=int, default=None,
+              help="Number of assets to download concurrently "
+                   "(default: based on the number of assets).")
+@click.option("--prune/--no-prune", default=True,
+              help="Remove assets deleted from the repository (default: yes).")
+@click.pass_obj
+def _cli_asset_mirror(*args, **kwargs):
+    """Mirror release assets into OUTPUT_DIR"""
+    gh_asset_mirror(*args, **kwargs)
+
+
+def _asset_key(asset):
+    """Return the key identifying ``asset`` in the state of a mirror."""
+    if asset.get('id') is not None:
+        return str(asset['id'])
+    return asset['browser_download_url']
+
+
+def _listed_asset_key(keys, release, asset):
+    """Return the key of ``asset`` of ``release``, looking up assets listed
+    without id (see :func:`_graphql_asset`) by release and name in
+    ``keys``."""
+    if asset.get('id') is None:
+        return keys.get((release['id'], asset['name']), _asset_key(asset))
+    return _asset_key(asset)
+
+
+def _load_mirror_state(path):
+    """Return the dictionary of mirrored assets stored in ``path``."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('assets', {})
+
+
+def _remove_mirrored_file(output_dir, entry):
+    path = os.path.join(output_dir, entry['path'])
+    if os.path.exists(path):
+        os.remove(path)
+    try:
+        # Remove directories left empty, the state file keeping output_dir
+        os.removedirs(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+def _mirror_entry(output_dir, release, asset, path):
+    return {
+        "release_id": release.get('id'),
+        "tag_name": release['tag_name'],
+        "name": asset['name'],
+        "size": asset['size'],
+        "updated_at": asset.get('updated_at'),
+        "sha256": _asset_sha256(asset),
+        "path": os.path.relpath(path, output_dir).replace(os.sep, '/'),
+    }
+
+
+def _is_mirrored(entry, previous_entry, path):
+    """Return True if ``path`` has the content of the asset described by
+    ``entry`` according to the entry of the previous mirror."""
+    if previous_entry is None:
+        return False
+    for key in ('size', 'updated_at', 'path'):
+        if entry[key] != previous_entry.get(key):
+            return False
+    return os.path.exists(path) and os.path.getsize(path) == entry['size']
+
+
+def gh_asset_mirror(repo_name, output_dir, tag_name=None, pattern=None,
+                    template='{tag_name}/{name}', jobs=None, prune=True):
+    """Mirror the assets matching ``pattern`` of the releases matching
+    ``tag_name`` into ``output_dir``.
+
+    Mirrored assets are tracked in a ``MIRROR_STATE_NAME`` file along with
+    their size and update date, so that only new or updated assets are
+    downloaded, and mirroring an unchanged repository only requires one
+    request per page of releases. If the response cache is enabled (it is
+    disabled by default, see :func:`set_http_cache`), these listings are
+    revalidated and do not count against the rate limit. If ``prune`` is
+    True, assets deleted from the repository are removed, unless an asset
+    mirrored at the same path replaced them.
+
+    Return a ``(downloaded, unchanged, pruned)`` tuple of asset counts.
+    """
+    state_path = os.path.join(output_dir, MIRROR_STATE_NAME)
+    previous_state = _load_mirror_state(state_path)
+    state = {}
+    found = set()
+    pending = []
+    checksums = {}
+    unchanged = 0
+    # Keys of the assets listed without id (see _graphql_asset)
+    keys = {(entry.get('release_id'), entry['name']): key
+            for key, entry in previous_state.items()}
+    for release in iter_releases(repo_name):
+        if tag_name and not fnmatch.fnmatch(release['tag_name'], tag_name):
+            found.update(_listed_asset_key(keys, release, asset)
+                         for asset in release['assets'])
+            continue
+        assets = _downloadable_assets(repo_name, release)
+        found.update(_asset_key(asset) for asset in assets)
+        pending_count = len(pending)
+        for asset in assets:
+            if pattern and not fnmatch.fnmatch(asset['name'], pattern):
+                continue
+            key = _asset_key(asset)
+            path = _asset_path(output_dir, template, repo_name, release, asset)
+            entry = _mirror_entry(output_dir, release, asset, path)
+            if _is_mirrored(entry, previous_state.get(key), path):
+                state[key] = previous_state[key]
+                unchanged += 1
+                continue
+            print('release {0}: downloading {1}'.format(
+                release['tag_name'], path))
+            pending.append((key, entry, asset, path))
+        if len(pending) > pending_count:
+            release_checksums = _release_checksums(repo_name, assets)
+            for _, entry, asset, path in pending[pending_count:]:
+                checksums[path] = release_checksums.get(asset['name'])
+                entry['sha256'] = entry['sha256'] or checksums[path]
+
+    # Keep tracking assets excluded by the patterns
+    for key, previous_entry in previous_state.items():
+        if key in found and key not in state:
+            state[key] = previous_entry
+    pruned = 0
+    try:
+        _download_files(
+            repo_name, [(asset, path) for _, _, asset, path in pending],
+            jobs=jobs, checksums=checksums)
+    finally:
+        for key, entry, asset, path in pending:
+            if os.path.exists(path) and os.path.getsize(path) == asset['size']:
+                previous_entry = state.get(key)
+                if previous_entry and previous_entry['path'] != entry['path']:
+                    _remove_mirrored_file(output_dir, previous_entry)
+                state[key] = entry
+        # Paths of assets replaced by an asset with the same name (e.g.
+        # using ``asset upload --sync``) now belong to the new asset.
+        paths = set(entry['path'] for entry in state.values())
+        paths.update(entry['path'] for _, entry, _, _ in pending)
+        for key in set(previous_state) - found:
+            if previous_state[key]['path'] in paths:
+                continue
+            if prune:
+                print('pruning {0}'.format(previous_state[key]['path']))
+                _remove_mirrored_file(output_dir, previous_state[key])
+                pruned += 1
+            else:
+                state[key] = previous_state[key]
+        _write_json(state_path, {"repo_name": repo_name, "assets": state})
+    print('mirrored {0} asset(s): {1} downloaded, {2} unchanged, '
+          '{3} pruned'.format(len(state), len(pending), unchanged, pruned))
+    return len(pending), unchanged, pruned
 
 
 @gh_asset.command("list")
@@ -1018,43 +3281,90 @@ def print_ref_info(ref, indent=""):
     print("")
 
 
-def get_refs(repo_name, tags=None, pattern=None):
+def _pattern_prefix(pattern):
+    """Return the part of ``pattern`` preceding its first wildcard."""
+    for index, char in enumerate(pattern):
+        if char in '*?[':
+            return pattern[:index]
+    return pattern
+
+
+def _iter_matching_refs(repo_name, tags, pattern):
+    """Yield references matching ``pattern`` starting with ``refs/``.
+
+    A literal pattern is looked up using the ``git/ref/<ref>`` endpoint and
+    a pattern starting with a literal prefix using the
+    ``git/matching-refs/<prefix>`` endpoint.
+    """
+    prefix = _pattern_prefix(pattern)
+    if prefix == pattern and _identity_map.ref(repo_name, pattern) is not None:
+        refs = [_identity_map.ref(repo_name, pattern)]
+    elif prefix == pattern:
+        response = _request(
+            'GET', github_api_url() + '/repos/{0}/git/ref/{1}'.format(
+                repo_name, quote(pattern[len("refs/"):])))
+        if response.status_code == 404:
+            return
+        response.raise_for_status()
+        refs = response.json()
+        if isinstance(refs, dict):
+            refs = [refs]
+            _identity_map.add_ref(repo_name, refs[0])
+    else:
+        refs = _iter_gh_items(
+            github_api_url() + '/repos/{0}/git/matching-refs/{1}'.format(
+                repo_name, quote(prefix[len("refs/"):])))
+    for ref in refs:
+        if tags and not ref['ref'].startswith("refs/tags"):
+            continue
+        if fnmatch.fnmatch(ref['ref'], pattern):
+            yield ref
+
 
-    refs = []
-    _recursive_gh_get(
-        github_api_url() + '/repos/{0}/git/refs'.format(repo_name), refs)
+def iter_refs(repo_name, tags=None, pattern=None):
+    """Yield references page by page.
+
+    Unlike :func:`get_refs`, pages are only requested as the references
+    are consumed.
+
+    If ``pattern`` starts with ``refs/<...>``, only the references
+    sharing its literal prefix are requested.
+    """
+    if (pattern is not None and pattern.startswith("refs/")
+            and len(_pattern_prefix(pattern)) > len("refs/")):
+        for ref in _iter_matching_refs(repo_name, tags, pattern):
+            yield ref
+        return
 
     # If "tags" is True, keep only "refs/tags/*"
-    data = refs
-    if tags:
-        tag_names = []
-        data = []
-        for ref in refs:
-            if ref['ref'].startswith("refs/tags"):
-                data.append(ref)
-                tag_names.append(ref["ref"])
+    tag_names = set()
+    for ref in _iter_gh_items(
+            github_api_url() + '/repos/{0}/git/refs'.format(repo_name)):
+        if tags:
+            if not ref['ref'].startswith("refs/tags"):
+                continue
+            tag_names.add(ref["ref"])
+        # If "pattern" is not None, select only matching references
+        if pattern is None or fnmatch.fnmatch(ref['ref'], pattern):
+            yield ref
 
+    if tags:
         try:
-            tags = []
-            _recursive_gh_get(
-                github_api_url() + '/repos/{0}/git/refs/tags'.format(repo_name), tags)
-            for ref in tags:
-                if ref["ref"] not in tag_names:
-                    data.append(ref)
+            for ref in _iter_gh_items(
+                    github_api_url() + '/repos/{0}/git/refs/tags'.format(
+                        repo_name)):
+                if ref["ref"] in tag_names:
+                    continue
+                if pattern is None or fnmatch.fnmatch(ref['ref'], pattern):
+                    yield ref
         except requests.exceptions.HTTPError as exc_info:
             response = exc_info.response
             if response.status_code != 404:
                 raise
 
-    # If "pattern" is not None, select only matching references
-    filtered_data = data
-    if pattern is not None:
-        filtered_data = []
-        for ref in data:
-            if fnmatch.fnmatch(ref['ref'], pattern):
-                filtered_data.append(ref)
 
-    return filtered_data
+def get_refs(repo_name, tags=None, pattern=None):
+    return list(iter_refs(repo_name, tags=tags, pattern=pattern))
 
 
 @gh_ref.command("list")
@@ -1097,6 +3407,7 @@ def gh_ref_create(repo_name, reference, sha):
           data=json.dumps(data),
           headers={'Content-Type': 'application/json'})
     response.raise_for_status()
+    _identity_map.add_ref(repo_name, response.json())
     print_ref_info(response.json())
 
 
@@ -1116,8 +3427,11 @@ def _cli_ref_delete(*args, **kwargs):
 def gh_ref_delete(repo_name, pattern, keep_pattern=None, tags=False,
                   dry_run=False, verbose=False):
     removed_refs = []
-    refs = get_refs(repo_name, tags=tags)
-    for ref in refs:
+    # References are only deleted once all pages have been fetched: deleting
+    # them earlier would shift the content of the following pages.
+    # Unless skipped references are reported, only matching ones are listed.
+    for ref in iter_refs(repo_name, tags=tags,
+                         pattern=None if verbose else pattern):
         if not fnmatch.fnmatch(ref['ref'], pattern):
             if verbose:
                 print('skipping reference {0}: '
@@ -1126,17 +3440,175 @@ def gh_ref_delete(repo_name, pattern, keep_pattern=None, tags=False,
         if keep_pattern is not None:
             if fnmatch.fnmatch(ref['ref'], keep_pattern):
                 continue
-        print('deleting reference {0}'.format(ref['ref']))
         removed_refs.append(ref['ref'])
+    for ref in removed_refs:
+        print('deleting reference {0}'.format(ref))
         if dry_run:
             continue
+        _identity_map.remove_ref(repo_name, ref)
         response = _request(
             'DELETE',
-            github_api_url() + '/repos/{0}/git/{1}'.format(repo_name, ref['ref']))
+            github_api_url() + '/repos/{0}/git/{1}'.format(repo_name, ref))
         response.raise_for_status()
     return len(removed_refs) > 0
 
 
+#
+# Batch
+#
+
+_BATCH_COMMANDS = {
+    'release create': gh_release_create,
+    'release edit': gh_release_edit,
+    'release delete': gh_release_delete,
+    'release publish': gh_release_publish,
+    'release unpublish': gh_release_unpublish,
+    'asset upload': gh_asset_upload,
+    'asset download': gh_asset_download,
+    'asset delete': gh_asset_delete,
+    'ref create': gh_ref_create,
+    'ref delete': gh_ref_delete,
+}
+
+
+def load_batch_manifest(path):
+    """Load a batch manifest from a JSON or, if PyYAML is installed,
+    a YAML file."""
+    with open(path) as manifest_file:
+        if os.path.splitext(path)[1].lower() not in ('.yml', '.yaml'):
+            return json.load(manifest_file)
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(
+                "Reading YAML manifest {0} requires PyYAML. "
+                "Install it or use a JSON manifest.".format(path))
+        return yaml.safe_load(manifest_file)
+
+
+def _batch_operation(operation):
+    """Return the ``(func, kwargs)`` pair performing ``operation``."""
+    kwargs = {key.replace('-', '_'): value
+              for key, value in operation.items()}
+    command = kwargs.pop('command', None)
+    if command not in _BATCH_COMMANDS:
+        raise ValueError(
+            "Unknown batch command {0!r}. Expected one of: {1}".format(
+                command, ", ".join(sorted(_BATCH_COMMANDS))))
+    return _BATCH_COMMANDS[command], kwargs
+
+
+def _batch_jobs(manifest):
+    """Return the list of ``(repo_name, operations)`` described by
+    ``manifest``.
+
+    Repositories are either given by name, in which case the top-level
+    ``operations`` are performed, or as ``{"repo": name, "operations": [..]}``.
+    """
+    default_operations = manifest.get('operations', [])
+    jobs = []
+    for repository in manifest.get('repositories', []):
+        if isinstance(repository, dict):
+            repo_name = repository.get('repo', '')
+            operations = repository.get('operations', default_operations)
+        else:
+            repo_name, operations = repository, default_operations
+        if "/" not in repo_name:
+            raise ValueError(
+                'Expected format for repository is "<org_name>/<project_name>" '
+                '(e.g "jcfr/sandbox"), got {0!r}'.format(repo_name))
+        jobs.append(
+            (repo_name, [_batch_operation(operation) for operation in operations]))
+    return jobs
+
+
+class _ThreadOutput(object):
+    """File-like object writing to a buffer specific to the current thread
+    once :meth:`capture` was called, and to ``stream`` otherwise."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self):
+        self._local.buffer = io.StringIO()
+
+    def release(self):
+        buffer, self._local.buffer = self._local.buffer, None
+        return buffer.getvalue()
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer if buffer is not None else self._stream).write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _run_batch_job(output, job):
+    repo_name, operations = job
+    output.capture()
+    error = None
+    try:
+        for func, kwargs in operations:
+            func(repo_name, **kwargs)
+    except Exception as exc:
+        error = exc
+    return output.release(), error
+
+
+def gh_batch(manifest, jobs=None):
+    """Perform the operations listed in ``manifest`` on each repository.
+
+    Repositories are processed concurrently by at most ``jobs`` threads
+    sharing the same session, operations of a given repository being
+    performed in order. The output of each repository is reported once its
+    operations are done.
+
+    Return the names of the repositories whose operations failed.
+    """
+    global progress_reporter_cls
+    batch_jobs = _batch_jobs(manifest)
+    if jobs is None:
+        jobs = _default_jobs(len(batch_jobs))
+    output = _ThreadOutput(sys.stdout)
+    failed = []
+    saved_stdout, saved_reporter_cls = sys.stdout, progress_reporter_cls
+    sys.stdout, progress_reporter_cls = output, _NoopProgressReporter
+    try:
+        results = _iter_concurrently(
+            partial(_run_batch_job, output), batch_jobs, jobs)
+        for (repo_name, _), (captured, error), _ in results:
+            print('==> {0}'.format(repo_name))
+            print(captured, end='')
+            if error is not None:
+                failed.append(repo_name)
+                print('error: {0}'.format(error))
+    finally:
+        sys.stdout, progress_reporter_cls = saved_stdout, saved_reporter_cls
+    print('batch completed: {0} succeeded, {1} failed{2}'.format(
+        len(batch_jobs) - len(failed), len(failed),
+        ' ({0})'.format(', '.join(sorted(failed))) if failed else ''))
+    return failed
+
+
+@main.command("batch")
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("--jobs", type=int, default=None,
+              help="Number of repositories processed concurrently "
+                   "(default: %d)." % MAX_JOBS)
+@click.pass_context
+def _cli_batch(ctx, manifest, jobs):
+    """Perform operations on several repositories listed in a JSON
+    (or YAML) MANIFEST"""
+    try:
+        failed = gh_batch(load_batch_manifest(manifest), jobs=jobs)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="MANIFEST")
+    if failed:
+        ctx.exit(1)
+
+
 #
 # Commits
 #
@@ -0,0 +1,220 @@
+"""asyncio API mirroring the functions of :mod:`github_release`.
+
+The operations are not implemented using non-blocking I/O: each coroutine
+runs the corresponding blocking :mod:`github_release` function in a thread
+pool bounded by the concurrency limit of the :class:`Client`. A running
+operation holds one thread of this pool, plus the threads the function
+starts itself: up to ``github_release.PAGE_JOBS`` threads fetching the
+pages of a listing, and up to ``jobs`` (by default
+``github_release.MAX_JOBS``) threads transferring assets. Each item of an
+``iter_*`` iterator is fetched by a separate call in the pool.
+
+All the requests go through the session shared by :mod:`github_release`
+(see :func:`github_release.github_session`) so that connections are
+reused across coroutines.
+
+Example::
+
+    import asyncio
+    import github_release_aio as aio
+
+    async def publish(repos):
+        async with aio.Client(max_concurrency=16) as client:
+            await asyncio.gather(*[
+                client.gh_release_create(repo, "1.0.0", publish=True)
+                for repo in repos])
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import weakref
+
+import github_release as ghr
+
+MAX_CONCURRENCY = 8  # Default maximum number of operations running at once
+
+_NO_ITEM = object()
+
+
+class Client(object):
+    """Run :mod:`github_release` operations from asyncio code.
+
+    :param max_concurrency:
+      Maximum number of operations running at once. Pending coroutines wait
+      for a slot before starting.
+
+    :param executor:
+      Optional :class:`concurrent.futures.Executor` used to run the
+      operations. By default, a thread pool of ``max_concurrency`` threads
+      is created and shut down by :meth:`close`.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, executor=None):
+        self.max_concurrency = max_concurrency
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_concurrency,
+                thread_name_prefix="github-release")
+        self._executor = executor
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def close(self):
+        """Shut down the executor if it was created by the client."""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    def _limiter(self):
+        # One semaphore per event loop: a semaphore is bound to the loop
+        # first waiting on it, and the client may be used from several
+        # loops (e.g. consecutive asyncio.run() calls).
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(
+                self.max_concurrency)
+        return semaphore
+
+    async def run(self, func, *args, **kwargs):
+        """Run the blocking ``func`` once a concurrency slot is available.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._limiter():
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _iterate(self, func, *args, **kwargs):
+        """Yield items of the iterator returned by the blocking ``func``."""
+        iterator = await self.run(func, *args, **kwargs)
+        try:
+            while True:
+                item = await self.run(next, iterator, _NO_ITEM)
+                if item is _NO_ITEM:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                await self.run(close)
+
+    #
+    # Releases
+    #
+
+    def iter_releases(self, repo_name):
+        """Asynchronously yield releases (see :func:`github_release.iter_releases`)."""
+        return self._iterate(ghr.iter_releases, repo_name)
+
+    async def get_releases(self, repo_name):
+        return await self.run(ghr.get_releases, repo_name)
+
+    async def get_release(self, repo_name, tag_name):
+        return await self.run(ghr.get_release, repo_name, tag_name)
+
+    async def gh_release_create(self, repo_name, tag_name, **kwargs):
+        return await self.run(
+            ghr.gh_release_create, repo_name, tag_name, **kwargs)
+
+    async def gh_release_edit(self, repo_name, current_tag_name, **kwargs):
+        return await self.run(
+            ghr.gh_release_edit, repo_name, current_tag_name, **kwargs)
+
+    async def gh_release_delete(self, repo_name, pattern, **kwargs):
+        return await self.run(
+            ghr.gh_release_delete, repo_name, pattern, **kwargs)
+
+    async def gh_release_publish(self, repo_name, tag_name, **kwargs):
+        return await self.run(
+            ghr.gh_release_publish, repo_name, tag_name, **kwargs)
+
+    async def gh_release_unpublish(self, repo_name, tag_name, **kwargs):
+        return await self.run(
+            ghr.gh_release_unpublish, repo_name, tag_name, **kwargs)
+
+    #
+    # Assets
+    #
+
+    def iter_assets(self, repo_name, tag_name):
+        """Asynchronously yield assets (see :func:`github_release.iter_assets`)."""
+        return self._iterate(ghr.iter_assets, repo_name, tag_name)
+
+    async def get_assets(self, repo_name, tag_name):
+        return await self.run(ghr.get_assets, repo_name, tag_name)
+
+    async def gh_asset_upload(self, repo_name, tag_name, pattern, **kwargs):
+        return await self.run(
+            ghr.gh_asset_upload, repo_name, tag_name, pattern, **kwargs)
+
+    async def gh_asset_download(self, repo_name, tag_name=None, pattern=None,
+                                **kwargs):
+        return await self.run(
+            ghr.gh_asset_download, repo_name, tag_name, pattern, **kwargs)
+
+    async def gh_asset_delete(self, repo_name, tag_name, pattern, **kwargs):
+        return await self.run(
+            ghr.gh_asset_delete, repo_name, tag_name, pattern, **kwargs)
+
+    #
+    # References
+    #
+
+    def iter_refs(self, repo_name, tags=None, pattern=None):
+        """Asynchronously yield references (see :func:`github_release.iter_refs`)."""
+        return self._iterate(
+            ghr.iter_refs, repo_name, tags=tags, pattern=pattern)
+
+    async def get_refs(self, repo_name, tags=None, pattern=None):
+        return await self.run(
+            ghr.get_refs, repo_name, tags=tags, pattern=pattern)
+
+    async def gh_ref_create(self, repo_name, reference, sha):
+        return await self.run(ghr.gh_ref_create, repo_name, reference, sha)
+
+    async def gh_ref_delete(self, repo_name, pattern, **kwargs):
+        return await self.run(ghr.gh_ref_delete, repo_name, pattern, **kwargs)
+
+
+_default_client = None
+
+
+def default_client():
+    """Return the client used by the module-level coroutines."""
+    global _default_client
+    if _default_client is None:
+        _default_client = Client()
+    return _default_client
+
+
+def _delegate(name):
+    def method(*args, **kwargs):
+        return getattr(default_client(), name)(*args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = "Call :meth:`Client.{0}` of :func:`default_client`.".format(name)
+    return method
+
+
+iter_releases = _delegate("iter_releases")
+get_releases = _delegate("get_releases")
+get_release = _delegate("get_release")
+gh_release_create = _delegate("gh_release_create")
+gh_release_edit = _delegate("gh_release_edit")
+gh_release_delete = _delegate("gh_release_delete")
+gh_release_publish = _delegate("gh_release_publish")
+gh_release_unpublish = _delegate("gh_release_unpublish")
+iter_assets = _delegate("iter_assets")
+get_assets = _delegate("get_assets")
+gh_asset_upload = _delegate("gh_asset_upload")
+gh_asset_download = _delegate("gh_asset_download")
+gh_asset_delete = _delegate("gh_asset_delete")
+iter_refs = _delegate("iter_refs")
+get_refs = _delegate("get_refs")
+gh_ref_create = _delegate("gh_ref_create")
+gh_ref_delete = _delegate("gh_ref_delete")
@@ -2,11 +2,13 @@
 import datetime as dt
 import errno
 import fnmatch
+import json
 import operator
 import os
 import shlex
 import subprocess
 import sys
+import threading
 
 from contextlib import contextmanager
 from functools import reduce
@@ -97,6 +99,66 @@ def push_github_api_url(ghr,  url):
     ghr._github_api_url = saved_url
 
 
+@contextmanager
+def push_github_session(ghr, session):
+    """This context manager allow to set _github_session variable.
+    """
+    saved_session = ghr._github_session
+    ghr._github_session = session
+    yield
+    ghr._github_session = saved_session
+
+
+def make_response(status_code=200, json_data=None, headers=None,
+                  url=None, method='GET', content=None):
+    """Return a :class:`requests.Response` suitable for mocking requests.
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = requests.status_codes._codes[status_code][0].upper()
+    response.url = url
+    if headers:
+        response.headers.update(headers)
+    if content is None and json_data is not None:
+        content = json.dumps(json_data).encode('utf-8')
+    response._content = content if content is not None else b''
+    response._content_consumed = True
+    if url is not None:
+        response.request = requests.Request(method, url).prepare()
+    return response
+
+
+class MockedRequest(object):
+    """Callable replacing ``github_release._request`` in tests.
+
+    ``responses`` maps either a URL or a ``(method, url)`` tuple to a
+    ``(status_code, json_data)`` or ``(status_code, json_data, headers)``
+    tuple, where ``json_data`` may also be the raw ``bytes`` content,
+    or to a callable returning such a tuple given the request
+    ``kwargs``. Sent requests are recorded in ``requests`` as
+    ``(method, url)``.
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, method, url, **kwargs):
+        with self._lock:
+            self.requests.append((method, url))
+        key = (method, url) if (method, url) in self.responses else url
+        spec = self.responses[key]
+        if callable(spec):
+            spec = spec(kwargs)
+        headers = spec[2] if len(spec) > 2 else None
+        if isinstance(spec[1], bytes):
+            return make_response(spec[0], content=spec[1], headers=headers,
+                                 url=url, method=method)
+        return make_response(spec[0], spec[1], headers=headers,
+                             url=url, method=method)
+
+
 #
 # Subprocess
 #
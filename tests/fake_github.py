@@ -0,0 +1,558 @@
+"""Fake GitHub REST API serving in-memory repositories on localhost.
+
+It implements the subset of the API used by :mod:`github_release`
+(releases, assets, uploads, downloads redirected to a storage endpoint and
+git references) along with ``Link`` pagination and rate limit headers, so
+that the module can be exercised and benchmarked without a GitHub token::
+
+    with FakeGitHub() as github:
+        github.add_release("org/repo", "1.0.0", assets={"foo.txt": b"foo"})
+        ghr.set_github_api_url(github.url)
+        ghr.get_releases("org/repo")
+
+Latency, bandwidth limits and failures can be injected to approximate the
+behavior of the real API.
+"""
+
+import collections
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlencode, urlparse
+
+DEFAULT_SHA = 'c0ffee' * 6 + 'c0fe'  # Commit of the references created without sha
+WRITE_CHUNK_SIZE = 65536  # Size of the chunks of the throttled response bodies
+
+_Request = collections.namedtuple('_Request', ['query', 'headers', 'body'])
+
+_ROUTES = [
+    ('GET', '/repos/{repo}/releases', 'list_releases'),
+    ('POST', '/repos/{repo}/releases', 'create_release'),
+    ('GET', '/repos/{repo}/releases/tags/(?P<tag>.+)', 'get_release_by_tag'),
+    ('GET', '/repos/{repo}/releases/assets/(?P<asset_id>\\d+)', 'get_asset'),
+    ('DELETE', '/repos/{repo}/releases/assets/(?P<asset_id>\\d+)', 'delete_asset'),
+    ('GET', '/repos/{repo}/releases/(?P<release_id>\\d+)', 'get_release'),
+    ('PATCH', '/repos/{repo}/releases/(?P<release_id>\\d+)', 'update_release'),
+    ('DELETE', '/repos/{repo}/releases/(?P<release_id>\\d+)', 'delete_release'),
+    ('GET', '/repos/{repo}/releases/(?P<release_id>\\d+)/assets', 'list_assets'),
+    ('POST', '/uploads/repos/{repo}/releases/(?P<release_id>\\d+)/assets', 'upload_asset'),
+    ('GET', '/{repo}/releases/download/(?P<tag>[^/]+)/(?P<name>[^/]+)', 'browser_download'),
+    ('GET', '/storage/(?P<asset_id>\\d+)', 'download'),
+    ('GET', '/repos/{repo}/git/refs', 'list_refs'),
+    ('POST', '/repos/{repo}/git/refs', 'create_ref'),
+    ('GET', '/repos/{repo}/git/refs/(?P<ref>.+)', 'get_refs'),
+    ('PATCH', '/repos/{repo}/git/refs/(?P<ref>.+)', 'update_ref'),
+    ('DELETE', '/repos/{repo}/git/refs/(?P<ref>.+)', 'delete_ref'),
+    ('GET', '/repos/{repo}/git/ref/(?P<ref>.+)', 'get_ref'),
+    ('GET', '/repos/{repo}/git/matching-refs/(?P<ref>.*)', 'list_matching_refs'),
+    ('GET', '/repos/{repo}/git/commits/(?P<sha>[0-9a-f]+)', 'get_commit'),
+]
+_ROUTES = [(method, re.compile('^' + pattern.replace('{repo}', '(?P<repo>[^/]+/[^/]+)') + '$'), name)
+           for method, pattern, name in _ROUTES]
+
+# Endpoints not counted against the rate limit
+_STORAGE_ROUTES = ('browser_download', 'download')
+
+
+def _now():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+def _error(status, message, **kwargs):
+    return status, dict({'message': message}, **kwargs)
+
+
+class FakeGitHub(object):
+    """In-memory GitHub repositories served over HTTP on localhost.
+
+    :param latency:
+      Seconds waited before handling each request.
+
+    :param bandwidth:
+      Bytes per second at which request and response bodies are
+      transferred. By default, transfers are not throttled.
+
+    :param failure_rate:
+      Probability for a request to fail with ``failure_status``. Failures
+      with status 429 are sent along with a ``Retry-After: 0`` header, so
+      that they are retried as secondary rate limits.
+
+    :param rate_limit:
+      Number of requests allowed per ``rate_limit_window`` seconds. Once
+      exceeded, requests fail with status 403 until the window is reset.
+
+    :param per_page:
+      Number of objects per page when not set by the ``per_page`` query
+      parameter (at most 100, like GitHub).
+
+    :param seed:
+      Seed of the random generator used to inject failures.
+    """
+
+    def __init__(self, latency=0, bandwidth=None, failure_rate=0,
+                 failure_status=502, rate_limit=5000, rate_limit_window=3600,
+                 per_page=30, seed=0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.per_page = per_page
+        self.repos = {}
+        self.request_count = 0
+        self.requests = collections.Counter()
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._rate_limit_used = 0
+        self._rate_limit_reset = 0
+        self._server = None
+        self._thread = None
+
+    #
+    # Server
+    #
+
+    def start(self):
+        """Start serving requests in a background thread."""
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.github = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,))
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+    @property
+    def url(self):
+        """URL of the API (to pass to ``set_github_api_url``)."""
+        return 'http://127.0.0.1:%d' % self._server.server_address[1]
+
+    def reset(self):
+        """Remove all the repositories and reset the counters."""
+        with self._lock:
+            self.repos.clear()
+            self.reset_counts()
+            self._rate_limit_used = 0
+            self._rate_limit_reset = 0
+
+    def reset_counts(self):
+        """Reset the number of requests received."""
+        with self._lock:
+            self.request_count = 0
+            self.requests.clear()
+
+    def throttle(self, size):
+        """Wait for ``size`` bytes to be transferred at ``bandwidth``."""
+        if self.bandwidth and size:
+            time.sleep(float(size) / self.bandwidth)
+
+    #
+    # Fixtures
+    #
+
+    def _repo(self, repo_name):
+        return self.repos.setdefault(repo_name, {
+            'releases': collections.OrderedDict(),
+            'assets': {},
+            'contents': {},
+            'refs': {},
+        })
+
+    def add_release(self, repo_name, tag_name, draft=False, prerelease=False,
+                    target_commitish=None, assets=None):
+        """Add a release, its tag (unless it is a draft) and its
+        ``assets`` (mapping of name to content)."""
+        with self._lock:
+            repo = self._repo(repo_name)
+            release_id = next(self._ids)
+            release = {
+                'id': release_id,
+                'tag_name': tag_name,
+                'name': tag_name,
+                'body': '',
+                'draft': draft,
+                'prerelease': prerelease,
+                'target_commitish': target_commitish or 'master',
+                'created_at': _now(),
+                'published_at': None if draft else _now(),
+                'author': {'login': 'fake'},
+                'url': self.url + '/repos/%s/releases/%d' % (repo_name, release_id),
+                'html_url': self.url + '/%s/releases/tag/%s' % (repo_name, tag_name),
+                'upload_url': self.url + '/uploads/repos/%s/releases/%d/assets{?name,label}' % (
+                    repo_name, release_id),
+                'assets': [],
+            }
+            repo['releases'][release_id] = release
+            if not draft:
+                self._tag_release(repo_name, release)
+            for name, content in sorted((assets or {}).items()):
+                self.add_asset(repo_name, release, name, content)
+            return release
+
+    def add_asset(self, repo_name, release, name, content,
+                  content_type='application/octet-stream'):
+        """Add asset ``name`` to ``release``."""
+        with self._lock:
+            repo = self._repo(repo_name)
+            asset_id = next(self._ids)
+            asset = {
+                'id': asset_id,
+                'name': name,
+                'label': '',
+                'state': 'uploaded',
+                'content_type': content_type,
+                'size': len(content),
+                'digest': 'sha256:' + hashlib.sha256(content).hexdigest(),
+                'download_count': 0,
+                'uploader': {'login': 'fake'},
+                'created_at': _now(),
+                'updated_at': _now(),
+                'url': self.url + '/repos/%s/releases/assets/%d' % (repo_name, asset_id),
+                'browser_download_url': self.url + '/%s/releases/download/%s/%s' % (
+                    repo_name, release['tag_name'], name),
+            }
+            release['assets'].append(asset)
+            repo['assets'][asset_id] = (release, asset)
+            repo['contents'][asset_id] = content
+            return asset
+
+    def add_ref(self, repo_name, ref, sha=DEFAULT_SHA, object_type='commit'):
+        """Add reference ``ref`` (e.g. ``refs/tags/1.0.0``)."""
+        with self._lock:
+            self._repo(repo_name)['refs'][ref] = {
+                'ref': ref,
+                'node_id': '',
+                'url': self.url + '/repos/%s/git/%s' % (repo_name, ref),
+                'object': {'sha': sha, 'type': object_type, 'url': ''},
+            }
+            return self._repo(repo_name)['refs'][ref]
+
+    def _tag_release(self, repo_name, release):
+        # Like GitHub, create the tag of a published release if needed
+        ref = 'refs/tags/' + release['tag_name']
+        if ref not in self._repo(repo_name)['refs']:
+            sha = release['target_commitish']
+            if not re.match('^[0-9a-f]{40}$', sha):
+                sha = DEFAULT_SHA
+            self.add_ref(repo_name, ref, sha)
+
+    #
+    # Requests
+    #
+
+    def _route(self, method, path):
+        for route_method, pattern, name in _ROUTES:
+            match = pattern.match(path)
+            if match and route_method == method:
+                groups = {key: unquote(value) for key, value in match.groupdict().items()}
+                return name, groups
+        return None, {}
+
+    def _consume_rate_limit(self):
+        """Return rate limit headers, or None if the rate limit is exceeded."""
+        now = time.time()
+        if now >= self._rate_limit_reset:
+            self._rate_limit_reset = int(now) + self.rate_limit_window
+            self._rate_limit_used = 0
+        exceeded = self._rate_limit_used >= self.rate_limit
+        if not exceeded:
+            self._rate_limit_used += 1
+        headers = {
+            'X-RateLimit-Limit': str(self.rate_limit),
+            'X-RateLimit-Remaining': str(self.rate_limit - self._rate_limit_used),
+            'X-RateLimit-Reset': str(self._rate_limit_reset),
+            'X-RateLimit-Used': str(self._rate_limit_used),
+            'X-RateLimit-Resource': 'core',
+        }
+        return None if exceeded else headers
+
+    def handle(self, method, path, headers, body):
+        """Return ``(status, payload, headers)`` replying to a request.
+
+        ``payload`` is either None, bytes or an object serialized as JSON.
+        """
+        parsed = urlparse(path)
+        name, groups = self._route(method, parsed.path)
+        with self._lock:
+            self.request_count += 1
+            self.requests[(method, name or parsed.path)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            response_headers = {}
+            if name not in _STORAGE_ROUTES:
+                response_headers = self._consume_rate_limit()
+                if response_headers is None:
+                    return 403, {'message': 'API rate limit exceeded'}, {
+                        'X-RateLimit-Limit': str(self.rate_limit),
+                        'X-RateLimit-Remaining': '0',
+                        'X-RateLimit-Reset': str(self._rate_limit_reset)}
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                if self.failure_status == 429:
+                    response_headers['Retry-After'] = '0'
+                return self.failure_status, {'message': 'Injected failure'}, response_headers
+            if name is None:
+                return 404, {'message': 'Not Found'}, response_headers
+            request = _Request(dict(parse_qsl(parsed.query)), headers, body)
+            result = getattr(self, '_' + name)(request, **groups)
+        status, payload = result[:2]
+        if len(result) > 2:
+            response_headers.update(result[2])
+        return status, payload, response_headers
+
+    def _page(self, request, path, items):
+        per_page = min(int(request.query.get('per_page', self.per_page)), 100)
+        page = int(request.query.get('page', 1))
+        last = max(1, (len(items) + per_page - 1) // per_page)
+
+        def href(number):
+            return '%s%s?%s' % (self.url, path, urlencode(
+                dict(request.query, per_page=per_page, page=number)))
+
+        links = []
+        if page < last:
+            links.append('<%s>; rel="next"' % href(page + 1))
+            links.append('<%s>; rel="last"' % href(last))
+        if page > 1:
+            links.append('<%s>; rel="prev"' % href(page - 1))
+            links.append('<%s>; rel="first"' % href(1))
+        headers = {'Link': ', '.join(links)} if links else {}
+        return 200, items[(page - 1) * per_page:page * per_page], headers
+
+    def _find_release(self, repo_name, release_id):
+        return self._repo(repo_name)['releases'].get(int(release_id))
+
+    # Releases
+
+    def _list_releases(self, request, repo):
+        releases = list(reversed(self._repo(repo)['releases'].values()))
+        return self._page(request, '/repos/%s/releases' % repo, releases)
+
+    def _get_release_by_tag(self, request, repo, tag):
+        for release in self._repo(repo)['releases'].values():
+            # Like GitHub, draft releases are not returned
+            if release['tag_name'] == tag and not release['draft']:
+                return 200, release
+        return _error(404, 'Not Found')
+
+    def _get_release(self, request, repo, release_id):
+        release = self._find_release(repo, release_id)
+        if release is None:
+            return _error(404, 'Not Found')
+        return 200, release
+
+    def _create_release(self, request, repo):
+        data = json.loads(request.body.decode('utf-8'))
+        if any(release['tag_name'] == data['tag_name']
+               for release in self._repo(repo)['releases'].values()):
+            return _error(422, 'Validation Failed', errors=[
+                {'resource': 'Release', 'code': 'already_exists', 'field': 'tag_name'}])
+        release = self.add_release(
+            repo, data['tag_name'], draft=data.get('draft', False),
+            prerelease=data.get('prerelease', False),
+            target_commitish=data.get('target_commitish'))
+        release['name'] = data.get('name') or release['name']
+        release['body'] = data.get('body') or ''
+        return 201, release
+
+    def _update_release(self, request, repo, release_id):
+        release = self._find_release(repo, release_id)
+        if release is None:
+            return _error(404, 'Not Found')
+        data = json.loads(request.body.decode('utf-8'))
+        for key in ('tag_name', 'target_commitish', 'name', 'body', 'draft', 'prerelease'):
+            if data.get(key) is not None:
+                release[key] = data[key]
+        if not release['draft']:
+            release['published_at'] = release['published_at'] or _now()
+            self._tag_release(repo, release)
+        return 200, release
+
+    def _delete_release(self, request, repo, release_id):
+        release = self._find_release(repo, release_id)
+        if release is None:
+            return _error(404, 'Not Found')
+        for asset in release['assets']:
+            self._repo(repo)['assets'].pop(asset['id'], None)
+            self._repo(repo)['contents'].pop(asset['id'], None)
+        del self._repo(repo)['releases'][release['id']]
+        return 204, None
+
+    # Assets
+
+    def _list_assets(self, request, repo, release_id):
+        release = self._find_release(repo, release_id)
+        if release is None:
+            return _error(404, 'Not Found')
+        return self._page(request, '/repos/%s/releases/%s/assets' % (repo, release_id),
+                          release['assets'])
+
+    def _upload_asset(self, request, repo, release_id):
+        release = self._find_release(repo, release_id)
+        if release is None:
+            return _error(404, 'Not Found')
+        name = request.query.get('name')
+        if any(asset['name'] == name for asset in release['assets']):
+            return _error(422, 'Validation Failed', errors=[
+                {'resource': 'ReleaseAsset', 'code': 'already_exists', 'field': 'name'}])
+        asset = self.add_asset(
+            repo, release, name, request.body,
+            content_type=request.headers.get('Content-Type', 'application/octet-stream'))
+        return 201, asset
+
+    def _get_asset(self, request, repo, asset_id):
+        if int(asset_id) not in self._repo(repo)['assets']:
+            return _error(404, 'Not Found')
+        _, asset = self._repo(repo)['assets'][int(asset_id)]
+        if request.headers.get('Accept') == 'application/octet-stream':
+            return 302, None, {'Location': self.url + '/storage/%s' % asset_id}
+        return 200, asset
+
+    def _delete_asset(self, request, repo, asset_id):
+        if int(asset_id) not in self._repo(repo)['assets']:
+            return _error(404, 'Not Found')
+        release, asset = self._repo(repo)['assets'].pop(int(asset_id))
+        self._repo(repo)['contents'].pop(int(asset_id))
+        release['assets'].remove(asset)
+        return 204, None
+
+    def _browser_download(self, request, repo, tag, name):
+        for release, asset in self._repo(repo)['assets'].values():
+            if release['tag_name'] == tag and asset['name'] == name:
+                return 302, None, {'Location': self.url + '/storage/%d' % asset['id']}
+        return 404, b'Not Found'
+
+    def _download(self, request, asset_id):
+        for repo in self.repos.values():
+            if int(asset_id) in repo['contents']:
+                break
+        else:
+            return 404, b'Not Found'
+        content = repo['contents'][int(asset_id)]
+        repo['assets'][int(asset_id)][1]['download_count'] += 1
+        match = re.match(r'^bytes=(\d+)-$', request.headers.get('Range') or '')
+        if match is None:
+            return 200, content
+        start = int(match.group(1))
+        return 206, content[start:], {
+            'Content-Range': 'bytes %d-%d/%d' % (start, len(content) - 1, len(content))}
+
+    # References
+
+    def _sorted_refs(self, repo, prefix=''):
+        refs = self._repo(repo)['refs']
+        return [refs[ref] for ref in sorted(refs) if ref.startswith(prefix)]
+
+    def _list_refs(self, request, repo):
+        return self._page(request, '/repos/%s/git/refs' % repo, self._sorted_refs(repo))
+
+    def _list_matching_refs(self, request, repo, ref):
+        return self._page(request, '/repos/%s/git/matching-refs/%s' % (repo, ref),
+                          self._sorted_refs(repo, 'refs/' + ref))
+
+    def _get_ref(self, request, repo, ref):
+        found = self._repo(repo)['refs'].get('refs/' + ref)
+        if found is None:
+            return _error(404, 'Not Found')
+        return 200, found
+
+    def _get_refs(self, request, repo, ref):
+        found = self._repo(repo)['refs'].get('refs/' + ref)
+        if found is not None:
+            return 200, found
+        refs = self._sorted_refs(repo, 'refs/' + ref + '/')
+        if not refs:
+            return _error(404, 'Not Found')
+        return self._page(request, '/repos/%s/git/refs/%s' % (repo, ref), refs)
+
+    def _create_ref(self, request, repo):
+        data = json.loads(request.body.decode('utf-8'))
+        if data['ref'] in self._repo(repo)['refs']:
+            return _error(422, 'Reference already exists')
+        return 201, self.add_ref(repo, data['ref'], data['sha'])
+
+    def _update_ref(self, request, repo, ref):
+        found = self._repo(repo)['refs'].get('refs/' + ref)
+        if found is None:
+            return _error(422, 'Reference does not exist')
+        found['object']['sha'] = json.loads(request.body.decode('utf-8'))['sha']
+        found['object']['type'] = 'commit'
+        return 200, found
+
+    def _delete_ref(self, request, repo, ref):
+        if self._repo(repo)['refs'].pop('refs/' + ref, None) is None:
+            return _error(422, 'Reference does not exist')
+        return 204, None
+
+    def _get_commit(self, request, repo, sha):
+        return 200, {'sha': sha, 'message': '', 'author': {'name': 'fake', 'date': _now()}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() != 'chunked':
+            return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b';')[0], 16)
+            if size == 0:
+                self.rfile.readline()
+                return b''.join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def _handle(self):
+        github = self.server.github
+        body = self._read_body()
+        github.throttle(len(body))
+        status, payload, headers = github.handle(
+            self.command, self.path, self.headers, body)
+        if payload is None:
+            data = b''
+        elif isinstance(payload, bytes):
+            data = payload
+            headers.setdefault('Content-Type', 'application/octet-stream')
+        else:
+            data = json.dumps(payload).encode('utf-8')
+            headers.setdefault('Content-Type', 'application/json; charset=utf-8')
+        self.send_response(status)
+        headers['Content-Length'] = str(len(data))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        try:
+            for offset in range(0, len(data), WRITE_CHUNK_SIZE):
+                chunk = data[offset:offset + WRITE_CHUNK_SIZE]
+                self.wfile.write(chunk)
+                github.throttle(len(chunk))
+        except (BrokenPipeError, ConnectionResetError):
+            # e.g. the client closed a redirection without reading it
+            self.close_connection = True
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import github_release_aio as aio
+
+import github_release as ghr
+
+from . import MockedRequest, push_github_api_url
+
+API_URL = 'https://api.github.com'
+
+
+def _releases(count):
+    return [{"id": index, "tag_name": "1.0.%s" % index}
+            for index in range(count)]
+
+
+def test_get_releases(mocker):
+    mocked_request = MockedRequest({
+        API_URL + '/repos/org/repo_%s/releases?per_page=100' % index:
+            (200, _releases(index + 1))
+        for index in range(5)
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+
+    async def get_all():
+        async with aio.Client(max_concurrency=2) as client:
+            return await asyncio.gather(*[
+                client.get_releases("org/repo_%s" % index)
+                for index in range(5)])
+
+    with push_github_api_url(ghr, API_URL):
+        results = asyncio.run(get_all())
+    assert [len(releases) for releases in results] == [1, 2, 3, 4, 5]
+
+
+def test_concurrency_limit():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def operation():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+
+    async def run_all():
+        async with aio.Client(max_concurrency=3) as client:
+            await asyncio.gather(*[client.run(operation) for _ in range(12)])
+
+    asyncio.run(run_all())
+    assert len(peak) == 12
+    assert max(peak) <= 3
+
+
+def test_iter_refs(mocker):
+    mocked_request = MockedRequest({
+        API_URL + '/repos/org/user/git/refs?per_page=100': (200, [
+            {"ref": "refs/heads/master"}, {"ref": "refs/tags/1.0.0"}]),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+
+    async def collect():
+        async with aio.Client() as client:
+            return [ref["ref"] async for ref in client.iter_refs("org/user")]
+
+    with push_github_api_url(ghr, API_URL):
+        assert asyncio.run(collect()) == ["refs/heads/master", "refs/tags/1.0.0"]
+
+
+def test_default_client_several_loops(mocker):
+    mocked_request = MockedRequest({
+        API_URL + '/repos/org/user/releases/tags/1.0.0': (200, {"id": 1, "tag_name": "1.0.0"}),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    mocker.patch.object(aio, "_default_client", None)
+
+    async def get_all():
+        return await asyncio.gather(*[
+            aio.get_release("org/user", "1.0.0") for _ in range(20)])
+
+    with push_github_api_url(ghr, API_URL):
+        for _ in range(2):
+            assert [release["id"] for release in asyncio.run(get_all())] == [1] * 20
+    aio.default_client().close()
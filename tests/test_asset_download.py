@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import threading
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import click
+import pytest
+
+import github_release as ghr
+
+from . import MockedRequest, make_response, push_dir, push_github_api_url
+
+API_URL = 'https://api.github.com'
+STORAGE_URL = 'https://objects.githubusercontent.com'
+
+
+def _asset(asset_id, name, content):
+    return {"id": asset_id, "name": name, "size": len(content)}
+
+
+def _responses(assets, contents):
+    responses = {
+        API_URL + '/repos/org/user/releases?per_page=100':
+            (200, [{"tag_name": "1.0.0", "assets": assets}]),
+    }
+    for asset in assets:
+        storage_url = STORAGE_URL + '/%s' % asset['id']
+        responses[API_URL + '/repos/org/user/releases/assets/%s' % asset['id']] = \
+            (302, b'', {'Location': storage_url})
+        responses[storage_url] = contents[asset['name']]
+    return responses
+
+
+def test_download_concurrently(mocker, tmpdir):
+    contents = {"asset_%s" % index: ("content %s" % index).encode()
+                for index in range(4)}
+    assets = [_asset(index, name, content)
+              for index, (name, content) in enumerate(sorted(contents.items()))]
+    mocked_request = MockedRequest(_responses(assets, {
+        name: (200, content) for name, content in contents.items()}))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        assert ghr.gh_asset_download("org/user", jobs=3) == 4
+    for name, content in contents.items():
+        assert tmpdir.join(name).read_binary() == content
+        assert not tmpdir.join(name + ".part").check()
+
+
+def test_download_resume(mocker, tmpdir):
+    content = b"0123456789"
+    tmpdir.join("asset.part").write_binary(content[:4])
+    ranges = []
+
+    def partial(kwargs):
+        ranges.append(kwargs['headers']['Range'])
+        return 206, content[4:], {'Content-Range': 'bytes 4-9/10'}
+
+    mocked_request = MockedRequest(_responses(
+        [_asset(1, "asset", content)], {"asset": partial}))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        assert ghr.gh_asset_download("org/user") == 1
+    assert ranges == ['bytes=4-']
+    assert tmpdir.join("asset").read_binary() == content
+    assert not tmpdir.join("asset.part").check()
+
+
+def test_download_size_mismatch(mocker, tmpdir):
+    mocked_request = MockedRequest(_responses(
+        [_asset(1, "asset", b"0123456789")], {"asset": (200, b"01234")}))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        with pytest.raises(Exception, match="expected 10 bytes, got 5"):
+            ghr.gh_asset_download("org/user")
+    assert not tmpdir.join("asset").check()
+    assert tmpdir.join("asset.part").read_binary() == b"01234"
+
+
+@pytest.mark.parametrize("valid", [True, False])
+def test_download_verify_checksums(mocker, tmpdir, valid):
+    content = b"0123456789"
+    checksum = hashlib.sha256(content if valid else b"other").hexdigest()
+    checksums = ("%s  asset\n" % checksum).encode()
+    assets = [_asset(1, "asset", content), _asset(2, "SHA256SUMS", checksums)]
+    assets[1]["state"] = "uploaded"
+    mocked_request = MockedRequest(_responses(assets, {
+        "asset": (200, content), "SHA256SUMS": (200, checksums)}))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        if valid:
+            assert ghr.gh_asset_download("org/user", pattern="asset") == 1
+        else:
+            with pytest.raises(Exception, match="expected SHA-256 checksum"):
+                ghr.gh_asset_download("org/user", pattern="asset")
+    assert tmpdir.join("asset").check() == valid
+    assert not tmpdir.join("asset.part").check()
+
+
+def test_download_resume_verify_digest(mocker, tmpdir):
+    content = b"0123456789"
+    tmpdir.join("asset.part").write_binary(content[:4])
+    asset = _asset(1, "asset", content)
+    asset["digest"] = "sha256:" + hashlib.sha256(content).hexdigest()
+    mocked_request = MockedRequest(_responses([asset], {
+        "asset": (206, content[4:], {'Content-Range': 'bytes 4-9/10'})}))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        assert ghr.gh_asset_download("org/user") == 1
+    assert tmpdir.join("asset").read_binary() == content
+
+
+def test_download_digest_over_stale_checksums(mocker, tmpdir):
+    content = b"0123456789"
+    checksums = ("%s  asset\n" % hashlib.sha256(b"replaced").hexdigest()).encode()
+    assets = [_asset(1, "asset", content), _asset(2, "SHA256SUMS", checksums)]
+    assets[0]["digest"] = "sha256:" + hashlib.sha256(content).hexdigest()
+    assets[1]["state"] = "uploaded"
+    mocked_request = MockedRequest(_responses(assets, {
+        "asset": (200, content), "SHA256SUMS": (200, checksums)}))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        assert ghr.gh_asset_download("org/user", pattern="asset") == 1
+    assert tmpdir.join("asset").read_binary() == content
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    content = b""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.content)))
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_download_durable_readinto(mocker, tmpdir):
+    mocker.patch.object(ghr, "_http_cache", None)
+    _AssetHandler.content = bytes(bytearray(range(256))) * 1000
+    server = HTTPServer(('127.0.0.1', 0), _AssetHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.daemon = True
+    thread.start()
+    fsync = mocker.spy(os, "fsync")
+    reporter = ghr._NoopProgressReporter()
+    updates = []
+    reporter.update = updates.append
+    asset = {"id": None, "name": "asset", "size": len(_AssetHandler.content),
+             "browser_download_url": 'http://127.0.0.1:%s/asset' % server.server_address[1]}
+    try:
+        with push_dir(tmpdir):
+            ghr._download_file("org/user", asset, reporter=reporter,
+                               chunk_size=100000, durable=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert tmpdir.join("asset").read_binary() == _AssetHandler.content
+    assert updates == [0, 100000, 100000, 56000]
+    # File and directory entry are flushed
+    assert fsync.call_count == 2
+
+
+def test_write_download_truncate_on_error(tmpdir):
+    class _Raw(object):
+        def __init__(self):
+            self.chunks = [b"0123", b"4567"]
+
+        def readinto(self, buffer):
+            if not self.chunks:
+                raise IOError("connection reset")
+            chunk = self.chunks.pop(0)
+            buffer[:len(chunk)] = chunk
+            return len(chunk)
+
+    response = make_response(200, content=b"")
+    response.raw = _Raw()
+    part = str(tmpdir.join("asset.part"))
+    with pytest.raises(IOError):
+        ghr._write_download(response, part, 0, 100,
+                            ghr._NoopProgressReporter(), hashlib.sha256())
+    # Preallocated space is released so that the download can be resumed
+    assert tmpdir.join("asset.part").read_binary() == b"01234567"
+
+
+def test_download_output_dir_template_index(mocker, tmpdir):
+    releases = [
+        {"tag_name": "1.0.%s" % index,
+         "assets": [_asset(index, "asset", ("content %s" % index).encode())]}
+        for index in range(3)]
+    responses = {API_URL + '/repos/org/user/releases?per_page=100': (200, releases)}
+    for index in range(3):
+        responses[API_URL + '/repos/org/user/releases/assets/%s' % index] = (
+            200, ("content %s" % index).encode())
+    mocked_request = MockedRequest(responses)
+    mocker.patch("github_release._request", new=mocked_request)
+    index_path = str(tmpdir.join("index.json"))
+    with push_github_api_url(ghr, API_URL):
+        assert ghr.gh_asset_download(
+            "org/user", jobs=3, output_dir=str(tmpdir.join("mirror")),
+            template="{tag_name}/{name}", index=index_path) == 3
+    for index in range(3):
+        assert tmpdir.join("mirror", "1.0.%s" % index, "asset").read_binary() == \
+            ("content %s" % index).encode()
+    with open(index_path) as f:
+        assets = json.load(f)["assets"]
+    assert [(asset["path"], asset["size"]) for asset in assets] == [
+        ("1.0.%s/asset" % index, 9) for index in range(3)]
+
+
+def test_download_template_outside_output_dir(mocker, tmpdir):
+    mocked_request = MockedRequest(_responses(
+        [_asset(1, "asset", b"content")], {"asset": (200, b"content")}))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        with pytest.raises(ValueError, match="outside of"):
+            ghr.gh_asset_download("org/user", output_dir=str(tmpdir),
+                                  template="../{name}")
+
+
+@pytest.mark.parametrize("template", ["{version}", "{0}", "{name", "{name.x}"])
+def test_invalid_template(template):
+    with pytest.raises(click.BadParameter, match="Invalid template"):
+        ghr._validate_template(None, None, template)
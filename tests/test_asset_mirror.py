@@ -0,0 +1,89 @@
+import json
+
+import github_release as ghr
+
+from . import MockedRequest, push_github_api_url
+
+API_URL = 'https://api.github.com'
+
+
+def _mirror(mocker, output_dir, releases, contents, **kwargs):
+    responses = {
+        API_URL + '/repos/org/user/releases?per_page=100': (200, releases),
+    }
+    for release in releases:
+        for asset in release['assets']:
+            url = API_URL + '/repos/org/user/releases/assets/%s' % asset['id']
+            responses[url] = (200, contents[asset['id']])
+    mocked_request = MockedRequest(responses)
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        result = ghr.gh_asset_mirror("org/user", str(output_dir), **kwargs)
+    return result, mocked_request.requests
+
+
+def _release(release_id, tag_name, *assets):
+    return {"id": release_id, "tag_name": tag_name, "assets": [
+        {"id": asset_id, "name": name, "size": size, "updated_at": updated_at,
+         "state": "uploaded"}
+        for asset_id, name, size, updated_at in assets]}
+
+
+def test_mirror(mocker, tmpdir):
+    mirror = tmpdir.join("mirror")
+    releases = [
+        _release(1, "1.0.0", (1, "a", 1, "2020-01-01")),
+        _release(2, "1.0.1", (2, "b", 2, "2020-01-01")),
+    ]
+    contents = {1: b"a", 2: b"bb", 3: b"ccc"}
+
+    result, _ = _mirror(mocker, mirror, releases, contents, jobs=2)
+    assert result == (2, 0, 0)
+    assert mirror.join("1.0.0", "a").read_binary() == b"a"
+    assert mirror.join("1.0.1", "b").read_binary() == b"bb"
+
+    # Nothing changed: only releases are listed
+    result, requests = _mirror(mocker, mirror, releases, contents)
+    assert result == (0, 2, 0)
+    assert len(requests) == 1
+
+    # Release 1.0.0 is deleted, asset b is updated and asset c is added
+    contents[2] = b"BB"
+    releases = [
+        _release(2, "1.0.1", (2, "b", 2, "2020-02-01"), (3, "c", 3, "2020-02-01")),
+    ]
+    result, _ = _mirror(mocker, mirror, releases, contents)
+    assert result == (2, 0, 1)
+    assert not mirror.join("1.0.0").check()
+    assert mirror.join("1.0.1", "b").read_binary() == b"BB"
+    assert mirror.join("1.0.1", "c").read_binary() == b"ccc"
+    with open(str(mirror.join(ghr.MIRROR_STATE_NAME))) as f:
+        state = json.load(f)["assets"]
+    assert sorted((entry["path"], entry["updated_at"]) for entry in state.values()) == [
+        ("1.0.1/b", "2020-02-01"), ("1.0.1/c", "2020-02-01")]
+
+
+def test_mirror_no_prune(mocker, tmpdir):
+    mirror = tmpdir.join("mirror")
+    contents = {1: b"a"}
+    _mirror(mocker, mirror, [_release(1, "1.0.0", (1, "a", 1, "2020-01-01"))],
+            contents)
+    result, _ = _mirror(mocker, mirror, [], contents, prune=False)
+    assert result == (0, 0, 0)
+    assert mirror.join("1.0.0", "a").check()
+
+
+def test_mirror_replaced_asset(mocker, tmpdir):
+    mirror = tmpdir.join("mirror")
+    contents = {1: b"a", 2: b"A"}
+    _mirror(mocker, mirror, [_release(1, "1.0.0", (1, "a", 1, "2020-01-01"))],
+            contents)
+    # Asset deleted and uploaded again with the same name
+    result, _ = _mirror(mocker, mirror, [_release(1, "1.0.0", (2, "a", 1, "2020-02-01"))],
+                        contents)
+    assert result == (1, 0, 0)
+    assert mirror.join("1.0.0", "a").read_binary() == b"A"
+    with open(str(mirror.join(ghr.MIRROR_STATE_NAME))) as f:
+        state = json.load(f)["assets"]
+    assert list(state) == ["2"]
+    assert state["2"]["path"] == "1.0.0/a"
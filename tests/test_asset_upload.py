@@ -0,0 +1,252 @@
+import hashlib
+import threading
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+import github_release as ghr
+
+from . import MockedRequest, push_dir, push_github_api_url
+
+API_URL = 'https://api.github.com'
+UPLOAD_URL = 'https://uploads.github.com/repos/org/user/releases/1/assets'
+
+
+def _create_assets(tmpdir, count):
+    dist_dir = tmpdir.ensure("dist", dir=True)
+    for index in range(count):
+        dist_dir.ensure("asset_%s" % index).write("content %s" % index)
+
+
+def _mocked_request(upload_responses, assets=None):
+    responses = {
+        API_URL + '/repos/org/user/releases/tags/1.0.0':
+            (200, {"id": 1, "tag_name": "1.0.0",
+                   "upload_url": UPLOAD_URL + "{?name,label}"}),
+        API_URL + '/repos/org/user/releases/1/assets?per_page=100': (200, assets or []),
+    }
+    responses.update(upload_responses)
+    return MockedRequest(responses)
+
+
+def _uploaded(name):
+    def respond(kwargs):
+        b"".join(kwargs["data"])
+        return 201, {"name": name, "browser_download_url": "https://x/" + name}
+    return respond
+
+
+def test_upload_concurrently(mocker, tmpdir):
+    _create_assets(tmpdir, 6)
+    mocked_request = _mocked_request({
+        ('POST', UPLOAD_URL + '?name=asset_%s' % index):
+            _uploaded("asset_%s" % index)
+        for index in range(6)
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        ghr.gh_asset_upload("org/user", "1.0.0", "dist/*", jobs=3)
+    posted = sorted(url for method, url in mocked_request.requests
+                    if method == 'POST')
+    assert posted == [UPLOAD_URL + '?name=asset_%s' % index
+                      for index in range(6)]
+    # Release and its assets are only looked up once
+    assert len(mocked_request.requests) == 6 + 2
+
+
+def test_upload_concurrently_with_progress_bar(mocker, tmpdir, capsys):
+    # Installed by the CLI when stdout is a terminal
+    mocker.patch.object(ghr, "progress_reporter_cls", ghr._progress_bar)
+    _create_assets(tmpdir, 2)
+    mocked_request = _mocked_request({
+        ('POST', UPLOAD_URL + '?name=asset_%s' % index):
+            _uploaded("asset_%s" % index)
+        for index in range(2)
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        ghr.gh_asset_upload("org/user", "1.0.0", "dist/*", jobs=2, verbose=True)
+    output = capsys.readouterr().out
+    assert "  uploading dist/asset_0" in output
+    assert "  uploading dist/asset_1" in output
+
+
+def test_upload_skip_existing(mocker, tmpdir):
+    _create_assets(tmpdir, 2)
+    mocked_request = _mocked_request({
+        ('POST', UPLOAD_URL + '?name=asset_1'): _uploaded("asset_1"),
+    }, assets=[{"name": "asset_0", "state": "uploaded",
+                "browser_download_url": "https://x/asset_0"}])
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        ghr.gh_asset_upload("org/user", "1.0.0", "dist/*", jobs=1)
+    assert mocked_request.requests == [
+        ('GET', API_URL + '/repos/org/user/releases/tags/1.0.0'),
+        ('GET', API_URL + '/repos/org/user/releases/1/assets?per_page=100'),
+        ('POST', UPLOAD_URL + '?name=asset_1'),
+    ]
+
+
+def test_upload_concurrently_retry_and_failure(mocker, tmpdir):
+    _create_assets(tmpdir, 3)
+    attempts = []
+    lock = threading.Lock()
+
+    def flaky(kwargs):
+        with lock:
+            attempts.append(1)
+            if len(attempts) == 1:
+                return 502, {"message": "Bad Gateway"}
+        return _uploaded("asset_0")(kwargs)
+
+    mocked_request = _mocked_request({
+        ('POST', UPLOAD_URL + '?name=asset_0'): flaky,
+        ('POST', UPLOAD_URL + '?name=asset_1'): (500, {"message": "Error"}),
+        ('POST', UPLOAD_URL + '?name=asset_2'): _uploaded("asset_2"),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        with pytest.raises(requests.exceptions.HTTPError):
+            ghr.gh_asset_upload("org/user", "1.0.0", "dist/*", jobs=3)
+    posted = [url for method, url in mocked_request.requests if method == 'POST']
+    assert len(attempts) == 2
+    assert posted.count(UPLOAD_URL + '?name=asset_2') == 1
+
+
+def test_upload_checksums(mocker, tmpdir):
+    _create_assets(tmpdir, 2)
+    uploaded = {}
+
+    def upload_checksums(kwargs):
+        uploaded["SHA256SUMS"] = kwargs["data"].decode()
+        return 201, {"name": "SHA256SUMS"}
+
+    existing_digest = hashlib.sha256(b"content 0").hexdigest()
+    mocked_request = _mocked_request({
+        ('POST', UPLOAD_URL + '?name=asset_1'): _uploaded("asset_1"),
+        API_URL + '/repos/org/user/releases/assets/2': (200, b"0123  other\n"),
+        ('DELETE', API_URL + '/repos/org/user/releases/assets/2'): (204, None),
+        ('POST', UPLOAD_URL + '?name=SHA256SUMS'): upload_checksums,
+    }, assets=[{"id": 1, "name": "asset_0", "state": "uploaded",
+                "digest": "sha256:" + existing_digest,
+                "browser_download_url": "https://x/asset_0"},
+               {"id": 2, "name": "SHA256SUMS", "state": "uploaded",
+                "browser_download_url": "https://x/SHA256SUMS"}])
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        ghr.gh_asset_upload("org/user", "1.0.0", "dist/*", jobs=1,
+                            checksums=True)
+    assert uploaded["SHA256SUMS"] == (
+        "%s  asset_0\n"
+        "%s  asset_1\n"
+        "0123  other\n" % (existing_digest,
+                           hashlib.sha256(b"content 1").hexdigest()))
+
+
+def test_upload_sync(mocker, tmpdir, capsys):
+    _create_assets(tmpdir, 4)
+    uploaded = {}
+
+    def upload_checksums(kwargs):
+        uploaded["SHA256SUMS"] = kwargs["data"].decode()
+        return 201, {"name": "SHA256SUMS"}
+
+    def _existing(asset_id, name, size, **fields):
+        fields.update({"id": asset_id, "name": name, "size": size,
+                       "state": "uploaded",
+                       "browser_download_url": "https://x/" + name})
+        return fields
+
+    mocked_request = _mocked_request({
+        ('POST', UPLOAD_URL + '?name=asset_1'): _uploaded("asset_1"),
+        ('POST', UPLOAD_URL + '?name=asset_2'): _uploaded("asset_2"),
+        ('POST', UPLOAD_URL + '?name=asset_3'): _uploaded("asset_3"),
+        ('DELETE', API_URL + '/repos/org/user/releases/assets/2'): (204, None),
+        ('DELETE', API_URL + '/repos/org/user/releases/assets/3'): (204, None),
+        API_URL + '/repos/org/user/releases/assets/4': (
+            200, b"0123  asset_1\n"),
+        ('DELETE', API_URL + '/repos/org/user/releases/assets/4'): (204, None),
+        ('POST', UPLOAD_URL + '?name=SHA256SUMS'): upload_checksums,
+    }, assets=[
+        # Same content
+        _existing(1, "asset_0", 9, digest="sha256:" + hashlib.sha256(
+            b"content 0").hexdigest()),
+        # Same size, checksum listed by SHA256SUMS differs
+        _existing(2, "asset_1", 9),
+        # Different size
+        _existing(3, "asset_2", 10),
+        _existing(4, "SHA256SUMS", 14),
+    ])
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        ghr.gh_asset_upload("org/user", "1.0.0", "dist/*", jobs=2, sync=True)
+    sent = [(method, url) for method, url in mocked_request.requests
+            if method != 'GET']
+    assert sorted(sent) == [
+        ('DELETE', API_URL + '/repos/org/user/releases/assets/2'),
+        ('DELETE', API_URL + '/repos/org/user/releases/assets/3'),
+        ('DELETE', API_URL + '/repos/org/user/releases/assets/4'),
+        ('POST', UPLOAD_URL + '?name=SHA256SUMS'),
+        ('POST', UPLOAD_URL + '?name=asset_1'),
+        ('POST', UPLOAD_URL + '?name=asset_2'),
+        ('POST', UPLOAD_URL + '?name=asset_3'),
+    ]
+    assert "skipped 1 unchanged asset(s) (9 bytes saved)" in capsys.readouterr().out
+    # The existing SHA256SUMS asset lists the checksums of the replaced assets
+    assert uploaded["SHA256SUMS"] == "".join(
+        "%s  asset_%s\n" % (hashlib.sha256(("content %s" % index).encode()).hexdigest(), index)
+        for index in range(4))
+
+
+class _UploadHandler(BaseHTTPRequestHandler):
+    received = []
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self.received.append(
+            (self.headers.get('Transfer-Encoding'), self.rfile.read(length)))
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_mmap_upload_body(tmpdir):
+    content = bytes(bytearray(range(256))) * 1000
+    tmpdir.join("asset").write_binary(content)
+    reporter = ghr._NoopProgressReporter()
+    updates = []
+    reporter.update = updates.append
+    _UploadHandler.received = []
+    server = HTTPServer(('127.0.0.1', 0), _UploadHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.daemon = True
+    thread.start()
+    try:
+        with open(str(tmpdir.join("asset")), 'rb') as f:
+            body = ghr._MmapUploadBody(f, reporter, chunk_size=100000)
+            assert len(body) == len(content)
+            for _ in range(2):
+                # Body can be sent again
+                response = requests.post(
+                    'http://127.0.0.1:%s/' % server.server_address[1],
+                    data=body)
+                assert response.status_code == 201
+            body.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert _UploadHandler.received == [(None, content), (None, content)]
+    assert updates == [100000, 100000, 56000] * 2
+    assert body.sha256.hexdigest() == hashlib.sha256(content).hexdigest()
+
+
+def test_upload_body_empty_file(tmpdir):
+    tmpdir.join("asset").write_binary(b"")
+    with open(str(tmpdir.join("asset")), 'rb') as f:
+        body = ghr._upload_body(f, ghr._NoopProgressReporter())
+        assert isinstance(body, ghr._ProgressFileReader)
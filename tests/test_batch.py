@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+import github_release as ghr
+
+from . import MockedRequest, push_github_api_url
+
+API_URL = 'https://api.github.com'
+
+
+def _responses(repos, failing=()):
+    responses = {}
+    for repo in repos:
+        url = API_URL + '/repos/%s/releases/tags/1.0.0' % repo
+        if repo in failing:
+            responses[url] = (404, {"message": "Not Found"})
+            responses[API_URL + '/repos/%s/releases?per_page=100' % repo] = (500, None)
+        else:
+            responses[url] = (200, {
+                "id": 1, "tag_name": "1.0.0", "draft": True, "prerelease": False,
+                "target_commitish": "master", "name": "1.0.0", "body": "",
+                "url": API_URL + '/repos/%s/releases/1' % repo})
+            responses[('PATCH', API_URL + '/repos/%s/releases/1' % repo)] = (
+                200, {"id": 1, "tag_name": "1.0.0", "draft": False})
+    return responses
+
+
+def test_batch(mocker):
+    repos = ["org/repo_%s" % index for index in range(6)]
+    mocked_request = MockedRequest(_responses(repos, failing=["org/repo_3"]))
+    mocker.patch("github_release._request", new=mocked_request)
+    manifest = {
+        "repositories": repos,
+        "operations": [{"command": "release publish", "tag_name": "1.0.0"}],
+    }
+    with push_github_api_url(ghr, API_URL):
+        failed = ghr.gh_batch(manifest, jobs=3)
+    assert failed == ["org/repo_3"]
+    patched = [url for method, url in mocked_request.requests
+               if method == 'PATCH']
+    assert len(patched) == 5
+
+
+def test_batch_manifest_errors():
+    with pytest.raises(ValueError, match="Unknown batch command"):
+        ghr.gh_batch({"repositories": ["org/user"],
+                      "operations": [{"command": "release frobnicate"}]})
+    with pytest.raises(ValueError, match="Expected format"):
+        ghr.gh_batch({"repositories": [{"repo": "user", "operations": []}]})
+
+
+def test_batch_cli(mocker, tmpdir):
+    manifest = tmpdir.join("manifest.json")
+    manifest.write(json.dumps({"repositories": [
+        {"repo": "org/ok", "operations": [
+            {"command": "ref create", "reference": "tags/1.0.0", "sha": "abc"}]},
+        {"repo": "org/ko", "operations": [
+            {"command": "ref create", "reference": "tags/1.0.0", "sha": "abc"}]},
+    ]}))
+    mocked_request = MockedRequest({
+        ('POST', API_URL + '/repos/org/ok/git/refs'): (201, {
+            "ref": "refs/tags/1.0.0", "url": "",
+            "object": {"type": "commit", "sha": "abc", "url": ""}}),
+        ('POST', API_URL + '/repos/org/ko/git/refs'): (422, None),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    mocker.patch.object(ghr, "_github_token_cli_arg", "token")
+    result = CliRunner().invoke(ghr.main, [
+        "--no-cache", "--github-api-url", API_URL, "batch", str(manifest)])
+    assert result.exit_code == 1
+    assert "==> org/ok\n" in result.output
+    assert "==> org/ko\n" in result.output
+    assert "batch completed: 1 succeeded, 1 failed (org/ko)" in result.output
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+import requests
+from click.testing import CliRunner
+
+import github_release as ghr
+from benchmarks import run as benchmark
+
+from .fake_github import FakeGitHub
+
+
+@pytest.fixture
+def github(mocker):
+    with FakeGitHub(per_page=2) as github:
+        mocker.patch.object(ghr, "_github_api_url", github.url)
+        mocker.patch.object(ghr, "_http_cache", None)
+        mocker.patch.object(ghr, "_rate_limiter", ghr._RateLimiter())
+        mocker.patch.object(ghr, "_github_token_cli_arg", "token")
+        yield github
+
+
+def test_fake_github_pagination(github):
+    for index in range(5):
+        github.add_release("org/repo", "1.0.%s" % index)
+    response = requests.get(github.url + "/repos/org/repo/releases")
+    assert [release["tag_name"] for release in response.json()] == ["1.0.4", "1.0.3"]
+    links = ghr._page_links(response)
+    assert ghr._page_number(links["next"]) == 2
+    assert ghr._page_number(links["last"]) == 3
+    assert response.headers["X-RateLimit-Remaining"] == "4999"
+
+    assert [release["tag_name"] for release in ghr.get_releases("org/repo")] == [
+        "1.0.4", "1.0.3", "1.0.2", "1.0.1", "1.0.0"]
+    # A single page of 100 releases is requested
+    assert github.requests[("GET", "list_releases")] == 2
+    assert ghr.github_rate_limit()["remaining"] == 4998
+
+
+def test_fake_github_assets(github, tmpdir):
+    github.add_release("org/repo", "1.0.0", assets={"foo.txt": b"foo"})
+    tmpdir.join("bar.txt").write_binary(b"bar")
+    ghr.gh_asset_upload("org/repo", "1.0.0", str(tmpdir.join("bar.txt")))
+    ghr.gh_asset_download("org/repo", "1.0.0", output_dir=str(tmpdir.join("download")))
+    assert tmpdir.join("download", "foo.txt").read_binary() == b"foo"
+    assert tmpdir.join("download", "bar.txt").read_binary() == b"bar"
+    assert github.requests[("GET", "download")] == 2
+
+
+def test_fake_github_refs(github):
+    github.add_release("org/repo", "1.0.0")
+    github.add_ref("org/repo", "refs/heads/main")
+    assert [ref["ref"] for ref in ghr.get_refs("org/repo", tags=True)] == ["refs/tags/1.0.0"]
+    ghr.gh_ref_delete("org/repo", "refs/tags/*")
+    assert sorted(github.repos["org/repo"]["refs"]) == ["refs/heads/main"]
+
+
+def test_fake_github_failure_injection(github):
+    github.failure_rate = 1
+    github.failure_status = 429
+    response = ghr._request("GET", github.url + "/repos/org/repo/releases")
+    assert response.status_code == 429
+    # Retried as a secondary rate limit
+    assert github.request_count == 3
+
+
+def test_benchmark_smoke():
+    results = benchmark.run(scales=[3])
+    assert [result["benchmark"] for result in results] == list(benchmark.BENCHMARKS)
+    requests_sent = {result["benchmark"]: result["requests"] for result in results}
+    assert requests_sent["get_releases"] == 1
+    assert requests_sent["gh_release_delete"] == 1 + 3
+    assert requests_sent["gh_ref_delete"] == 1 + 3
+    assert all(result["seconds"] >= 0 for result in results)
+
+
+def test_benchmark_baseline(tmpdir):
+    baseline = [{"benchmark": "get_releases", "scale": 2, "requests": 0, "seconds": 0}]
+    tmpdir.join("baseline.json").write(json.dumps(baseline))
+    result = CliRunner().invoke(benchmark.main, [
+        "--scales", "2", "--benchmark", "get_releases",
+        "--output", str(tmpdir.join("results.json")),
+        "--baseline", str(tmpdir.join("baseline.json"))])
+    assert result.exit_code == 1
+    assert "get_releases (scale 2): 1 requests instead of 0" in result.output
+    [written] = json.loads(tmpdir.join("results.json").read())
+    assert written["requests"] == 1
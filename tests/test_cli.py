@@ -12,11 +12,20 @@ from . import push_argv
     (["--github-token", "123546"], "asset", "upload", ["1.0.0", "dist/foo", "dist/bar"]),  # noqa: E501
     (["--no-progress"], "asset", "upload", ["1.0.0", "dist/foo"]),
     (["--progress"], "asset", "upload", ["1.0.0", "dist/foo"]),
+    ([], "asset", "upload", ["1.0.0", "dist/foo", "--jobs", "4"]),
+    ([], "asset", "upload", ["1.0.0", "dist/foo", "--checksums"]),
+    ([], "asset", "upload", ["1.0.0", "dist/foo", "--sync"]),
     # ([], "asset", "download", []),
     ([], "asset", "download", ["1.0.0"]),
     ([], "asset", "download", ["1.0.0", "dist/foo"]),
     (["--no-progress"], "asset", "download", ["1.0.0", "dist/foo"]),
     (["--progress"], "asset", "download", ["1.0.0", "dist/foo"]),
+    ([], "asset", "download", ["1.0.0", "--jobs", "4"]),
+    ([], "asset", "download", ["1.0.0", "--chunk-size", "1048576", "--durable"]),
+    ([], "asset", "download", ["*", "--output-dir", "mirror", "--template", "{tag_name}/{name}",
+                               "--index", "mirror/index.json"]),
+    ([], "asset", "mirror", ["mirror"]),
+    ([], "asset", "mirror", ["mirror", "--tag-name", "1.*", "--pattern", "*.whl", "--no-prune"]),
     ([], "asset", "delete", ["1.0.0", "*foo*"]),
     ([], "asset", "delete", ["1.0.0", "*foo*", "--keep-pattern", "*bar*"]),
     ([], "asset", "delete", ["1.0.0", "*foo*"]),
@@ -33,6 +42,10 @@ from . import push_argv
     ([], "ref", "list", ["--pattern", "*heads/*foo*"]),
     # release
     ([], "release", "list", []),
+    (["--no-cache"], "release", "list", []),
+    (["--api", "graphql"], "release", "list", []),
+    (["--trace"], "release", "list", []),
+    (["--cache-dir", "/tmp/github-release-cache"], "release", "list", []),
     ([], "release", "info", ["1.0.0"]),
     ([], "release", "create", ["1.0.0"]),
     ([], "release", "create", ["1.0.0", "foo", "bar"]),
@@ -41,6 +54,7 @@ from . import push_argv
     ([], "release", "create", ["1.0.0", "--publish"]),
     ([], "release", "create", ["1.0.0", "--prerelease"]),
     ([], "release", "create", ["1.0.0", "--target-commitish", "1234567"]),
+    ([], "release", "create", ["1.0.0", "foo", "bar", "--jobs", "2"]),
     ([], "release", "edit", ["1.0.0", "--tag-name", "new_tag"]),
     ([], "release", "edit", ["1.0.0", "--target-commitish", "1234567"]),
     ([], "release", "edit", ["1.0.0", "--name", "new_name"]),
@@ -53,6 +67,7 @@ from . import push_argv
                                       "--body", "new_body"]),
     ([], "release", "delete", ["1.0.0"]),
     ([], "release", "delete", ["*a", "--keep-pattern", "1*"]),
+    ([], "release", "delete", ["nightly-*", "--jobs", "8", "--delete-tags"]),
     ([], "release", "publish", ["1.0.0"]),
     ([], "release", "publish", ["1.0.0", "--prerelease"]),
     ([], "release", "unpublish", ["1.0.0"]),
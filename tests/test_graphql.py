@@ -0,0 +1,216 @@
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+import github_release as ghr
+
+from . import MockedRequest, make_response, push_dir, push_github_api_url, push_github_session
+
+API_URL = 'https://api.github.com'
+
+
+def _release_node(index, asset_count):
+    return {
+        "id": "R_%s" % index,
+        "databaseId": index,
+        "tagName": "1.0.%s" % index,
+        "name": "Release %s" % index,
+        "description": "",
+        "createdAt": "2017-01-01T00:00:00Z",
+        "publishedAt": "2017-01-01T00:00:00Z",
+        "url": "https://github.com/org/user/releases/tag/1.0.%s" % index,
+        "isDraft": index == 0,
+        "isPrerelease": False,
+        "author": {"login": "jcfr"},
+        "tagCommit": {"oid": "%040d" % index},
+        "releaseAssets": _assets_page(index, asset_count, 0, 2),
+    }
+
+
+def _assets_page(index, asset_count, start, per_page):
+    end = min(start + per_page, asset_count)
+    return {
+        "pageInfo": {"hasNextPage": end < asset_count, "endCursor": str(end)},
+        "nodes": [{
+            "name": "asset_%s_%s" % (index, asset),
+            "size": 10,
+            "downloadCount": 0,
+            "downloadUrl": "https://github.com/org/user/releases/download/"
+                           "1.0.%s/asset_%s_%s" % (index, index, asset),
+            "contentType": "application/octet-stream",
+            "createdAt": "2017-01-01T00:00:00Z",
+            "updatedAt": "2017-01-01T00:00:00Z",
+            "uploadedBy": {"login": "jcfr"},
+        } for asset in range(start, end)],
+    }
+
+
+class _GraphQLHandler(BaseHTTPRequestHandler):
+    """Stub serving 3 releases, 2 per page; release #1 has 3 assets."""
+
+    queries = []
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(
+            int(self.headers['Content-Length'])).decode('utf-8'))
+        self.queries.append(payload)
+        variables = payload["variables"]
+        cursor = int(variables.get("cursor") or 0)
+        if "node(id:" in payload["query"]:
+            index = int(variables["id"][len("R_"):])
+            data = {"node": {"releaseAssets": _assets_page(index, 3, cursor, 2)}}
+        else:
+            nodes = [_release_node(index, 3 if index == 1 else 1)
+                     for index in range(cursor, min(cursor + 2, 3))]
+            data = {"repository": {"releases": {
+                "pageInfo": {"hasNextPage": cursor + 2 < 3,
+                             "endCursor": str(cursor + 2)},
+                "nodes": nodes,
+            }}}
+        body = json.dumps({"data": data}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def graphql_server(mocker):
+    mocker.patch.object(ghr, "_http_cache", None)
+    mocker.patch.object(ghr, "_github_api", 'graphql')
+    _GraphQLHandler.queries = []
+    server = HTTPServer(('127.0.0.1', 0), _GraphQLHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.daemon = True
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:%s' % server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_graphql_url():
+    with push_github_api_url(ghr, 'https://github.example.com/api/v3'):
+        assert ghr.github_graphql_url() == 'https://github.example.com/api/graphql'
+    with push_github_api_url(ghr, 'https://api.github.com'):
+        assert ghr.github_graphql_url() == 'https://api.github.com/graphql'
+
+
+def test_get_releases_graphql(graphql_server):
+    with push_github_api_url(ghr, graphql_server):
+        releases = ghr.get_releases("org/user")
+    assert [release["tag_name"] for release in releases] == [
+        "1.0.0", "1.0.1", "1.0.2"]
+    assert [len(release["assets"]) for release in releases] == [1, 3, 1]
+    assert releases[0]["draft"] and ghr.get_release_type(releases[0]) == 'draft'
+    assert releases[1]["id"] == 1
+    assert releases[1]["author"]["login"] == "jcfr"
+    assert releases[1]["target_commitish"] == "%040d" % 1
+    assert releases[1]["assets"][2]["uploader"]["login"] == "jcfr"
+    # Two pages of releases and one additional page of assets
+    assert len(_GraphQLHandler.queries) == 3
+
+
+def test_print_release_info_graphql(graphql_server, capsys):
+    with push_github_api_url(ghr, graphql_server):
+        ghr.get_releases("org/user", verbose=True)
+    output = capsys.readouterr().out
+    assert "Tag name      : 1.0.1" in output
+    assert "name      : asset_1_2" in output
+
+
+class _DraftSession(requests.Session):
+    """Session replying 404 for the tag of a draft release listed by both
+    the REST and GraphQL APIs."""
+
+    def __init__(self):
+        super(_DraftSession, self).__init__()
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        if url.endswith('/graphql'):
+            data = {"repository": {"releases": {
+                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                "nodes": [_release_node(0, 0)],
+            }}}
+            return make_response(200, {"data": data}, url=url, method=method)
+        if '/releases/tags/' in url:
+            return make_response(404, {"message": "Not Found"}, url=url, method=method)
+        return make_response(200, [{
+            "id": 0, "tag_name": "1.0.0", "draft": True, "assets": [],
+            "upload_url": "https://uploads.github.com/repos/org/user/releases/0/assets{?name,label}",
+        }], url=url, method=method)
+
+
+def test_get_draft_release_graphql(mocker):
+    mocker.patch.object(ghr, "_http_cache", None)
+    mocker.patch.object(ghr, "_github_api", 'rest')
+    ghr.set_github_api('graphql')
+    session = _DraftSession()
+    with push_github_api_url(ghr, 'https://api.github.com'), push_github_session(ghr, session):
+        release = ghr.get_release("org/user", "1.0.0")
+    assert release["draft"]
+    assert release["upload_url"].startswith("https://uploads.github.com/repos/org/user/releases/0/assets")
+    assert not any(url.endswith('/graphql') for url in session.urls)
+
+
+def _rest_assets(release):
+    return [{"id": index * 10 + asset, "name": "asset_%s_%s" % (index, asset), "size": 10,
+             "updated_at": "2017-01-01T00:00:00Z", "state": "uploaded"}
+            for index in [release["id"]] for asset in range(len(release["assets"]))]
+
+
+@pytest.fixture
+def graphql_releases(mocker):
+    """Releases 1.0.1 (2 assets) and 1.0.2 (1 asset) listed using GraphQL,
+    along with the REST responses listing and downloading their assets."""
+    mocker.patch.object(ghr, "_http_cache", None)
+    releases = [ghr._graphql_release(_release_node(index, count))
+                for index, count in [(1, 2), (2, 1)]]
+    mocker.patch("github_release.iter_releases", side_effect=lambda repo_name: iter(releases))
+    responses = {}
+    for release in releases:
+        assets = _rest_assets(release)
+        responses[API_URL + '/repos/org/user/releases/%s/assets?per_page=100' % release["id"]] = (200, assets)
+        for asset in assets:
+            responses[API_URL + '/repos/org/user/releases/assets/%s' % asset["id"]] = (200, b"0123456789")
+    mocked_request = MockedRequest(responses)
+    mocker.patch("github_release._request", new=mocked_request)
+    return releases, mocked_request
+
+
+def test_download_graphql_assets(graphql_releases, tmpdir):
+    releases, mocked_request = graphql_releases
+    assert releases[0]["assets"][0]["id"] is None
+    with push_github_api_url(ghr, API_URL), push_dir(tmpdir):
+        assert ghr.gh_asset_download("org/user", "1.0.1") == 2
+    assert tmpdir.join("asset_1_0").read_binary() == b"0123456789"
+    # Assets are downloaded by id, listing them once for the selected release
+    assert sorted(url for _, url in mocked_request.requests) == [
+        API_URL + '/repos/org/user/releases/1/assets?per_page=100',
+        API_URL + '/repos/org/user/releases/assets/10',
+        API_URL + '/repos/org/user/releases/assets/11',
+    ]
+
+
+def test_mirror_graphql_after_rest(graphql_releases, mocker, tmpdir):
+    releases, mocked_request = graphql_releases
+    mirror = str(tmpdir.join("mirror"))
+    rest_releases = [dict(release, assets=_rest_assets(release)) for release in releases]
+    mocker.patch("github_release.iter_releases", side_effect=[iter(rest_releases), iter(releases)])
+    with push_github_api_url(ghr, API_URL):
+        assert ghr.gh_asset_mirror("org/user", mirror) == (3, 0, 0)
+        # Assets of the selected release are identified by id, and those
+        # of other releases by release and name
+        assert ghr.gh_asset_mirror("org/user", mirror, tag_name="1.0.1") == (0, 2, 0)
+    assert tmpdir.join("mirror", "1.0.2", "asset_2_0").check()
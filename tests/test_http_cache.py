@@ -0,0 +1,84 @@
+import pytest
+import requests
+from click.testing import CliRunner
+
+import github_release as ghr
+
+from . import make_response, push_github_session
+
+URL = 'https://api.github.com/repos/org/user/releases'
+
+
+class _ConditionalSession(requests.Session):
+    """Session replying 304 when the ETag sent matches the current one."""
+
+    def __init__(self, etag='"v1"'):
+        super(_ConditionalSession, self).__init__()
+        self.etag = etag
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        headers = kwargs.get('headers', {})
+        self.requests.append(headers)
+        if headers.get('If-None-Match') == self.etag:
+            return make_response(304, headers={'ETag': self.etag}, url=url)
+        return make_response(200, [{"url": url, "etag": self.etag}],
+                             headers={'ETag': self.etag}, url=url)
+
+
+def test_http_cache_revalidate(mocker, tmpdir):
+    mocker.patch.object(ghr, "_github_token_cli_arg", "abc")
+    session = _ConditionalSession()
+    with push_github_session(ghr, session):
+        ghr.set_http_cache(str(tmpdir))
+        try:
+            first = ghr._request('GET', URL)
+            second = ghr._request('GET', URL)
+            session.etag = '"v2"'
+            third = ghr._request('GET', URL)
+        finally:
+            ghr.set_http_cache(None)
+    assert 'If-None-Match' not in session.requests[0]
+    assert session.requests[1]['If-None-Match'] == '"v1"'
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert getattr(second, 'from_cache', False)
+    assert third.json() == [{"url": URL, "etag": '"v2"'}]
+
+
+def test_http_cache_key_identity(tmpdir):
+    cache = ghr._HttpCache(str(tmpdir))
+    assert cache.key(URL, {}, "token1") != cache.key(URL, {}, "token2")
+    assert cache.key(URL, {}, "token1") != cache.key(
+        URL, {'Accept': 'application/octet-stream'}, "token1")
+
+
+def test_http_cache_eviction(mocker, tmpdir):
+    mocker.patch.object(ghr, "_github_token_cli_arg", "abc")
+    session = _ConditionalSession()
+    with push_github_session(ghr, session):
+        ghr.set_http_cache(str(tmpdir), max_size=1024)
+        try:
+            for index in range(20):
+                ghr._request('GET', URL + '?page=%s' % index)
+        finally:
+            ghr.set_http_cache(None)
+    total_size = sum(entry.size() for entry in tmpdir.listdir())
+    assert 0 < total_size <= 1024
+
+
+@pytest.mark.parametrize("options, env_cache_dir, cache_dir", [
+    ([], None, None),
+    (["--cache-dir", "cache"], None, "cache"),
+    ([], "cache", "cache"),
+    (["--no-cache"], "cache", None),
+])
+def test_cli_cache_opt_in(mocker, options, env_cache_dir, cache_dir):
+    set_http_cache = mocker.patch("github_release.set_http_cache")
+    get_releases = mocker.patch("github_release.get_releases")
+    result = CliRunner().invoke(
+        ghr.main, options + ["release", "org/user", "list"],
+        env={"GITHUB_RELEASE_CACHE_DIR": env_cache_dir})
+    assert result.exit_code == 0, result.output
+    assert get_releases.called
+    set_http_cache.assert_called_once_with(cache_dir)
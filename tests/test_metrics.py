@@ -0,0 +1,188 @@
+import sys
+import types
+
+from urllib.parse import parse_qsl, urlparse
+
+import pytest
+import requests
+
+import github_release as ghr
+
+from . import make_response, push_github_session
+
+API_URL = 'https://api.github.com'
+
+
+class _PagedSession(requests.Session):
+    """Session replying with ``pages`` of releases linked by ``next``
+    links."""
+
+    def __init__(self, pages):
+        super(_PagedSession, self).__init__()
+        self.pages = pages
+
+    def request(self, method, url, **kwargs):
+        query = dict(parse_qsl(urlparse(url).query))
+        page = int(query.get('page', 1))
+        headers = {}
+        if page < len(self.pages):
+            headers['Link'] = '<%s/repos/org/user/releases?page=%d>; rel="next"' % (
+                API_URL, page + 1)
+        return make_response(200, self.pages[page - 1], headers=headers,
+                             url=url, method=method)
+
+
+@pytest.fixture
+def hooks(mocker):
+    mocker.patch.object(ghr, "_request_hooks", [])
+    mocker.patch.object(ghr, "_rate_limiter", ghr._RateLimiter())
+    mocker.patch.object(ghr, "_http_cache", None)
+    mocker.patch.object(ghr, "_github_api_url", API_URL)
+    mocker.patch.object(ghr, "_github_api", 'rest')
+
+
+def _request_event(status=200, duration=0.2, retries=0, sleep=0):
+    return {'type': 'request', 'method': 'GET', 'url': '/repos/{owner}/{repo}/releases',
+            'status': status, 'bytes_out': 0, 'bytes_in': 1000, 'start': 0,
+            'duration': duration, 'retries': retries, 'sleep': sleep, 'thread': 1}
+
+
+def test_prometheus_text(hooks):
+    metrics = ghr.Metrics()
+    metrics(_request_event())
+    metrics(_request_event(status=404, duration=3, retries=1, sleep=1.5))
+    metrics({'type': 'listing', 'url': '/repos/{owner}/{repo}/releases',
+             'pages': 3, 'start': 0, 'duration': 1, 'thread': 1})
+    metrics({'type': 'sleep', 'reason': 'backoff get_release', 'start': 0,
+             'duration': 0.25, 'thread': 1})
+    ghr._rate_limiter.update(make_response(200, headers={
+        'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': '4998',
+        'X-RateLimit-Reset': '0', 'X-RateLimit-Resource': 'core'}))
+
+    lines = metrics.prometheus_text().splitlines()
+    labels = 'method="GET",endpoint="/repos/{owner}/{repo}/releases"'
+    assert '# TYPE github_release_requests_total counter' in lines
+    assert 'github_release_requests_total{%s,status="200"} 1' % labels in lines
+    assert 'github_release_requests_total{%s,status="404"} 1' % labels in lines
+    assert '# TYPE github_release_request_duration_seconds histogram' in lines
+    assert 'github_release_request_duration_seconds_bucket{%s,le="0.25"} 1' % labels in lines
+    assert 'github_release_request_duration_seconds_bucket{%s,le="5"} 2' % labels in lines
+    assert 'github_release_request_duration_seconds_bucket{%s,le="+Inf"} 2' % labels in lines
+    assert 'github_release_request_duration_seconds_sum{%s} 3.2' % labels in lines
+    assert 'github_release_request_duration_seconds_count{%s} 2' % labels in lines
+    assert 'github_release_request_retries_total{%s} 1' % labels in lines
+    assert 'github_release_received_bytes_total{%s} 2000' % labels in lines
+    assert 'github_release_sleep_seconds_total{reason="rate limit"} 1.5' in lines
+    assert 'github_release_sleep_seconds_total{reason="backoff get_release"} 0.25' in lines
+    assert ('github_release_listing_pages_bucket'
+            '{endpoint="/repos/{owner}/{repo}/releases",le="2"} 0') in lines
+    assert ('github_release_listing_pages_bucket'
+            '{endpoint="/repos/{owner}/{repo}/releases",le="5"} 1') in lines
+    assert 'github_release_rate_limit_remaining{resource="core"} 4998' in lines
+    assert 'github_release_rate_limit_limit{resource="core"} 5000' in lines
+
+
+def test_label_escaping():
+    assert ghr._escape_label_value('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+@pytest.mark.parametrize("count, consumed, pages", [
+    (3, None, 3),
+    (3, 1, 1),
+])
+def test_listing_pages(hooks, count, consumed, pages):
+    metrics = ghr.Metrics()
+    ghr.add_request_hook(metrics)
+    session = _PagedSession([[{"id": index, "tag_name": str(index)}] for index in range(count)])
+    with push_github_session(ghr, session):
+        releases = ghr.iter_releases("org/user")
+        if consumed is None:
+            list(releases)
+        else:
+            for _ in range(consumed):
+                next(releases)
+            releases.close()
+    [(labels, histogram)] = [
+        (key[1], value) for key, value in metrics._values.items()
+        if key[0] == 'github_release_listing_pages']
+    assert labels == (('endpoint', '/repos/{owner}/{repo}/releases'),)
+    assert histogram['count'] == 1
+    assert histogram['sum'] == pages
+
+
+def test_no_listing_without_hooks(hooks, mocker):
+    report_listing = mocker.patch("github_release._report_listing")
+    session = _PagedSession([[{"id": 1, "tag_name": "1"}]])
+    with push_github_session(ghr, session):
+        assert len(ghr.get_releases("org/user")) == 1
+    assert not report_listing.called
+
+
+class _Instrument(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.values = []
+
+    def add(self, value, attributes=None):
+        self.values.append((value, attributes))
+
+    record = add
+
+
+class _Meter(object):
+
+    def __init__(self):
+        self.instruments = {}
+        self.callbacks = {}
+
+    def create_counter(self, name, unit='', description=''):
+        return self.instruments.setdefault(name, _Instrument(name))
+
+    create_histogram = create_counter
+
+    def create_observable_gauge(self, name, callbacks=None, unit='', description=''):
+        self.callbacks[name] = callbacks
+
+
+@pytest.fixture
+def opentelemetry(mocker):
+    package = types.ModuleType('opentelemetry')
+    module = types.ModuleType('opentelemetry.metrics')
+    module.Observation = lambda value, attributes=None: (value, attributes)
+    module.meter = _Meter()
+    module.get_meter = lambda name: module.meter
+    package.metrics = module
+    mocker.patch.dict(sys.modules, {
+        'opentelemetry': package, 'opentelemetry.metrics': module})
+    return module
+
+
+def test_opentelemetry_metrics(hooks, opentelemetry):
+    metrics = ghr.OpenTelemetryMetrics()
+    meter = opentelemetry.meter
+    metrics(_request_event(status=404, retries=1, sleep=2))
+    metrics({'type': 'listing', 'url': '/repos/{owner}/{repo}/releases',
+             'pages': 3, 'start': 0, 'duration': 1, 'thread': 1})
+    attributes = {'http.request.method': 'GET',
+                  'url.template': '/repos/{owner}/{repo}/releases'}
+    assert meter.instruments['github_release.requests'].values == [
+        (1, dict(attributes, **{'http.response.status_code': 404}))]
+    assert meter.instruments['github_release.request.duration'].values == [(0.2, attributes)]
+    assert meter.instruments['github_release.request.retries'].values == [(1, attributes)]
+    assert meter.instruments['github_release.received'].values == [(1000, attributes)]
+    assert meter.instruments['github_release.sleep'].values == [(2, {'reason': 'rate limit'})]
+    assert meter.instruments['github_release.listing.pages'].values == [
+        (3, {'url.template': '/repos/{owner}/{repo}/releases'})]
+
+    ghr._rate_limiter.update(make_response(200, headers={
+        'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': '42',
+        'X-RateLimit-Reset': '0'}))
+    [callback] = meter.callbacks['github_release.rate_limit.remaining']
+    assert callback(None) == [(42, {'resource': 'core'})]
+
+
+def test_opentelemetry_missing(mocker):
+    mocker.patch.dict(sys.modules, {'opentelemetry': None})
+    with pytest.raises(ImportError, match="opentelemetry-api"):
+        ghr.OpenTelemetryMetrics()
@@ -0,0 +1,51 @@
+import github_release as ghr
+
+from . import MockedRequest
+
+URL = 'https://api.github.com/repos/org/user/releases'
+
+
+def _link(**rels):
+    return ", ".join('<%s?page=%s&per_page=2>; rel="%s"' % (URL, page, rel)
+                     for rel, page in sorted(rels.items()))
+
+
+def test_paginated_get_last_page(mocker):
+    mocked_request = MockedRequest({
+        URL + '?per_page=2': (200, [1, 2], {"Link": _link(next=2, last=4)}),
+        URL + '?page=2&per_page=2': (200, [3, 4]),
+        URL + '?page=3&per_page=2': (200, [5, 6]),
+        URL + '?page=4&per_page=2': (200, [7]),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    items = []
+    ghr._paginated_gh_get(URL, items, per_page=2)
+    assert items == [1, 2, 3, 4, 5, 6, 7]
+    assert len(mocked_request.requests) == 4
+
+
+def test_paginated_get_next_links(mocker):
+    mocked_request = MockedRequest({
+        URL + '?per_page=2': (200, [1, 2], {"Link": _link(next=2)}),
+        URL + '?page=2&per_page=2': (200, [3, 4], {"Link": _link(next=3)}),
+        URL + '?page=3&per_page=2': (200, [5]),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    items = []
+    ghr._paginated_gh_get(URL, items, per_page=2)
+    assert items == [1, 2, 3, 4, 5]
+    assert [url for _, url in mocked_request.requests] == [
+        URL + '?per_page=2', URL + '?page=2&per_page=2', URL + '?page=3&per_page=2']
+
+
+def test_iter_releases_stops_fetching(mocker):
+    api_url = 'https://api.github.com'
+    mocked_request = MockedRequest({
+        URL + '/tags/draft': (404, {"message": "Not Found"}),
+        URL + '?per_page=100': (200, [{"tag_name": "draft"}],
+                                {"Link": '<%s?per_page=100&page=2>; rel="next"' % URL}),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    mocker.patch.object(ghr, "_github_api_url", api_url)
+    assert ghr.get_release("org/user", "draft") == {"tag_name": "draft"}
+    assert len(mocked_request.requests) == 2
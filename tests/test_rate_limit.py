@@ -0,0 +1,108 @@
+import time
+
+import pytest
+import requests
+
+import github_release as ghr
+
+from . import make_response, push_github_session
+
+URL = 'https://api.github.com/repos/org/user/releases'
+
+
+class _ScriptedSession(requests.Session):
+    """Session replying with the given responses in order."""
+
+    def __init__(self, responses):
+        super(_ScriptedSession, self).__init__()
+        self.responses = list(responses)
+        self.count = 0
+
+    def request(self, method, url, **kwargs):
+        self.count += 1
+        status_code, headers = self.responses.pop(0)
+        return make_response(status_code, {}, headers=headers, url=url)
+
+
+def _headers(remaining, reset, limit=5000, resource='core'):
+    return {'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': str(int(reset)),
+            'X-RateLimit-Resource': resource}
+
+
+@pytest.fixture
+def sleeps(mocker):
+    sleeps = []
+    mocker.patch("github_release.time.sleep", new=sleeps.append)
+    mocker.patch.object(ghr, "_rate_limiter", ghr._RateLimiter(reserve=10))
+    mocker.patch.object(ghr, "_http_cache", None)
+    return sleeps
+
+
+def test_primary_rate_limit_retry(sleeps):
+    reset = time.time() + 30
+    session = _ScriptedSession([
+        (403, _headers(0, reset)),
+        (200, _headers(4999, reset + 3600)),
+    ])
+    with push_github_session(ghr, session):
+        response = ghr._request('GET', URL)
+    assert response.status_code == 200
+    assert session.count == 2
+    assert len(sleeps) == 1 and 29 <= sleeps[0] <= 32
+    assert ghr.github_rate_limit()['remaining'] == 4999
+
+
+def test_secondary_rate_limit_retry(sleeps):
+    session = _ScriptedSession([
+        (429, {'Retry-After': '5'}),
+        (200, {}),
+    ])
+    with push_github_session(ghr, session):
+        response = ghr._request('GET', URL)
+    assert response.status_code == 200
+    assert sleeps == [5]
+
+
+def test_rate_limit_too_long_not_retried(sleeps):
+    session = _ScriptedSession([
+        (403, _headers(0, time.time() + 2 * ghr.RATE_LIMIT_MAX_WAIT)),
+    ])
+    with push_github_session(ghr, session):
+        response = ghr._request('GET', URL)
+    assert response.status_code == 403
+    assert sleeps == []
+
+
+def test_proactive_throttling(sleeps):
+    reset = time.time() + 100
+    session = _ScriptedSession([
+        (200, _headers(5, reset)),
+        (200, _headers(4, reset)),
+    ])
+    with push_github_session(ghr, session):
+        ghr._request('GET', URL)
+        ghr._request('GET', URL)
+    assert len(sleeps) == 1 and 15 <= sleeps[0] <= 21
+
+
+def test_budget_per_resource(sleeps):
+    session = _ScriptedSession([
+        (200, _headers(4000, time.time() + 100, resource='graphql')),
+    ])
+    with push_github_session(ghr, session):
+        ghr._request('POST', 'https://api.github.com/graphql')
+    assert ghr.github_rate_limit('graphql')['remaining'] == 4000
+    assert ghr.github_rate_limit('core') is None
+
+
+@pytest.mark.parametrize("remaining, throttled", [
+    (59, False),
+    (6, False),
+    (5, True),
+])
+def test_reserve_proportional_to_limit(remaining, throttled):
+    rate_limiter = ghr._RateLimiter()
+    rate_limiter.update(make_response(200, headers=_headers(remaining, time.time() + 3500, limit=60)))
+    assert (rate_limiter.delay() > 0) == throttled
@@ -0,0 +1,56 @@
+import github_release as ghr
+
+from . import MockedRequest, push_github_api_url
+
+API_URL = 'https://api.github.com'
+REFS_URL = API_URL + '/repos/org/user/git'
+
+
+def _ref(name, sha="1234567"):
+    return {"ref": name, "object": {"type": "commit", "sha": sha}}
+
+
+def test_get_refs_literal(mocker):
+    mocked_request = MockedRequest({
+        REFS_URL + '/ref/tags/1.0.0': (200, _ref("refs/tags/1.0.0")),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        refs = ghr.get_refs("org/user", tags=True, pattern="refs/tags/1.0.0")
+    assert refs == [_ref("refs/tags/1.0.0")]
+    assert len(mocked_request.requests) == 1
+
+
+def test_get_refs_literal_not_found(mocker):
+    mocked_request = MockedRequest({
+        REFS_URL + '/ref/tags/1.0.0-tmp': (404, {"message": "Not Found"}),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        assert ghr.get_refs("org/user", pattern="refs/tags/1.0.0-tmp") == []
+
+
+def test_get_refs_prefix(mocker):
+    mocked_request = MockedRequest({
+        REFS_URL + '/matching-refs/tags/nightly-?per_page=100': (200, [
+            _ref("refs/tags/nightly-1"),
+            _ref("refs/tags/nightly-2-rc"),
+        ]),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        refs = ghr.get_refs("org/user", pattern="refs/tags/nightly-?")
+    assert refs == [_ref("refs/tags/nightly-1")]
+
+
+def test_get_refs_no_prefix(mocker):
+    mocked_request = MockedRequest({
+        REFS_URL + '/refs?per_page=100': (200, [
+            _ref("refs/heads/master"),
+            _ref("refs/tags/1.0.0"),
+        ]),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        refs = ghr.get_refs("org/user", pattern="*/master")
+    assert refs == [_ref("refs/heads/master")]
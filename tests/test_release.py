@@ -0,0 +1,176 @@
+import json
+
+import pytest
+
+import github_release as ghr
+
+from . import MockedRequest, push_github_api_url
+
+API_URL = 'https://api.github.com'
+
+
+def _release(tag_name, draft=False, release_id=1):
+    return {"tag_name": tag_name, "draft": draft, "id": release_id}
+
+
+def test_get_release_by_tag(mocker):
+    mocked_request = MockedRequest({
+        API_URL + '/repos/org/user/releases/tags/1.0.0':
+            (200, _release("1.0.0")),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        assert ghr.get_release("org/user", "1.0.0")["tag_name"] == "1.0.0"
+    assert mocked_request.requests == [
+        ('GET', API_URL + '/repos/org/user/releases/tags/1.0.0')]
+
+
+def test_get_release_draft_fallback(mocker):
+    mocked_request = MockedRequest({
+        API_URL + '/repos/org/user/releases/tags/feature%2Fdraft':
+            (404, {"message": "Not Found"}),
+        API_URL + '/repos/org/user/releases?per_page=100':
+            (200, [_release("1.0.0"),
+                   _release("feature/draft", draft=True, release_id=2)]),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        release = ghr.get_release("org/user", "feature/draft")
+    assert release["id"] == 2
+
+
+def _full_release(tag_name, target_commitish="master"):
+    return {"tag_name": tag_name, "draft": False, "id": 1,
+            "target_commitish": target_commitish, "name": tag_name,
+            "body": "", "prerelease": False}
+
+
+def _tag_ref(tag_name, object_type, sha):
+    return {"ref": "refs/tags/%s" % tag_name,
+            "object": {"type": object_type, "sha": sha}}
+
+
+@pytest.mark.parametrize("tag_name, quoted_tag_name", [
+    ("1.0.0", "1.0.0"),
+    ("1.0.0+build", "1.0.0%2Bbuild"),
+])
+def test_retarget_lightweight_tag(mocker, tag_name, quoted_tag_name):
+    patched = []
+
+    def patch_ref(kwargs):
+        patched.append(json.loads(kwargs["data"]))
+        return 200, _tag_ref(tag_name, "commit", "new")
+
+    mocked_request = MockedRequest({
+        API_URL + '/repos/org/user/releases/tags/%s' % quoted_tag_name:
+            (200, _full_release(tag_name)),
+        API_URL + '/repos/org/user/git/ref/tags/%s' % quoted_tag_name:
+            (200, _tag_ref(tag_name, "commit", "old")),
+        ('PATCH', API_URL + '/repos/org/user/git/refs/tags/%s' % quoted_tag_name): patch_ref,
+        ('PATCH', API_URL + '/repos/org/user/releases/1'):
+            (200, _full_release(tag_name, "new")),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    sleep = mocker.patch("time.sleep")
+    with push_github_api_url(ghr, API_URL):
+        release = ghr.patch_release(
+            "org/user", tag_name, target_commitish="new")
+    assert release["target_commitish"] == "new"
+    assert patched == [{"sha": "new", "force": True}]
+    assert mocked_request.requests == [
+        ('GET', API_URL + '/repos/org/user/releases/tags/%s' % quoted_tag_name),
+        ('GET', API_URL + '/repos/org/user/git/ref/tags/%s' % quoted_tag_name),
+        ('PATCH', API_URL + '/repos/org/user/git/refs/tags/%s' % quoted_tag_name),
+        ('PATCH', API_URL + '/repos/org/user/releases/1'),
+    ]
+    assert not sleep.called
+
+
+def test_retarget_annotated_tag(mocker):
+    # Tags known by the fake repository
+    tags = {"1.0.0": _tag_ref("1.0.0", "tag", "old")}
+    releases = []
+
+    def get_ref(tag_name):
+        def respond(kwargs):
+            if tag_name not in tags:
+                return 404, None
+            return 200, tags[tag_name]
+        return respond
+
+    def delete_ref(tag_name):
+        def respond(kwargs):
+            del tags[tag_name]
+            return 204, None
+        return respond
+
+    def patch_release(kwargs):
+        data = json.loads(kwargs["data"])
+        releases.append(data["tag_name"])
+        # Missing tag is created by GitHub
+        tags.setdefault(data["tag_name"], _tag_ref(
+            data["tag_name"], "commit", data["target_commitish"]))
+        return 200, _full_release(data["tag_name"], data["target_commitish"])
+
+    responses = {
+        API_URL + '/repos/org/user/releases/tags/1.0.0':
+            (200, _full_release("1.0.0")),
+        ('PATCH', API_URL + '/repos/org/user/releases/1'): patch_release,
+    }
+    for tag_name in ["1.0.0", "1.0.0-tmp"]:
+        url = API_URL + '/repos/org/user/git/ref/tags/%s' % tag_name
+        responses[url] = get_ref(tag_name)
+        url = API_URL + '/repos/org/user/git/refs/tags/%s' % tag_name
+        responses[('DELETE', url)] = delete_ref(tag_name)
+    mocked_request = MockedRequest(responses)
+    mocker.patch("github_release._request", new=mocked_request)
+    mocker.patch("time.sleep")
+    with push_github_api_url(ghr, API_URL):
+        ghr.patch_release("org/user", "1.0.0", target_commitish="new")
+    # Temporary tag dance, then the requested update
+    assert releases == ["1.0.0-tmp", "1.0.0", "1.0.0"]
+    assert tags == {"1.0.0": _tag_ref("1.0.0", "commit", "new")}
+    # Release is only looked up once
+    assert mocked_request.requests.count(
+        ('GET', API_URL + '/repos/org/user/releases/tags/1.0.0')) == 1
+
+
+def test_unit_of_work(mocker):
+    def patch_release(kwargs):
+        data = json.loads(kwargs["data"])
+        return 200, dict(_full_release(data["tag_name"]), draft=data["draft"])
+
+    mocked_request = MockedRequest({
+        API_URL + '/repos/org/user/releases/tags/1.0.0':
+            (200, _full_release("1.0.0")),
+        API_URL + '/repos/org/user/releases/tags/1.0.1': (404, None),
+        API_URL + '/repos/org/user/releases?per_page=100': (200, []),
+        ('PATCH', API_URL + '/repos/org/user/releases/1'): patch_release,
+        ('DELETE', API_URL + '/repos/org/user/git/refs/tags/1.0.0'): (204, None),
+        API_URL + '/repos/org/user/git/ref/tags/1.0.0':
+            (200, _tag_ref("1.0.0", "commit", "abc")),
+    })
+    mocker.patch("github_release._request", new=mocked_request)
+    mocker.patch("time.sleep")
+    with push_github_api_url(ghr, API_URL), ghr.unit_of_work():
+        ghr.gh_release_publish("org/user", "1.0.0")
+        ghr.gh_release_unpublish("org/user", "1.0.0")
+        assert ghr.get_release("org/user", "1.0.0")["draft"]
+        # Reference is looked up once
+        assert ghr.get_refs("org/user", pattern="refs/tags/1.0.0")
+        assert ghr.get_refs("org/user", pattern="refs/tags/1.0.0")
+        # Renaming the tag updates the lookup of the release
+        ghr.patch_release("org/user", "1.0.0", tag_name="1.0.1")
+        assert ghr.get_release("org/user", "1.0.1")["id"] == 1
+    assert [request for request in mocked_request.requests
+            if request[0] == 'GET'] == [
+        ('GET', API_URL + '/repos/org/user/releases/tags/1.0.0'),
+        ('GET', API_URL + '/repos/org/user/git/ref/tags/1.0.0'),
+        # Patching the release may have moved the tag
+        ('GET', API_URL + '/repos/org/user/git/ref/tags/1.0.0'),
+    ]
+    # Outside of a unit of work, releases are fetched again
+    with push_github_api_url(ghr, API_URL):
+        ghr.get_release("org/user", "1.0.0")
+    assert mocked_request.requests[-1] == (
+        'GET', API_URL + '/repos/org/user/releases/tags/1.0.0')
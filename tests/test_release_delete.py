@@ -0,0 +1,71 @@
+import pytest
+import requests
+
+import github_release as ghr
+
+from . import MockedRequest, push_github_api_url
+
+API_URL = 'https://api.github.com'
+
+
+def _releases(count):
+    return [{"id": index, "tag_name": "nightly-%s" % index, "draft": False,
+             "prerelease": False, "created_at": "2017-01-01T00:00:00Z"}
+            for index in range(count)]
+
+
+def _responses(releases, status_codes=None, tag_status_code=204):
+    responses = {
+        API_URL + '/repos/org/user/releases?per_page=100': (200, releases),
+    }
+    for release in releases:
+        url = API_URL + '/repos/org/user/releases/%s' % release["id"]
+        responses[('DELETE', url)] = (
+            (status_codes or {}).get(release["id"], 204), None)
+        url = API_URL + '/repos/org/user/git/refs/tags/%s' % release["tag_name"]
+        responses[('DELETE', url)] = (tag_status_code, None)
+    return responses
+
+
+def test_delete_concurrently(mocker):
+    mocked_request = MockedRequest(_responses(_releases(10)))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        assert ghr.gh_release_delete("org/user", "nightly-*", jobs=4)
+    deleted = [url for method, url in mocked_request.requests
+               if method == 'DELETE']
+    assert len(deleted) == 10
+    assert all('/releases/' in url for url in deleted)
+
+
+def test_delete_collects_failures(mocker, capsys):
+    mocked_request = MockedRequest(_responses(_releases(5), {2: 500}))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        with pytest.raises(requests.exceptions.HTTPError):
+            ghr.gh_release_delete("org/user", "nightly-*", jobs=2)
+    deleted = [url for method, url in mocked_request.requests
+               if method == 'DELETE']
+    assert len(deleted) == 5
+    output = capsys.readouterr().out
+    assert 'deleted 4 of 5 release(s)' in output
+    assert '  nightly-2: 500' in output
+
+
+def test_delete_with_tags(mocker):
+    mocked_request = MockedRequest(
+        _responses(_releases(3), tag_status_code=422))
+    mocker.patch("github_release._request", new=mocked_request)
+    with push_github_api_url(ghr, API_URL):
+        ghr.gh_release_delete("org/user", "nightly-*", jobs=1,
+                              delete_tags=True)
+    deleted = [url for method, url in mocked_request.requests
+               if method == 'DELETE']
+    assert deleted == [
+        API_URL + '/repos/org/user/releases/0',
+        API_URL + '/repos/org/user/git/refs/tags/nightly-0',
+        API_URL + '/repos/org/user/releases/1',
+        API_URL + '/repos/org/user/git/refs/tags/nightly-1',
+        API_URL + '/repos/org/user/releases/2',
+        API_URL + '/repos/org/user/git/refs/tags/nightly-2',
+    ]
@@ -0,0 +1,58 @@
+import requests
+
+import github_release as ghr
+
+from . import make_response, push_env, push_github_session
+
+
+class _RecordingSession(requests.Session):
+    def __init__(self):
+        super(_RecordingSession, self).__init__()
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return make_response(200, [], url=url, method=method)
+
+
+def test_github_session_is_reused():
+    with push_github_session(ghr, None):
+        session = ghr.github_session()
+        assert isinstance(session, requests.Session)
+        assert ghr.github_session() is session
+
+
+def test_new_github_session_pool_sizes():
+    session = ghr.new_github_session(
+        pool_maxsize=3, pool_sizes={"https://uploads.github.com/": 7})
+    default_adapter = session.get_adapter("https://api.github.com/repos")
+    uploads_adapter = session.get_adapter("https://uploads.github.com/repos")
+    assert default_adapter._pool_maxsize == 3
+    assert uploads_adapter._pool_maxsize == 7
+
+
+def test_new_github_session_adapter_factory():
+    created = []
+
+    def factory(**kwargs):
+        created.append(kwargs)
+        return requests.adapters.HTTPAdapter(**kwargs)
+
+    ghr.new_github_session(pool_connections=2, pool_maxsize=5,
+                           adapter_factory=factory)
+    assert created == [{"pool_connections": 2, "pool_maxsize": 5}]
+
+
+def test_request_uses_injected_session(mocker):
+    mocker.patch.object(ghr, "_github_token_cli_arg", None)
+    mocker.patch.object(ghr, "_http_cache", None)
+    session = _RecordingSession()
+    with push_github_session(ghr, None), push_env(GITHUB_TOKEN="abc"):
+        ghr.set_github_session(session)
+        ghr._request('GET', 'https://api.github.com/repos/org/user/releases')
+        ghr._request('GET', 'https://api.github.com/repos/org/user/git/refs')
+    assert [call[1] for call in session.calls] == [
+        'https://api.github.com/repos/org/user/releases',
+        'https://api.github.com/repos/org/user/git/refs',
+    ]
+    assert session.calls[0][2]['headers']['Authorization'] == 'Bearer abc'
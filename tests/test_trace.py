@@ -0,0 +1,180 @@
+import json
+
+import pytest
+import requests
+from click.testing import CliRunner
+
+import github_release as ghr
+
+from . import make_response, push_github_session
+
+API_URL = 'https://api.github.com'
+
+
+class _ScriptedSession(requests.Session):
+    """Session replying with the given responses in order."""
+
+    def __init__(self, responses):
+        super(_ScriptedSession, self).__init__()
+        self.responses = list(responses)
+
+    def request(self, method, url, **kwargs):
+        status_code, headers, json_data = self.responses.pop(0)
+        return make_response(status_code, json_data, headers=headers,
+                             url=url, method=method)
+
+
+@pytest.fixture
+def tracer(mocker):
+    mocker.patch("github_release.time.sleep")
+    mocker.patch.object(ghr, "_rate_limiter", ghr._RateLimiter())
+    mocker.patch.object(ghr, "_http_cache", None)
+    mocker.patch.object(ghr, "_github_api_url", API_URL)
+    mocker.patch.object(ghr, "_request_hooks", [])
+    tracer = ghr._Tracer()
+    ghr.add_request_hook(tracer)
+    return tracer
+
+
+@pytest.mark.parametrize("url, expected", [
+    (API_URL + '/repos/org/user/releases?per_page=100&page=2',
+     '/repos/{owner}/{repo}/releases'),
+    (API_URL + '/repos/org/user/releases/123', '/repos/{owner}/{repo}/releases/{id}'),
+    (API_URL + '/repos/org/user/releases/tags/1.0.0', '/repos/{owner}/{repo}/releases/tags/{tag}'),
+    (API_URL + '/repos/org/user/releases/assets/42', '/repos/{owner}/{repo}/releases/assets/{id}'),
+    (API_URL + '/repos/org/user/git/refs/tags/1.0.0', '/repos/{owner}/{repo}/git/refs/{ref}'),
+    (API_URL + '/repos/org/user/git/matching-refs/tags/1', '/repos/{owner}/{repo}/git/matching-refs/{ref}'),
+    (API_URL + '/repos/org/user/commits/abc123', '/repos/{owner}/{repo}/commits/{sha}'),
+    (API_URL + '/graphql', '/graphql'),
+    ('https://uploads.github.com/repos/org/user/releases/123/assets?name=foo',
+     'uploads.github.com/repos/{owner}/{repo}/releases/{id}/assets'),
+    ('https://objects.githubusercontent.com/github-production-release-asset/1/2?X=1',
+     'objects.githubusercontent.com/{path}'),
+])
+def test_url_template(mocker, url, expected):
+    mocker.patch.object(ghr, "_github_api_url", API_URL)
+    assert ghr._url_template(url) == expected
+
+
+def test_request_hook(tracer):
+    session = _ScriptedSession([
+        (429, {'Retry-After': '5'}, None),
+        (201, {}, {"id": 1}),
+    ])
+    with push_github_session(ghr, session):
+        ghr._request('POST', API_URL + '/repos/org/user/releases',
+                     data=json.dumps({"tag_name": "1.0.0"}))
+    [event] = tracer.events
+    assert event['type'] == 'request'
+    assert event['method'] == 'POST'
+    assert event['url'] == '/repos/{owner}/{repo}/releases'
+    assert event['status'] == 201
+    assert event['bytes_out'] == len('{"tag_name": "1.0.0"}')
+    assert event['bytes_in'] == len('{"id": 1}')
+    assert event['retries'] == 1
+    assert event['sleep'] == 5
+    assert event['duration'] >= 0
+
+
+def test_backoff_reported(tracer, mocker):
+    release = {"id": 1, "tag_name": "1.0.0"}
+    listings = iter([[], [release]])
+    mocker.patch("github_release._iter_gh_items",
+                 side_effect=lambda href: (r for r in next(listings)))
+    mocker.patch("backoff._sync.time.sleep")
+    mocker.patch("github_release._request", return_value=make_response(404))
+    assert ghr.get_release("org/user", "1.0.0") == release
+    [event] = tracer.events
+    assert event['type'] == 'sleep'
+    assert event['reason'] == 'backoff get_release'
+
+
+def test_no_hook_no_event(mocker):
+    mocker.patch.object(ghr, "_request_hooks", [])
+    emit = mocker.patch("github_release._emit")
+    session = _ScriptedSession([(200, {}, [])])
+    with push_github_session(ghr, session):
+        ghr._send('core', 'GET', API_URL + '/repos/org/user/releases')
+    assert not emit.called
+
+
+def _events():
+    return [
+        {'type': 'request', 'method': 'GET', 'url': '/repos/{owner}/{repo}/releases',
+         'status': 200, 'bytes_out': 0, 'bytes_in': 100, 'start': 10.0,
+         'duration': 0.5, 'retries': 0, 'sleep': 0, 'thread': 1},
+        {'type': 'request', 'method': 'GET', 'url': '/repos/{owner}/{repo}/releases',
+         'status': 404, 'bytes_out': 0, 'bytes_in': 20, 'start': 11.0,
+         'duration': 0.25, 'retries': 1, 'sleep': 0.125, 'thread': 2},
+        {'type': 'sleep', 'reason': 'retarget', 'start': 12.0,
+         'duration': 0.1, 'thread': 1},
+    ]
+
+
+def test_tracer_summary(capsys):
+    tracer = ghr._Tracer()
+    for event in _events():
+        tracer(event)
+    [(name, total), (sleep_name, sleep_total)] = tracer.summary()
+    assert name == 'GET /repos/{owner}/{repo}/releases'
+    assert total['calls'] == 2
+    assert total['errors'] == 1
+    assert total['retries'] == 1
+    assert total['bytes_in'] == 120
+    assert total['duration'] == 0.75
+    assert total['max_duration'] == 0.5
+    assert total['sleep'] == 0.125
+    assert sleep_name == 'sleep retarget'
+    assert sleep_total['sleep'] == 0.1
+
+    tracer.print_summary()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == [
+        'endpoint', 'calls', 'errors', 'retries', 'sent', 'received',
+        'time', '(s)', 'max', '(s)', 'sleep', '(s)']
+    assert lines[1].split() == [
+        'GET', '/repos/{owner}/{repo}/releases', '2', '1', '1', '0', '120',
+        '0.750', '0.500', '0.125']
+
+
+def test_tracer_dump(tmpdir):
+    tracer = ghr._Tracer()
+    for event in _events():
+        tracer(event)
+
+    jsonl = str(tmpdir.join("trace.jsonl"))
+    tracer.dump(jsonl)
+    with open(jsonl) as f:
+        assert [json.loads(line) for line in f] == _events()
+
+    chrome = str(tmpdir.join("trace.json"))
+    tracer.dump(chrome)
+    with open(chrome) as f:
+        trace_events = json.load(f)['traceEvents']
+    assert [(e['name'], e['ph'], e['ts'], e['dur'], e['tid']) for e in trace_events] == [
+        ('GET /repos/{owner}/{repo}/releases', 'X', 10000000, 500000, 1),
+        ('GET /repos/{owner}/{repo}/releases', 'X', 11000000, 250000, 2),
+        ('sleep retarget', 'X', 12000000, 100000, 1),
+    ]
+
+
+def test_cli_trace(mocker, tmpdir):
+    mocker.patch.object(ghr, "_request_hooks", [])
+    mocker.patch.object(ghr, "_rate_limiter", ghr._RateLimiter())
+    mocker.patch.object(ghr, "_github_token_cli_arg", "token")
+    session = _ScriptedSession([(200, {}, [])])
+    trace_file = str(tmpdir.join("trace.jsonl"))
+    with push_github_session(ghr, session):
+        result = CliRunner().invoke(ghr.main, [
+            "--no-cache", "--github-api-url", API_URL,
+            "--trace", "--trace-file", trace_file,
+            "release", "org/user", "list"])
+    assert result.exit_code == 0, result.output
+    assert "GET /repos/{owner}/{repo}/releases" in result.stderr
+    with open(trace_file) as f:
+        request, listing = [json.loads(line) for line in f]
+    assert request['type'] == 'request'
+    assert request['url'] == '/repos/{owner}/{repo}/releases'
+    assert listing['type'] == 'listing'
+    assert listing['pages'] == 1
+    assert ghr._request_hooks == []